@@ -0,0 +1,31 @@
+"""Task next run
+
+Revision ID: 5e2c1a9d7f40
+Revises: 09128b6e34dd
+Create Date: 2026-10-18 14:02:41.518302
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e2c1a9d7f40"
+down_revision = "09128b6e34dd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("tasks", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("next_run", sa.DateTime(timezone=True), nullable=True))
+
+    # Postgres doesn't allow new enum values to be used in the transaction that added them
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE tasktype ADD VALUE IF NOT EXISTS 'REMINDERS'")
+
+
+def downgrade() -> None:
+    # Postgres can't remove values from an enum, so REMINDERS is left in place
+    with op.batch_alter_table("tasks", schema=None) as batch_op:
+        batch_op.drop_column("next_run")
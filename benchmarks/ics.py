@@ -0,0 +1,84 @@
+"""Benchmark for parsing ICS files
+
+This compares the ics library to the streaming parser that is used for schedules,
+both in time and in peak memory usage.
+
+Usage: python3 -m benchmarks.ics [files...]
+
+If no files are passed, a synthetic semester-sized file is generated instead.
+"""
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from ics import Calendar
+
+from benchmarks.schedules import generate_calendar
+from didier.data.embeds.schedules import (
+    ParsedEvent,
+    parse_course_code,
+    parse_events,
+    parse_time_string,
+)
+
+
+def parse_with_ics(content: str) -> list[ParsedEvent]:
+    """The old approach: build a full Calendar & then extract the events out of it"""
+    calendar = Calendar(content)
+
+    return [
+        ParsedEvent(
+            code=parse_course_code(event.name),
+            start_time=parse_time_string(str(event.begin)),
+            end_time=parse_time_string(str(event.end)),
+            location=event.location,
+        )
+        for event in calendar.events
+    ]
+
+
+def measure(parse: Callable[[str], list[ParsedEvent]], content: str) -> tuple[float, int, list[ParsedEvent]]:
+    """Measure the duration & the peak memory usage of a parser
+
+    The memory is measured in a separate run, as tracing slows everything down
+    """
+    start = time.perf_counter()
+    events = parse(content)
+    duration = time.perf_counter() - start
+
+    tracemalloc.start()
+    parse(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return duration, peak, events
+
+
+def main():
+    """Run the benchmark"""
+    sources: list[tuple[str, str]] = []
+
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as fp:
+            sources.append((path, fp.read()))
+
+    if not sources:
+        sources.append(("synthetic semester", generate_calendar(40)))
+
+    for name, content in sources:
+        print(f"{name} ({len(content) / 1024:.0f} KiB)")
+
+        results = {}
+        for parser_name, parse in (("ics", parse_with_ics), ("streaming", parse_events)):
+            duration, peak, events = measure(parse, content)
+            results[parser_name] = sorted(events)
+            peak_mib = peak / 1024 / 1024
+            print(f"{parser_name:>10}: {duration * 1000:9.2f}ms, peak {peak_mib:7.2f} MiB ({len(events)} events)")
+
+        if results["ics"] != results["streaming"]:
+            print("Warning: the parsers found different events")
+
+
+if __name__ == "__main__":
+    main()
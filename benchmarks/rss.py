@@ -0,0 +1,128 @@
+"""Benchmark for parsing RSS feeds
+
+This compares feedparser to the streaming entry extractor that is used for
+the RSS feeds, both in time and in peak memory usage.
+
+Usage: python3 -m benchmarks.rss [files...]
+
+If no files are passed, the free games test fixture and a couple of
+synthetic Ufora-like feeds of increasing size are used instead.
+"""
+import pathlib
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import feedparser
+
+from didier.data.rss_feeds.parser import FeedEntry, iter_entries
+
+FIXTURE = pathlib.Path(__file__).parent.parent / "tests" / "test_data" / "free_games.rss"
+
+
+def generate_feed(entries: int) -> str:
+    """Create an RSS feed with HTML descriptions, like the ones Ufora sends"""
+    published = datetime(year=2022, month=9, day=19, tzinfo=timezone.utc)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<rss version="2.0">', "<channel>", "<title>Course</title>"]
+
+    for i in range(entries):
+        date = (published - timedelta(hours=i)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+        lines += [
+            "<item>",
+            f"<title>Announcement {i} &amp; more</title>",
+            f"<link>https://ufora.ugent.be/d2l/le/news/1/{i}-1/view</link>",
+            f"<guid>https://ufora.ugent.be/d2l/le/news/1/{i}-1</guid>",
+            f"<pubDate>{date}</pubDate>",
+            "<description>"
+            + "&lt;p&gt;Some &lt;b&gt;important&lt;/b&gt; information.&lt;/p&gt;" * 20
+            + "</description>",
+            "</item>",
+        ]
+
+    lines += ["</channel>", "</rss>"]
+    return "\n".join(lines)
+
+
+def parse_with_feedparser(content: str) -> list[FeedEntry]:
+    """The old approach: parse the entire feed, then pick the fields out of it"""
+    feed = feedparser.parse(content)
+
+    return [
+        FeedEntry(
+            id=entry.get("id", entry.get("link", "")),
+            title=entry.get("title", ""),
+            link=entry.get("link", ""),
+            published=entry.get("published", ""),
+            summary=entry.get("summary", ""),
+        )
+        for entry in feed["entries"]
+    ]
+
+
+def parse_with_extractor(content: str) -> list[FeedEntry]:
+    """Extract all entries with the streaming extractor"""
+    return list(iter_entries(content))
+
+
+def first_with_extractor(content: str) -> list[FeedEntry]:
+    """Only extract the first entry, like when the newest announcement is already known"""
+    return [next(iter_entries(content))]
+
+
+def measure(parse: Callable[[str], list[FeedEntry]], content: str) -> tuple[float, int, list[FeedEntry]]:
+    """Measure the duration & the peak memory usage of a parser
+
+    The memory is measured in a separate run, as tracing slows everything down
+    """
+    start = time.perf_counter()
+    entries = parse(content)
+    duration = time.perf_counter() - start
+
+    tracemalloc.start()
+    parse(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return duration, peak, entries
+
+
+def main():
+    """Run the benchmark"""
+    sources: list[tuple[str, str]] = []
+
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as fp:
+            sources.append((path, fp.read()))
+
+    if not sources:
+        with open(FIXTURE, "r", encoding="utf-8") as fp:
+            sources.append((FIXTURE.name, fp.read()))
+
+        for size in (100, 1000, 5000):
+            sources.append((f"synthetic {size} entries", generate_feed(size)))
+
+    parsers = (
+        ("feedparser", parse_with_feedparser),
+        ("streaming", parse_with_extractor),
+        ("first only", first_with_extractor),
+    )
+
+    for name, content in sources:
+        print(f"{name} ({len(content) / 1024:.0f} KiB)")
+
+        results = {}
+        for parser_name, parse in parsers:
+            duration, peak, entries = measure(parse, content)
+            results[parser_name] = entries
+            peak_mib = peak / 1024 / 1024
+            print(f"{parser_name:>10}: {duration * 1000:9.2f}ms, peak {peak_mib:7.2f} MiB ({len(entries)} entries)")
+
+        # Feedparser sanitizes HTML, so only compare the fields that are used as-is
+        if [e[:4] for e in results["feedparser"]] != [e[:4] for e in results["streaming"]]:
+            print("Warning: the parsers found different entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark for parsing schedules
+
+This generates a synthetic semester-sized ICS file, and compares merging the slots
+by checking every event against every accepted slot to merging them in one sweep.
+
+Usage: python3 -m benchmarks.schedules [courses]
+"""
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from database.schemas import UforaCourse
+from didier.data.embeds.schedules import (
+    ParsedEvent,
+    ScheduleSlot,
+    merge_slots,
+    parse_events,
+    register_courses,
+)
+from didier.utils.types.datetime import LOCAL_TIMEZONE
+
+SEMESTER_START = datetime(year=2022, month=9, day=19, tzinfo=LOCAL_TIMEZONE)
+WEEKS = 13
+
+
+def generate_calendar(courses: int) -> str:
+    """Create an ICS file with two lessons per week for every course
+
+    Every lesson is split into two blocks of 1h15m that can be merged together
+    """
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:benchmark"]
+
+    for course in range(courses):
+        for week in range(WEEKS):
+            for lesson in range(2):
+                day = SEMESTER_START + timedelta(weeks=week, days=(course + lesson * 2) % 5)
+                start = day.replace(hour=8 + (course % 4) * 2, minute=30)
+
+                for block in range(2):
+                    block_start = start + timedelta(minutes=75 * block)
+                    block_end = block_start + timedelta(minutes=75)
+                    lines += [
+                        "BEGIN:VEVENT",
+                        f"UID:{course}-{week}-{lesson}-{block}@benchmark",
+                        f"DTSTART:{block_start.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+                        f"DTEND:{block_end.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+                        f"SUMMARY:C{course:03}A. Course {course}",
+                        f"LOCATION:Auditorium {course % 3}. Gebouw A. Campus Sterre. ",
+                        "END:VEVENT",
+                    ]
+
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines)
+
+
+def create_slots(events: list[ParsedEvent], courses: dict[str, UforaCourse]) -> list[ScheduleSlot]:
+    """Create fresh slots, as merging them edits them in-place"""
+    return [ScheduleSlot.from_event(courses[event.code].course_id, event) for event in events]
+
+
+def merge_pairwise(slots: list[ScheduleSlot]) -> list[ScheduleSlot]:
+    """The old approach: compare every slot to all slots that came before it"""
+    merged: list[ScheduleSlot] = []
+
+    for slot in slots:
+        if any(s.could_merge_with(slot) for s in merged):
+            continue
+
+        merged.append(slot)
+
+    return merged
+
+
+def best_of(
+    merge: Callable[[list[ScheduleSlot]], list[ScheduleSlot]],
+    events: list[ParsedEvent],
+    courses: dict[str, UforaCourse],
+    repeat: int = 5,
+) -> tuple[float, list[ScheduleSlot]]:
+    """Time the fastest out of a couple of runs, without counting the creation of the slots"""
+    best = float("inf")
+    result: list[ScheduleSlot] = []
+
+    for _ in range(repeat):
+        slots = create_slots(events, courses)
+
+        start = time.perf_counter()
+        result = merge(slots)
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def main():
+    """Run the benchmark"""
+    n_courses = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+
+    events = parse_events(generate_calendar(n_courses))
+    codes = {event.code for event in events}
+    courses = {code: UforaCourse(course_id=i, name=code, code=code, year=1) for i, code in enumerate(codes)}
+    register_courses(courses.values())
+
+    print(f"{len(events)} events for {len(codes)} courses")
+    print(f"Course lookups: {len(codes)} queries before, 1 query after")
+
+    for name, merge in (("pairwise", merge_pairwise), ("sweep", merge_slots)):
+        duration, result = best_of(merge, events, courses)
+        print(f"{name:>8}: {duration * 1000:8.2f}ms ({len(result)} slots)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import sqlalchemy.exc
 from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.crud.users import get_or_add_user
+from database.crud.users import ensure_user_exists
 from database.exceptions import (
     DuplicateInsertException,
     Forbidden,
@@ -22,7 +22,7 @@ async def create_bookmark(session: AsyncSession, user_id: int, label: str, jump_
     if label.lower() in ["create", "delete", "ls", "list", "Rm", "search"]:
         raise ForbiddenNameException
 
-    await get_or_add_user(session, user_id)
+    await ensure_user_exists(session, user_id)
 
     try:
         bookmark = Bookmark(label=label, jump_url=jump_url, user_id=user_id)
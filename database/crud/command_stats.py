@@ -1,27 +1,43 @@
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from typing import Optional, Union
 
 from discord import app_commands
 from discord.ext import commands
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.crud.users import get_or_add_user
+from database.crud.users import known_users, provision_users
 from database.schemas import CommandStats
 
-__all__ = ["register_command_invocation"]
+__all__ = [
+    "CommandInvocation",
+    "create_command_invocation",
+    "register_command_invocation",
+    "register_command_invocations",
+]
 
 
 CommandT = Union[commands.Command, app_commands.Command, app_commands.ContextMenu]
 
 
-async def register_command_invocation(
-    session: AsyncSession, ctx: commands.Context, command: Optional[CommandT], timestamp: datetime
-):
-    """Create an entry for a command invocation"""
-    if command is None:
-        return
+@dataclass
+class CommandInvocation:
+    """A command invocation that still has to be written to the database"""
 
-    await get_or_add_user(session, ctx.author.id)
+    command: str
+    timestamp: datetime
+    user_id: int
+    slash: bool
+    context_menu: bool
+
+
+def create_command_invocation(
+    ctx: commands.Context, command: Optional[CommandT], timestamp: datetime
+) -> Optional[CommandInvocation]:
+    """Create a record of a command invocation, without touching the database"""
+    if command is None:
+        return None
 
     # Check the type of invocation
     context_menu = isinstance(command, app_commands.ContextMenu)
@@ -29,7 +45,7 @@ async def register_command_invocation(
     # (This is a bit uglier but it accounts for hybrid commands)
     slash = isinstance(command, app_commands.Command) or (ctx.interaction is not None and not context_menu)
 
-    stats = CommandStats(
+    return CommandInvocation(
         command=command.qualified_name.lower(),
         timestamp=timestamp,
         user_id=ctx.author.id,
@@ -37,5 +53,32 @@ async def register_command_invocation(
         context_menu=context_menu,
     )
 
-    session.add(stats)
+
+async def register_command_invocation(
+    session: AsyncSession, ctx: commands.Context, command: Optional[CommandT], timestamp: datetime
+):
+    """Create an entry for a command invocation"""
+    invocation = create_command_invocation(ctx, command, timestamp)
+    if invocation is None:
+        return
+
+    await register_command_invocations(session, [invocation])
+
+
+async def register_command_invocations(session: AsyncSession, invocations: list[CommandInvocation]):
+    """Create entries for a batch of command invocations at once
+
+    All users that don't exist yet are created in bulk first, and then all
+    invocations are inserted using one single statement
+    """
+    if not invocations:
+        return
+
+    user_ids = sorted({invocation.user_id for invocation in invocations})
+    unknown_user_ids = [user_id for user_id in user_ids if not known_users.is_known(user_id)]
+
+    await provision_users(session, unknown_user_ids)
+    await session.execute(insert(CommandStats).values([asdict(invocation) for invocation in invocations]))
     await session.commit()
+
+    known_users.add(unknown_user_ids)
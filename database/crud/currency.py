@@ -1,15 +1,18 @@
 from datetime import date
-from typing import Union
+from typing import Callable, Optional, Union
 
+from sqlalchemy import ColumnElement, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 from database.crud import users
 from database.exceptions import currency as exceptions
 from database.schemas import Bank, NightlyData
 from database.utils.math.currency import (
-    capacity_upgrade_price,
-    interest_upgrade_price,
-    rob_upgrade_price,
+    CAPACITY_UPGRADE,
+    INTEREST_UPGRADE,
+    ROB_UPGRADE,
+    upgrade_price_expression,
 )
 
 __all__ = [
@@ -28,145 +31,201 @@ __all__ = [
 
 NIGHTLY_AMOUNT = 420
 
+# All operations that modify a bank are done using one single UPDATE-statement that
+# checks the balance & changes it at the same time. This means that concurrent invocations
+# by the same user can never overwrite each other's changes.
+
 
 async def get_bank(session: AsyncSession, user_id: int) -> Bank:
     """Get a user's bank info"""
-    user = await users.get_or_add_user(session, user_id)
-    return user.bank
+    await users.ensure_user_exists(session, user_id)
+
+    statement = select(Bank).where(Bank.user_id == user_id).execution_options(populate_existing=True)
+    return (await session.execute(statement)).scalar_one()
 
 
 async def get_nightly_data(session: AsyncSession, user_id: int) -> NightlyData:
     """Get a user's nightly info"""
-    user = await users.get_or_add_user(session, user_id)
-    return user.nightly_data
+    await users.ensure_user_exists(session, user_id)
 
+    statement = select(NightlyData).where(NightlyData.user_id == user_id).execution_options(populate_existing=True)
+    return (await session.execute(statement)).scalar_one()
 
-async def invest(session: AsyncSession, user_id: int, amount: Union[str, int]) -> int:
-    """Invest some of your Dinks"""
-    bank = await get_bank(session, user_id)
+
+def _parse_amount(amount: Union[str, int]) -> Optional[int]:
+    """Parse an amount of Dinks, returning None if the amount is "all" of them"""
     if amount == "all":
-        amount = bank.dinks
+        return None
 
-    # Don't allow investing more dinks than you own
-    amount = min(bank.dinks, int(amount))
+    return int(amount)
 
-    bank.dinks -= amount
-    bank.invested += amount
 
-    session.add(bank)
-    await session.commit()
+async def _move_dinks(
+    session: AsyncSession,
+    user_id: int,
+    source: Union[ColumnElement[int], InstrumentedAttribute[int]],
+    amount: Optional[int],
+    changes: Callable[[ColumnElement], dict],
+) -> int:
+    """Lock a user's bank, and move (at most) an amount of Dinks around in the same statement
 
-    return amount
+    The amount is limited by the value of the source column. The changes to make are created by
+    a function that takes the amount that was actually moved as an argument.
 
+    Returns the amount that was moved
+    """
+    await users.ensure_user_exists(session, user_id)
 
-async def withdraw(session: AsyncSession, user_id: int, amount: Union[str, int]) -> int:
-    """Withdraw your invested Dinks"""
-    bank = await get_bank(session, user_id)
-    if amount == "all":
-        amount = bank.invested
+    moved = source if amount is None else func.least(source, amount)
 
-    # Don't allow withdrawing more dinks than you own
-    amount = min(bank.invested, int(amount))
+    # Lock the row, so that concurrent statements see the result of this one before calculating their amount
+    locked = select(Bank.bank_id, moved.label("amount")).where(Bank.user_id == user_id).with_for_update().subquery()
 
-    bank.dinks += amount
-    bank.invested -= amount
+    statement = (
+        update(Bank)
+        .where(Bank.bank_id == locked.c.bank_id)
+        .values(**changes(locked.c.amount))
+        .returning(locked.c.amount)
+        .execution_options(synchronize_session=False)
+    )
 
+    result = (await session.execute(statement)).scalar_one()
     await session.commit()
-    return amount
+
+    return result
+
+
+async def invest(session: AsyncSession, user_id: int, amount: Union[str, int]) -> int:
+    """Invest some of your Dinks"""
+    # Don't allow investing more dinks than you own
+    return await _move_dinks(
+        session,
+        user_id,
+        Bank.dinks,
+        _parse_amount(amount),
+        lambda moved: {"dinks": Bank.dinks - moved, "invested": Bank.invested + moved},
+    )
+
+
+async def withdraw(session: AsyncSession, user_id: int, amount: Union[str, int]) -> int:
+    """Withdraw your invested Dinks"""
+    # Don't allow withdrawing more dinks than you own
+    return await _move_dinks(
+        session,
+        user_id,
+        Bank.invested,
+        _parse_amount(amount),
+        lambda moved: {"dinks": Bank.dinks + moved, "invested": Bank.invested - moved},
+    )
 
 
 async def add_dinks(session: AsyncSession, user_id: int, amount: int):
     """Increase the Dinks counter for a user"""
-    bank = await get_bank(session, user_id)
-    bank.dinks += amount
-    session.add(bank)
+    await users.ensure_user_exists(session, user_id)
+
+    statement = (
+        update(Bank)
+        .where(Bank.user_id == user_id)
+        .values(dinks=Bank.dinks + amount)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(statement)
     await session.commit()
 
 
 async def claim_nightly(session: AsyncSession, user_id: int):
     """Claim daily Dinks"""
-    nightly_data = await get_nightly_data(session, user_id)
+    await users.ensure_user_exists(session, user_id)
 
     now = date.today()
 
-    if nightly_data.last_nightly is not None and nightly_data.last_nightly == now:
+    # Only claim it if it hasn't been claimed yet today
+    claimed = (
+        update(NightlyData)
+        .where(NightlyData.user_id == user_id)
+        .where(or_(NightlyData.last_nightly.is_(None), NightlyData.last_nightly != now))
+        .values(last_nightly=now)
+        .returning(NightlyData.user_id)
+        .cte("claimed")
+    )
+
+    statement = (
+        update(Bank)
+        .where(Bank.user_id == claimed.c.user_id)
+        .values(dinks=Bank.dinks + NIGHTLY_AMOUNT)
+        .returning(Bank.bank_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    result = (await session.execute(statement)).scalar_one_or_none()
+    await session.commit()
+
+    if result is None:
         raise exceptions.DoubleNightly
 
-    bank = await get_bank(session, user_id)
-    bank.dinks += NIGHTLY_AMOUNT
-    nightly_data.last_nightly = now
 
-    session.add(bank)
-    session.add(nightly_data)
-    await session.commit()
+async def _upgrade(
+    session: AsyncSession,
+    user_id: int,
+    level: Union[ColumnElement[int], InstrumentedAttribute[int]],
+    upgrade: tuple[int, float],
+) -> int:
+    """Upgrade one of the levels of a bank, if the user can afford it
 
+    Returns the new level
+    """
+    await users.ensure_user_exists(session, user_id)
 
-async def upgrade_capacity(session: AsyncSession, user_id: int) -> int:
-    """Upgrade capacity level"""
-    bank = await get_bank(session, user_id)
-    upgrade_price = capacity_upgrade_price(bank.capacity_level)
+    upgrade_price = upgrade_price_expression(upgrade, level)
+
+    statement = (
+        update(Bank)
+        .where(Bank.user_id == user_id)
+        .where(Bank.dinks >= upgrade_price)
+        .values({Bank.dinks: Bank.dinks - upgrade_price, level: level + 1})
+        .returning(level)
+        .execution_options(synchronize_session=False)
+    )
+
+    new_level = (await session.execute(statement)).scalar_one_or_none()
+    await session.commit()
 
     # Can't afford this upgrade
-    if upgrade_price > bank.dinks:
+    if new_level is None:
         raise exceptions.NotEnoughDinks
 
-    bank.dinks -= upgrade_price
-    bank.capacity_level += 1
+    return new_level
 
-    session.add(bank)
-    await session.commit()
 
-    return bank.capacity_level
+async def upgrade_capacity(session: AsyncSession, user_id: int) -> int:
+    """Upgrade capacity level"""
+    return await _upgrade(session, user_id, Bank.capacity_level, CAPACITY_UPGRADE)
 
 
 async def upgrade_interest(session: AsyncSession, user_id: int) -> int:
     """Upgrade interest level"""
-    bank = await get_bank(session, user_id)
-    upgrade_price = interest_upgrade_price(bank.interest_level)
-
-    # Can't afford this upgrade
-    if upgrade_price > bank.dinks:
-        raise exceptions.NotEnoughDinks
-
-    bank.dinks -= upgrade_price
-    bank.interest_level += 1
-
-    session.add(bank)
-    await session.commit()
-
-    return bank.interest_level
+    return await _upgrade(session, user_id, Bank.interest_level, INTEREST_UPGRADE)
 
 
 async def upgrade_rob(session: AsyncSession, user_id: int) -> int:
     """Upgrade rob level"""
-    bank = await get_bank(session, user_id)
-    upgrade_price = rob_upgrade_price(bank.rob_level)
-
-    # Can't afford this upgrade
-    if upgrade_price > bank.dinks:
-        raise exceptions.NotEnoughDinks
-
-    bank.dinks -= upgrade_price
-    bank.rob_level += 1
-
-    session.add(bank)
-    await session.commit()
-
-    return bank.rob_level
+    return await _upgrade(session, user_id, Bank.rob_level, ROB_UPGRADE)
 
 
 async def gamble_dinks(
     session: AsyncSession, user_id: int, amount: Union[str, int], payout_factor: int, won: bool
 ) -> int:
     """Gamble some of your Dinks"""
-    bank = await get_bank(session, user_id)
-    if amount == "all":
-        amount = bank.dinks
-
-    amount = min(int(amount), bank.dinks)
-
     sign = 1 if won else -1
     factor = (payout_factor - 1) if won else 1
-    await add_dinks(session, user_id, sign * amount * factor)
+
+    # Don't allow gambling more dinks than you own
+    amount = await _move_dinks(
+        session,
+        user_id,
+        Bank.dinks,
+        _parse_amount(amount),
+        lambda moved: {"dinks": Bank.dinks + sign * factor * moved},
+    )
 
     return amount * factor
@@ -6,6 +6,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from database.exceptions.constraints import DuplicateInsertException
 from database.exceptions.not_found import NoResultFoundException
 from database.schemas import CustomCommand, CustomCommandAlias
+from database.utils.load_profiles import (
+    COMMAND_ALIAS_WITH_COMMAND,
+    COMMAND_WITH_ALIASES,
+)
 
 __all__ = [
     "clean_name",
@@ -57,8 +61,8 @@ async def create_alias(session: AsyncSession, command: str, alias: str) -> Custo
 
 
 async def get_all_commands(session: AsyncSession) -> list[CustomCommand]:
-    """Get a list of all commands"""
-    statement = select(CustomCommand)
+    """Get a list of all commands, along with their aliases"""
+    statement = select(CustomCommand).options(*COMMAND_WITH_ALIASES)
     return list((await session.execute(statement)).scalars().all())
 
 
@@ -77,7 +81,11 @@ async def get_command_by_name(session: AsyncSession, message: str) -> Optional[C
 
 async def get_command_by_alias(session: AsyncSession, message: str) -> Optional[CustomCommand]:
     """Try to get a command by its alias"""
-    statement = select(CustomCommandAlias).where(CustomCommandAlias.indexed_alias == message)
+    statement = (
+        select(CustomCommandAlias)
+        .where(CustomCommandAlias.indexed_alias == message)
+        .options(*COMMAND_ALIAS_WITH_COMMAND)
+    )
     alias = (await session.execute(statement)).scalar_one_or_none()
     if alias is None:
         return None
@@ -96,6 +104,7 @@ async def edit_command(
 
     if new_name is not None:
         command.name = new_name
+        command.indexed_name = clean_name(new_name)
     if new_response is not None:
         command.response = new_response
 
@@ -5,9 +5,9 @@ from zoneinfo import ZoneInfo
 from dateutil.parser import parse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from database.schemas import Deadline, UforaCourse
+from database.utils.load_profiles import DEADLINE_WITH_COURSE
 
 __all__ = ["add_deadline", "get_deadlines"]
 
@@ -37,5 +37,5 @@ async def get_deadlines(
     if course is not None:
         statement = statement.where(Deadline.course_id == course.course_id)
 
-    statement = statement.options(selectinload(Deadline.course))
+    statement = statement.options(*DEADLINE_WITH_COURSE)
     return list((await session.execute(statement)).scalars().all())
@@ -3,7 +3,7 @@ from typing import Optional
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.crud.users import get_or_add_user
+from database.crud.users import ensure_user_exists
 from database.enums import ReminderCategory
 from database.schemas import Reminder
 
@@ -21,7 +21,7 @@ async def toggle_reminder(session: AsyncSession, user_id: int, category: Reminde
 
     Returns the new value for the category
     """
-    await get_or_add_user(session, user_id)
+    await ensure_user_exists(session, user_id)
 
     select_statement = select(Reminder).where(Reminder.user_id == user_id).where(Reminder.category == category)
     reminder: Optional[Reminder] = (await session.execute(select_statement)).scalar_one_or_none()
@@ -8,7 +8,13 @@ from database.enums import TaskType
 from database.schemas import Task
 from database.utils.datetime import LOCAL_TIMEZONE
 
-__all__ = ["get_task_by_enum", "set_last_task_execution_time"]
+__all__ = ["get_all_tasks", "get_task_by_enum", "set_last_task_execution_time", "set_task_execution_times"]
+
+
+async def get_all_tasks(session: AsyncSession) -> list[Task]:
+    """Get all tasks that have ever been executed or scheduled"""
+    statement = select(Task)
+    return list((await session.execute(statement)).scalars().all())
 
 
 async def get_task_by_enum(session: AsyncSession, task: TaskType) -> Optional[Task]:
@@ -22,11 +28,30 @@ async def get_task_by_enum(session: AsyncSession, task: TaskType) -> Optional[Ta
 
 async def set_last_task_execution_time(session: AsyncSession, task: TaskType):
     """Set the last time a specific task was executed"""
+    await set_task_execution_times(session, task, previous_run=datetime.datetime.now(tz=LOCAL_TIMEZONE))
+
+
+async def set_task_execution_times(
+    session: AsyncSession,
+    task: TaskType,
+    *,
+    previous_run: Optional[datetime.datetime] = None,
+    next_run: Optional[datetime.datetime] = None,
+):
+    """Set the last time a specific task was executed, and/or the next time it should be executed
+
+    Values that are None are left unchanged
+    """
     _task = await get_task_by_enum(session, task)
 
     if _task is None:
         _task = Task(task=task)
 
-    _task.previous_run = datetime.datetime.now(tz=LOCAL_TIMEZONE)
+    if previous_run is not None:
+        _task.previous_run = previous_run
+
+    if next_run is not None:
+        _task.next_run = next_run
+
     session.add(_task)
     await session.commit()
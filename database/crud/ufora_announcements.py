@@ -1,16 +1,24 @@
 import datetime
+from typing import Iterable
 
 from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.schemas import UforaAnnouncement, UforaCourse
+from database.utils.load_profiles import COURSE_WITH_ANNOUNCEMENTS
 
-__all__ = ["create_new_announcement", "get_courses_with_announcements", "remove_old_announcements"]
+__all__ = [
+    "add_announcements",
+    "create_new_announcement",
+    "get_courses_with_announcements",
+    "remove_old_announcements",
+]
 
 
 async def get_courses_with_announcements(session: AsyncSession) -> list[UforaCourse]:
-    """Get all courses where announcements are enabled"""
-    statement = select(UforaCourse).where(UforaCourse.log_announcements)
+    """Get all courses where announcements are enabled, along with their announcements"""
+    statement = select(UforaCourse).where(UforaCourse.log_announcements).options(*COURSE_WITH_ANNOUNCEMENTS)
     return list((await session.execute(statement)).scalars().all())
 
 
@@ -26,6 +34,25 @@ async def create_new_announcement(
     return new_announcement
 
 
+async def add_announcements(session: AsyncSession, announcements: Iterable[tuple[int, int, datetime.datetime]]):
+    """Add a batch of announcements to the database in one statement
+
+    Every announcement is a tuple of (announcement id, course id, publication date). Announcements
+    that are already in the database are skipped.
+    """
+    values = [
+        {"announcement_id": announcement_id, "course_id": course_id, "publication_date": publication_date}
+        for announcement_id, course_id, publication_date in announcements
+    ]
+
+    if not values:
+        return
+
+    statement = pg_insert(UforaAnnouncement).values(values).on_conflict_do_nothing(index_elements=["announcement_id"])
+    await session.execute(statement)
+    await session.commit()
+
+
 async def remove_old_announcements(session: AsyncSession):
     """Delete all announcements that are > 8 days old
 
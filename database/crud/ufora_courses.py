@@ -1,16 +1,17 @@
-from typing import Optional
+from typing import Iterable, Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.schemas import UforaCourse, UforaCourseAlias
+from database.utils.load_profiles import COURSE_ALIAS_WITH_COURSE, COURSE_WITH_ALIASES
 
-__all__ = ["get_all_courses", "get_course_by_code", "get_course_by_name"]
+__all__ = ["get_all_courses", "get_course_by_code", "get_course_by_name", "get_courses_by_codes"]
 
 
 async def get_all_courses(session: AsyncSession) -> list[UforaCourse]:
-    """Get a list of all courses in the database"""
-    statement = select(UforaCourse)
+    """Get a list of all courses in the database, along with their aliases"""
+    statement = select(UforaCourse).options(*COURSE_WITH_ALIASES)
     return list((await session.execute(statement)).scalars().all())
 
 
@@ -20,6 +21,16 @@ async def get_course_by_code(session: AsyncSession, code: str) -> Optional[Ufora
     return (await session.execute(statement)).scalar_one_or_none()
 
 
+async def get_courses_by_codes(session: AsyncSession, codes: Iterable[str]) -> list[UforaCourse]:
+    """Find all courses that match any of the given codes at once"""
+    codes = set(codes)
+    if not codes:
+        return []
+
+    statement = select(UforaCourse).where(UforaCourse.code.in_(codes))
+    return list((await session.execute(statement)).scalars().all())
+
+
 async def get_course_by_name(session: AsyncSession, query: str) -> Optional[UforaCourse]:
     """Try to find a course by its name
 
@@ -33,6 +44,8 @@ async def get_course_by_name(session: AsyncSession, query: str) -> Optional[Ufor
     if course_result:
         return course_result
 
-    alias_statement = select(UforaCourseAlias).where(UforaCourseAlias.alias.ilike(f"%{query}%"))
+    alias_statement = (
+        select(UforaCourseAlias).where(UforaCourseAlias.alias.ilike(f"%{query}%")).options(*COURSE_ALIAS_WITH_COURSE)
+    )
     alias_result = (await session.execute(alias_statement)).scalars().first()
     return alias_result.course if alias_result else None
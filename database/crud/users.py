@@ -1,47 +1,149 @@
-from typing import Optional
+from collections import OrderedDict
+from typing import Iterable, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from database.schemas import Bank, NightlyData, User
 
 __all__ = [
+    "KnownUsers",
+    "ensure_user_exists",
     "get_or_add_user",
+    "known_users",
+    "provision_users",
 ]
 
 
-async def get_or_add_user(session: AsyncSession, user_id: int, *, options: Optional[list] = None) -> User:
-    """Get a user's profile
+class KnownUsers:
+    """Bounded LRU-cache of the ids of users that are known to exist in the database
 
-    If it doesn't exist yet, create it (along with all linked datastructures)
+    Users are never removed from the database, so once a user is known to exist
+    there is no need to look them up again just to satisfy a foreign key
     """
-    if options is None:
-        options = []
 
-    statement = select(User).where(User.user_id == user_id).options(*options)
+    max_size: int
+    hits: int
+    misses: int
+    _ids: OrderedDict[int, None]
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._ids = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, user_ids: Iterable[int]):
+        """Mark users as existing"""
+        for user_id in user_ids:
+            self._ids[user_id] = None
+            self._ids.move_to_end(user_id)
+
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+    def clear(self):
+        """Forget about all users & reset the counters"""
+        self._ids.clear()
+        self.hits = 0
+        self.misses = 0
 
-    user: Optional[User] = (await session.execute(statement)).scalar_one_or_none()
+    def is_known(self, user_id: int) -> bool:
+        """Check if a user is known to exist"""
+        if user_id not in self._ids:
+            self.misses += 1
+            return False
 
-    # User exists
-    if user is not None:
-        return user
+        self.hits += 1
+        self._ids.move_to_end(user_id)
+        return True
 
-    # Create new user
-    user = User(user_id=user_id)
-    session.add(user)
-    await session.commit()
 
-    # Add bank & nightly info
-    bank = Bank(user_id=user_id)
-    nightly_data = NightlyData(user_id=user_id)
-    user.bank = bank
-    user.nightly_data = nightly_data
+known_users = KnownUsers()
 
-    session.add(bank)
-    session.add(nightly_data)
-    session.add(user)
+# Key in Session.info of the users that were provisioned in the current transaction
+_PROVISIONED_USERS = "provisioned_users"
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_provisioned_users(session: Session):
+    """Users only exist once the transaction that created them was committed"""
+    provisioned = session.info.pop(_PROVISIONED_USERS, None)
+    if provisioned:
+        known_users.add(provisioned)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_provisioned_users(session: Session, _previous_transaction):
+    """Users that were created in a transaction that was rolled back don't exist"""
+    session.info.pop(_PROVISIONED_USERS, None)
+
+
+async def provision_users(session: AsyncSession, user_ids: Iterable[int]) -> list[int]:
+    """Create users (along with all linked datastructures) that don't exist yet
+
+    Everything is inserted using one single statement, so this only costs one round trip.
+    Users that already exist (or are being created concurrently) are skipped, which makes
+    this safe to call multiple times for the same user.
+
+    This does not commit the session.
+
+    Returns the ids of the users that were created
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return []
 
-    await session.commit()
-    await session.refresh(user)
+    # Only the users that were actually inserted are returned, the others already existed
+    new_users = (
+        pg_insert(User)
+        .values([{"user_id": user_id} for user_id in user_ids])
+        .on_conflict_do_nothing()
+        .returning(User.user_id)
+        .cte("new_users")
+    )
 
-    return user
+    new_banks = insert(Bank).from_select(["user_id"], select(new_users.c.user_id)).cte("new_banks")
+
+    statement = (
+        insert(NightlyData)
+        .from_select(["user_id"], select(new_users.c.user_id))
+        .add_cte(new_banks)
+        .returning(NightlyData.user_id)
+    )
+
+    return list((await session.execute(statement)).scalars().all())
+
+
+async def ensure_user_exists(session: AsyncSession, user_id: int):
+    """Make sure that a user exists, without loading their profile
+
+    This should be used when the user is only required as a foreign key
+
+    This does not commit the session, the user is created along with the rest of the caller's
+    changes. Only once those are committed, the user is remembered to exist.
+    """
+    if known_users.is_known(user_id):
+        return
+
+    await provision_users(session, [user_id])
+    session.info.setdefault(_PROVISIONED_USERS, set()).add(user_id)
+
+
+async def get_or_add_user(session: AsyncSession, user_id: int, *, options: Optional[Sequence] = None) -> User:
+    """Get a user's profile
+
+    If it doesn't exist yet, create it (along with all linked datastructures)
+    """
+    if options is None:
+        options = []
+
+    await ensure_user_exists(session, user_id)
+
+    statement = select(User).where(User.user_id == user_id).options(*options)
+    return (await session.execute(statement)).scalar_one()
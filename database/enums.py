@@ -15,3 +15,4 @@ class TaskType(enum.IntEnum):
     BIRTHDAYS = enum.auto()
     SCHEDULES = enum.auto()
     UFORA_ANNOUNCEMENTS = enum.auto()
+    REMINDERS = enum.auto()
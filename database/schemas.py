@@ -36,7 +36,11 @@ __all__ = [
 
 
 class Base(DeclarativeBase):
-    """Required base class for all tables"""
+    """Required base class for all tables
+
+    Relationships are never loaded eagerly by default. Queries that need them
+    should opt in using one of the profiles in database.utils.load_profiles
+    """
 
     # Make all DateTimes timezone-aware
     type_annotation_map = {datetime: DateTime(timezone=True)}
@@ -62,7 +66,7 @@ class Bank(Base):
     # Maximum amount that can be robbed
     rob_level: Mapped[int] = mapped_column(server_default="1", nullable=False)
 
-    user: Mapped[User] = relationship(uselist=False, back_populates="bank", lazy="selectin")
+    user: Mapped[User] = relationship(uselist=False, back_populates="bank")
 
 
 class Birthday(Base):
@@ -74,7 +78,7 @@ class Birthday(Base):
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.user_id"))
     birthday: Mapped[date] = mapped_column(nullable=False)
 
-    user: Mapped[User] = relationship(uselist=False, back_populates="birthday", lazy="selectin")
+    user: Mapped[User] = relationship(uselist=False, back_populates="birthday")
 
 
 class Bookmark(Base):
@@ -88,7 +92,7 @@ class Bookmark(Base):
     jump_url: Mapped[str] = mapped_column(nullable=False)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.user_id"))
 
-    user: Mapped[User] = relationship(back_populates="bookmarks", uselist=False, lazy="selectin")
+    user: Mapped[User] = relationship(back_populates="bookmarks", uselist=False)
 
 
 class CommandStats(Base):
@@ -102,7 +106,7 @@ class CommandStats(Base):
     slash: Mapped[bool] = mapped_column(nullable=False)
     context_menu: Mapped[bool] = mapped_column(nullable=False)
 
-    user: Mapped[User] = relationship(back_populates="command_stats", uselist=False, lazy="selectin")
+    user: Mapped[User] = relationship(back_populates="command_stats", uselist=False)
 
 
 class CustomCommand(Base):
@@ -116,7 +120,7 @@ class CustomCommand(Base):
     response: Mapped[str] = mapped_column(nullable=False)
 
     aliases: Mapped[List[CustomCommandAlias]] = relationship(
-        back_populates="command", uselist=True, cascade="all, delete-orphan", lazy="selectin"
+        back_populates="command", uselist=True, cascade="all, delete-orphan"
     )
 
 
@@ -130,7 +134,7 @@ class CustomCommandAlias(Base):
     indexed_alias: Mapped[str] = mapped_column(nullable=False, index=True)
     command_id: Mapped[int] = mapped_column(ForeignKey("custom_commands.command_id"))
 
-    command: Mapped[CustomCommand] = relationship(back_populates="aliases", uselist=False, lazy="selectin")
+    command: Mapped[CustomCommand] = relationship(back_populates="aliases", uselist=False)
 
 
 class DadJoke(Base):
@@ -152,7 +156,7 @@ class Deadline(Base):
     name: Mapped[str] = mapped_column(nullable=False)
     deadline: Mapped[datetime] = mapped_column(nullable=False)
 
-    course: Mapped[UforaCourse] = relationship(back_populates="deadlines", uselist=False, lazy="selectin")
+    course: Mapped[UforaCourse] = relationship(back_populates="deadlines", uselist=False)
 
 
 class EasterEgg(Base):
@@ -196,7 +200,7 @@ class GitHubLink(Base):
     url: Mapped[str] = mapped_column(nullable=False, unique=True)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.user_id"))
 
-    user: Mapped[User] = relationship(back_populates="github_links", uselist=False, lazy="selectin")
+    user: Mapped[User] = relationship(back_populates="github_links", uselist=False)
 
 
 class Link(Base):
@@ -230,7 +234,7 @@ class NightlyData(Base):
     last_nightly: Mapped[Optional[date]] = mapped_column(nullable=True)
     count: Mapped[int] = mapped_column(server_default="0", nullable=False)
 
-    user: Mapped[User] = relationship(back_populates="nightly_data", uselist=False, lazy="selectin")
+    user: Mapped[User] = relationship(back_populates="nightly_data", uselist=False)
 
 
 class Reminder(Base):
@@ -242,7 +246,7 @@ class Reminder(Base):
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.user_id"))
     category: Mapped[enums.ReminderCategory] = mapped_column(nullable=False)
 
-    user: Mapped[User] = relationship(back_populates="reminders", uselist=False, lazy="selectin")
+    user: Mapped[User] = relationship(back_populates="reminders", uselist=False)
 
 
 class Task(Base):
@@ -253,6 +257,7 @@ class Task(Base):
     task_id: Mapped[int] = mapped_column(primary_key=True)
     task: Mapped[enums.TaskType] = mapped_column(nullable=False, unique=True)
     previous_run: Mapped[datetime] = mapped_column(nullable=True)
+    next_run: Mapped[Optional[datetime]] = mapped_column(nullable=True)
 
 
 class UforaCourse(Base):
@@ -271,15 +276,9 @@ class UforaCourse(Base):
     alternative_overarching_role_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True, unique=False)
     log_announcements: Mapped[bool] = mapped_column(server_default="0", nullable=False)
 
-    announcements: Mapped[List[UforaAnnouncement]] = relationship(
-        back_populates="course", cascade="all, delete-orphan", lazy="selectin"
-    )
-    aliases: Mapped[List[UforaCourseAlias]] = relationship(
-        back_populates="course", cascade="all, delete-orphan", lazy="selectin"
-    )
-    deadlines: Mapped[List[Deadline]] = relationship(
-        back_populates="course", cascade="all, delete-orphan", lazy="selectin"
-    )
+    announcements: Mapped[List[UforaAnnouncement]] = relationship(back_populates="course", cascade="all, delete-orphan")
+    aliases: Mapped[List[UforaCourseAlias]] = relationship(back_populates="course", cascade="all, delete-orphan")
+    deadlines: Mapped[List[Deadline]] = relationship(back_populates="course", cascade="all, delete-orphan")
 
 
 class UforaCourseAlias(Base):
@@ -291,7 +290,7 @@ class UforaCourseAlias(Base):
     alias: Mapped[str] = mapped_column(nullable=False, unique=True)
     course_id: Mapped[int] = mapped_column(ForeignKey("ufora_courses.course_id"))
 
-    course: Mapped[UforaCourse] = relationship(back_populates="aliases", uselist=False, lazy="selectin")
+    course: Mapped[UforaCourse] = relationship(back_populates="aliases", uselist=False)
 
 
 class UforaAnnouncement(Base):
@@ -303,7 +302,7 @@ class UforaAnnouncement(Base):
     course_id: Mapped[int] = mapped_column(ForeignKey("ufora_courses.course_id"))
     publication_date: Mapped[date] = mapped_column()
 
-    course: Mapped[UforaCourse] = relationship(back_populates="announcements", uselist=False, lazy="selectin")
+    course: Mapped[UforaCourse] = relationship(back_populates="announcements", uselist=False)
 
 
 class User(Base):
@@ -313,24 +312,16 @@ class User(Base):
 
     user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
 
-    bank: Mapped[Bank] = relationship(
-        back_populates="user", uselist=False, lazy="selectin", cascade="all, delete-orphan"
-    )
+    bank: Mapped[Bank] = relationship(back_populates="user", uselist=False, cascade="all, delete-orphan")
     birthday: Mapped[Optional[Birthday]] = relationship(
-        back_populates="user", uselist=False, lazy="selectin", cascade="all, delete-orphan"
-    )
-    bookmarks: Mapped[List[Bookmark]] = relationship(
-        back_populates="user", uselist=True, lazy="selectin", cascade="all, delete-orphan"
+        back_populates="user", uselist=False, cascade="all, delete-orphan"
     )
+    bookmarks: Mapped[List[Bookmark]] = relationship(back_populates="user", uselist=True, cascade="all, delete-orphan")
     command_stats: Mapped[List[CommandStats]] = relationship(
-        back_populates="user", uselist=True, lazy="selectin", cascade="all, delete-orphan"
+        back_populates="user", uselist=True, cascade="all, delete-orphan"
     )
     github_links: Mapped[List[GitHubLink]] = relationship(
-        back_populates="user", uselist=True, lazy="selectin", cascade="all, delete-orphan"
-    )
-    nightly_data: Mapped[NightlyData] = relationship(
-        back_populates="user", uselist=False, lazy="selectin", cascade="all, delete-orphan"
-    )
-    reminders: Mapped[List[Reminder]] = relationship(
-        back_populates="user", uselist=True, lazy="selectin", cascade="all, delete-orphan"
+        back_populates="user", uselist=True, cascade="all, delete-orphan"
     )
+    nightly_data: Mapped[NightlyData] = relationship(back_populates="user", uselist=False, cascade="all, delete-orphan")
+    reminders: Mapped[List[Reminder]] = relationship(back_populates="user", uselist=True, cascade="all, delete-orphan")
@@ -1,13 +1,27 @@
+import logging
+import re
 from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional, Union
 
 from discord import app_commands
 from overrides import overrides
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.crud import easter_eggs, links, memes, ufora_courses
-from database.schemas import EasterEgg
+from database.crud import custom_commands, easter_eggs, links, memes, ufora_courses
+from database.schemas import CustomCommand, CustomCommandAlias, EasterEgg
 
-__all__ = ["CacheManager", "EasterEggCache", "LinkCache", "UforaCourseCache"]
+__all__ = [
+    "CacheManager",
+    "CustomCommandCache",
+    "EasterEggCache",
+    "EasterEggPattern",
+    "LinkCache",
+    "UforaCourseCache",
+    "compile_easter_eggs",
+]
+
+
+logger = logging.getLogger(__name__)
 
 
 class DatabaseCache(ABC):
@@ -45,20 +59,200 @@ class DatabaseCache(ABC):
         return [app_commands.Choice(name=suggestion, value=suggestion.lower()) for suggestion in suggestions]
 
 
+class CustomCommandCache(DatabaseCache):
+    """Cache to store the responses of custom commands
+
+    Maps the cleaned names & aliases of all commands to their responses, so messages
+    that don't invoke any command never have to go to the database.
+
+    Instead of invalidating the entire cache on every change, commands & aliases
+    are added in-place after they were written to the database.
+    """
+
+    # Cleaned name or alias -> command id
+    keys: dict[str, int] = {}
+    # Command id -> cleaned name
+    names: dict[int, str] = {}
+    # Command id -> response
+    responses: dict[int, str] = {}
+
+    @overrides
+    def clear(self):
+        self.keys = {}
+        self.names = {}
+        self.responses = {}
+        super().clear()
+
+    @overrides
+    async def invalidate(self, database_session: AsyncSession):
+        self.clear()
+
+        for command in await custom_commands.get_all_commands(database_session):
+            self.add_command(command)
+
+            for alias in command.aliases:
+                self.add_alias(alias)
+
+    def add_command(self, command: CustomCommand):
+        """Add a newly-created command"""
+        self.keys[command.indexed_name] = command.command_id
+        self.names[command.command_id] = command.indexed_name
+        self.responses[command.command_id] = command.response
+
+    def add_alias(self, alias: CustomCommandAlias):
+        """Add a newly-created alias"""
+        self.keys[alias.indexed_alias] = alias.command_id
+
+    def edit_command(self, command: CustomCommand):
+        """Update a command after it was edited"""
+        previous_name = self.names.get(command.command_id)
+        if previous_name is not None:
+            self.keys.pop(previous_name, None)
+
+        self.add_command(command)
+
+    def get_response(self, message: str) -> Optional[str]:
+        """Try to find the response to a command, by its name or one of its aliases"""
+        command_id = self.keys.get(custom_commands.clean_name(message))
+        if command_id is None:
+            return None
+
+        return self.responses.get(command_id)
+
+
+# Inline flags at the very start of a pattern, like (?i)
+_LEADING_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+# Constructs that refer to other groups by their number or name
+_GROUP_REFERENCE = re.compile(r"\\(?:[1-9]|g<)|\(\?P=|\(\?\(")
+
+
+class EasterEggPattern(NamedTuple):
+    """A compiled pattern for one or more easter eggs
+
+    Patterns of multiple easter eggs map the name of the group that matched to its response,
+    patterns of a single easter egg always have the same response
+    """
+
+    pattern: re.Pattern
+    responses: Union[dict[str, str], str]
+
+    def match(self, content: str) -> Optional[str]:
+        """Find the response of the easter egg that matches a message"""
+        matched = self.pattern.match(content)
+        if matched is None:
+            return None
+
+        if isinstance(self.responses, str):
+            return self.responses
+
+        if matched.lastgroup is None:
+            return None
+
+        return self.responses.get(matched.lastgroup)
+
+
+def _create_fragment(easter_egg: EasterEgg) -> str:
+    """Turn the pattern of an easter egg into a pattern that is matched at the start of the string"""
+    pattern = easter_egg.match
+
+    # Flags can only be set at the start of a pattern, so turn them into a scoped group
+    flags = _LEADING_FLAGS.match(pattern)
+    if flags is not None:
+        pattern = f"(?{flags[1]}:{pattern[flags.end():]})"
+
+    if easter_egg.exact:
+        return rf"(?:{pattern})$"
+
+    if easter_egg.startswith:
+        return rf"(?:{pattern})"
+
+    return rf"(?s:.*?)(?:{pattern})"
+
+
+def _combine(batch: list[tuple[str, str]]) -> list[EasterEggPattern]:
+    """Combine the fragments of multiple easter eggs into one pattern
+
+    If this fails anyway, every easter egg gets a pattern of its own instead
+    """
+    if not batch:
+        return []
+
+    alternatives = [f"(?P<egg_{index}>{fragment})" for index, (fragment, _) in enumerate(batch)]
+    responses = {f"egg_{index}": response for index, (_, response) in enumerate(batch)}
+
+    try:
+        return [EasterEggPattern(re.compile("|".join(alternatives)), responses)]
+    except re.error:
+        logger.warning("Unable to combine easter eggs, matching them one by one instead.")
+        return [EasterEggPattern(re.compile(fragment), response) for fragment, response in batch]
+
+
+def compile_easter_eggs(eggs: list[EasterEgg]) -> list[EasterEggPattern]:
+    """Compile a list of easter eggs into as few patterns as possible
+
+    Every easter egg becomes a named group in one big alternation, and the pattern is
+    always matched at the start of the string. Non-anchored eggs are prefixed with a lazy
+    wildcard so they can still match anywhere. As the alternatives are tried in order,
+    the first easter egg in the list still wins, just like when checking them one by one.
+
+    Easter eggs that use named groups or refer to other groups would clash with the
+    groups around them, so these get a pattern of their own (in the same position).
+    """
+    patterns: list[EasterEggPattern] = []
+    batch: list[tuple[str, str]] = []
+
+    for easter_egg in eggs:
+        fragment = _create_fragment(easter_egg)
+
+        # Don't let one broken pattern take down all the others
+        try:
+            compiled = re.compile(fragment)
+        except re.error:
+            logger.warning(f"Skipping easter egg with invalid pattern {easter_egg.match!r}.")
+            continue
+
+        if not compiled.groupindex and _GROUP_REFERENCE.search(fragment) is None:
+            batch.append((fragment, easter_egg.response))
+            continue
+
+        patterns.extend(_combine(batch))
+        batch = []
+        patterns.append(EasterEggPattern(compiled, easter_egg.response))
+
+    patterns.extend(_combine(batch))
+    return patterns
+
+
 class EasterEggCache(DatabaseCache):
-    """Cache to store easter eggs invoked by messages"""
+    """Cache to store easter eggs invoked by messages
+
+    The easter eggs are compiled into (usually) a single pattern, so matching a message
+    only takes one regex call no matter how many there are
+    """
 
     easter_eggs: list[EasterEgg] = []
+    patterns: list[EasterEggPattern] = []
 
     @overrides
     async def clear(self):
         self.easter_eggs.clear()
+        self.patterns = []
 
     @overrides
     async def invalidate(self, database_session: AsyncSession):
         """Invalidate the data stored in this cache"""
         await self.clear()
         self.easter_eggs = await easter_eggs.get_all_easter_eggs(database_session)
+        self.patterns = compile_easter_eggs(self.easter_eggs)
+
+    def match(self, content: str) -> Optional[str]:
+        """Find the response of the first easter egg that matches a message"""
+        for pattern in self.patterns:
+            response = pattern.match(content)
+            if response is not None:
+                return response
+
+        return None
 
 
 class LinkCache(DatabaseCache):
@@ -135,12 +329,14 @@ class UforaCourseCache(DatabaseCache):
 class CacheManager:
     """Class that keeps track of all caches"""
 
+    custom_commands: CustomCommandCache
     easter_eggs: EasterEggCache
     links: LinkCache
     memes: MemeCache
     ufora_courses: UforaCourseCache
 
     def __init__(self):
+        self.custom_commands = CustomCommandCache()
         self.easter_eggs = EasterEggCache()
         self.links = LinkCache()
         self.memes = MemeCache()
@@ -148,6 +344,7 @@ class CacheManager:
 
     async def initialize_caches(self, postgres_session: AsyncSession):
         """Initialize the contents of all caches"""
+        await self.custom_commands.invalidate(postgres_session)
         await self.easter_eggs.invalidate(postgres_session)
         await self.links.invalidate(postgres_session)
         await self.memes.invalidate(postgres_session)
@@ -0,0 +1,156 @@
+import asyncio
+import contextlib
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.crud.command_stats import CommandInvocation, register_command_invocations
+
+__all__ = ["CommandStatsBuffer"]
+
+
+logger = logging.getLogger(__name__)
+
+
+class CommandStatsBuffer:
+    """Write-behind buffer for command invocations
+
+    Instead of writing every invocation to the database separately, they are collected in memory
+    and flushed all at once. This happens periodically, or as soon as the buffer grows too large.
+
+    The buffer is flushed one last time when it's closed, so no stats are lost when shutting down.
+
+    If flushing fails, the invocations are kept around to try again later. Full buffers aren't
+    flushed again until the next periodic flush, and once the buffer holds more than max_pending
+    invocations, the oldest ones are dropped.
+    """
+
+    flush_interval: float
+    max_size: int
+    max_pending: int
+
+    _session_factory: Callable[[], AsyncSession]
+    _pending: list[CommandInvocation]
+    _lock: asyncio.Lock
+    _task: Optional[asyncio.Task]
+    _flush_tasks: set[asyncio.Task]
+    # Full buffers aren't flushed in the background before this moment (in event loop time)
+    _retry_at: float
+    # Invocations that were dropped since the last successful flush
+    _dropped: int
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        flush_interval: float = 60,
+        max_size: int = 50,
+        max_pending: int = 5000,
+    ):
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.max_pending = max_pending
+
+        self._session_factory = session_factory
+        self._pending = []
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._flush_tasks = set()
+        self._retry_at = 0
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        """Start flushing periodically"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        """Stop flushing periodically, and write everything that is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+
+            # Wait for it to stop, so that a flush it was doing can put its invocations back
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+            self._task = None
+
+        # Let flushes that were started because the buffer was full finish
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+        await self.flush()
+
+    def add(self, invocation: Optional[CommandInvocation]):
+        """Add a new invocation to the buffer
+
+        If the buffer is full, it's flushed in the background
+        """
+        if invocation is None:
+            return
+
+        self._pending.append(invocation)
+        self._drop_oldest()
+
+        if (
+            len(self._pending) >= self.max_size
+            and not self._lock.locked()
+            and asyncio.get_running_loop().time() >= self._retry_at
+        ):
+            # Keep a reference to the task, so it isn't garbage collected & can be awaited when closing
+            task = asyncio.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self):
+        """Write all pending invocations to the database"""
+        async with self._lock:
+            if not self._pending:
+                return
+
+            invocations, self._pending = self._pending, []
+            written = False
+
+            try:
+                async with self._session_factory() as session:
+                    await register_command_invocations(session, invocations)
+                    written = True
+            except Exception:
+                logger.exception(f"Unable to flush {len(invocations)} command invocations.")
+
+                # Don't try again for every new invocation while the database is unavailable
+                self._retry_at = asyncio.get_running_loop().time() + self.flush_interval
+            finally:
+                # Put them back so that they can be retried during the next flush,
+                # this also happens when the flush is cancelled halfway through
+                if not written:
+                    self._pending = invocations + self._pending
+                    self._drop_oldest()
+
+            if written:
+                self._retry_at = 0
+
+                if self._dropped:
+                    logger.warning(f"Dropped {self._dropped} command invocations because the buffer was full.")
+                    self._dropped = 0
+
+    def _drop_oldest(self):
+        """Drop the oldest invocations if there are too many of them"""
+        excess = len(self._pending) - self.max_pending
+        if excess <= 0:
+            return
+
+        if not self._dropped:
+            logger.warning("Command stats buffer is full, dropping the oldest invocations.")
+
+        del self._pending[:excess]
+        self._dropped += excess
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
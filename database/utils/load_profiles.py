@@ -0,0 +1,35 @@
+from sqlalchemy.orm import selectinload
+
+from database.schemas import (
+    CustomCommand,
+    CustomCommandAlias,
+    Deadline,
+    UforaCourse,
+    UforaCourseAlias,
+    User,
+)
+
+__all__ = [
+    "COMMAND_ALIAS_WITH_COMMAND",
+    "COMMAND_WITH_ALIASES",
+    "COURSE_ALIAS_WITH_COURSE",
+    "COURSE_WITH_ALIASES",
+    "COURSE_WITH_ANNOUNCEMENTS",
+    "DEADLINE_WITH_COURSE",
+    "USER_WITH_BIRTHDAY",
+]
+
+
+"""Named sets of loader options
+
+Relationships are not loaded unless a query explicitly asks for them, so
+every query only pulls in the related rows that it actually needs
+"""
+
+COMMAND_ALIAS_WITH_COMMAND = (selectinload(CustomCommandAlias.command),)
+COMMAND_WITH_ALIASES = (selectinload(CustomCommand.aliases),)
+COURSE_ALIAS_WITH_COURSE = (selectinload(UforaCourseAlias.course),)
+COURSE_WITH_ALIASES = (selectinload(UforaCourse.aliases),)
+COURSE_WITH_ANNOUNCEMENTS = (selectinload(UforaCourse.announcements),)
+DEADLINE_WITH_COURSE = (selectinload(Deadline.course),)
+USER_WITH_BIRTHDAY = (selectinload(User.birthday),)
@@ -1,27 +1,52 @@
 import math
+from typing import Union
 
-__all__ = ["capacity_upgrade_price", "interest_upgrade_price", "rob_upgrade_price"]
+from sqlalchemy import BigInteger, ColumnElement, Float, cast, func, literal
+from sqlalchemy.orm import InstrumentedAttribute
 
+__all__ = [
+    "capacity_upgrade_price",
+    "interest_upgrade_price",
+    "rob_upgrade_price",
+    "upgrade_price_expression",
+    "CAPACITY_UPGRADE",
+    "INTEREST_UPGRADE",
+    "ROB_UPGRADE",
+]
+
+
+# (base cost, growth rate) for every type of upgrade
+CAPACITY_UPGRADE = (800, 1.6)
+INTEREST_UPGRADE = (600, 1.8)
+ROB_UPGRADE = (950, 1.9)
 
-def interest_upgrade_price(level: int) -> int:
-    """Calculate the price to upgrade your interest level"""
-    base_cost = 600
-    growth_rate = 1.8
 
+def _upgrade_price(upgrade: tuple[int, float], level: int) -> int:
+    base_cost, growth_rate = upgrade
     return math.floor(base_cost * (growth_rate**level))
 
 
+def upgrade_price_expression(
+    upgrade: tuple[int, float], level: Union[ColumnElement[int], InstrumentedAttribute[int]]
+) -> ColumnElement[int]:
+    """Create an SQL expression that calculates the price of an upgrade in the database
+
+    This uses double precision, so that the result is the same as the one calculated in Python
+    """
+    base_cost, growth_rate = upgrade
+    return cast(func.floor(base_cost * func.power(literal(growth_rate, Float), level)), BigInteger)
+
+
+def interest_upgrade_price(level: int) -> int:
+    """Calculate the price to upgrade your interest level"""
+    return _upgrade_price(INTEREST_UPGRADE, level)
+
+
 def capacity_upgrade_price(level: int) -> int:
     """Calculate the price to upgrade your capacity level"""
-    base_cost = 800
-    growth_rate = 1.6
-
-    return math.floor(base_cost * (growth_rate**level))
+    return _upgrade_price(CAPACITY_UPGRADE, level)
 
 
 def rob_upgrade_price(level: int) -> int:
     """Calculate the price to upgrade your rob level"""
-    base_cost = 950
-    growth_rate = 1.9
-
-    return math.floor(base_cost * (growth_rate**level))
+    return _upgrade_price(ROB_UPGRADE, level)
@@ -5,7 +5,7 @@ from discord import app_commands
 from discord.ext import commands
 
 import settings
-from database.crud import custom_commands, links, memes, ufora_courses
+from database.crud import custom_commands, links, memes, ufora_courses, users
 from database.exceptions.constraints import DuplicateInsertException
 from database.exceptions.not_found import NoResultFoundException
 from didier import Didier
@@ -92,6 +92,48 @@ class Owner(commands.Cog):
 
         await ctx.reply(f"Successfully loaded {loaded_message} (skipped {skipped_message}).", mention_author=False)
 
+    @commands.command(name="Caches")
+    async def caches(self, ctx: commands.Context):
+        """Show how often the in-memory caches were hit"""
+        embed = discord.Embed(colour=discord.Colour.blue(), title="Caches")
+
+        caches = (
+            ("Known users", users.known_users.hits, users.known_users.misses, len(users.known_users)),
+            (
+                "Schedule embeds",
+                self.client.schedule_embeds.hits,
+                self.client.schedule_embeds.misses,
+                len(self.client.schedule_embeds),
+            ),
+        )
+
+        for name, hits, misses, size in caches:
+            lookups = hits + misses
+            hit_rate = f"{hits / lookups * 100:.1f}%" if lookups else "N/A"
+            embed.add_field(name=name, value=f"{size} entries\n{hits} hits\n{misses} misses\nhit rate {hit_rate}")
+
+        await ctx.reply(embed=embed, mention_author=False)
+
+    @commands.command(name="Pipeline")
+    async def pipeline(self, ctx: commands.Context, reset: Optional[Literal["reset"]] = None):
+        """Show how much time every stage of the message pipeline takes"""
+        if reset is not None:
+            self.client.message_pipeline.reset_timings()
+            return await self.client.confirm_message(ctx.message)
+
+        embed = discord.Embed(colour=discord.Colour.blue(), title="Message pipeline")
+
+        for name, timing in self.client.message_pipeline.timings.items():
+            embed.add_field(
+                name=name,
+                value=f"{timing.calls} calls\n"
+                f"avg {timing.average * 1000:.2f}ms\n"
+                f"max {timing.slowest * 1000:.2f}ms\n"
+                f"total {timing.total:.2f}s",
+            )
+
+        await ctx.reply(embed=embed, mention_author=False)
+
     @commands.command(name="Reload")
     async def reload(self, ctx: commands.Context, *cogs: str):
         """Reload the cogs passed as an argument"""
@@ -148,7 +190,8 @@ class Owner(commands.Cog):
         """Add a new alias for a custom command"""
         async with self.client.postgres_session as session:
             try:
-                await custom_commands.create_alias(session, command, alias)
+                alias_instance = await custom_commands.create_alias(session, command, alias)
+                self.client.database_caches.custom_commands.add_alias(alias_instance)
                 await self.client.confirm_message(ctx.message)
             except NoResultFoundException:
                 await ctx.reply(f"No command found matching `{command}`.")
@@ -162,7 +205,8 @@ class Owner(commands.Cog):
         """Add a new custom command"""
         async with self.client.postgres_session as session:
             try:
-                await custom_commands.create_command(session, name, response)
+                command_instance = await custom_commands.create_command(session, name, response)
+                self.client.database_caches.custom_commands.add_command(command_instance)
                 await self.client.confirm_message(ctx.message)
             except DuplicateInsertException:
                 await ctx.reply("There is already a command with this name.")
@@ -255,7 +299,8 @@ class Owner(commands.Cog):
         """Edit an existing custom command"""
         async with self.client.postgres_session as session:
             try:
-                await custom_commands.edit_command(session, command, flags.name, flags.response)
+                command_instance = await custom_commands.edit_command(session, command, flags.name, flags.response)
+                self.client.database_caches.custom_commands.edit_command(command_instance)
                 return await self.client.confirm_message(ctx.message)
             except NoResultFoundException:
                 await ctx.reply(f"No command found matching `{command}`.")
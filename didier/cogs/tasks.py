@@ -2,7 +2,9 @@ import asyncio
 import datetime
 import logging
 import random
+from typing import Any, Coroutine, Optional, Union
 
+import aiohttp
 import discord
 from discord.ext import commands, tasks  # type: ignore # Strange & incorrect Mypy error
 from overrides import overrides
@@ -16,14 +18,27 @@ from database.schemas import Reminder
 from didier import Didier
 from didier.data.embeds.schedules import (
     Schedule,
+    content_hash,
+    diff_schedules,
     get_schedule_for_day,
+    get_schedule_path,
+    get_snapshot_path,
+    parse_schedule,
     parse_schedule_from_content,
 )
 from didier.data.rss_feeds.free_games import fetch_free_games
-from didier.data.rss_feeds.ufora import fetch_ufora_announcements
+from didier.data.rss_feeds.poller import FeedPoller
+from didier.data.rss_feeds.ufora import UforaPollSchedule, fetch_ufora_announcements
 from didier.decorators.tasks import timed_task
 from didier.utils.discord.channels import NON_MESSAGEABLE_CHANNEL_TYPES
 from didier.utils.discord.checks import is_owner
+from didier.utils.discord.sender import BoundedSender
+from didier.utils.http.conditional import (
+    CacheValidators,
+    ConditionalResponse,
+    conditional_get,
+)
+from didier.utils.scheduler import Daily, ScheduledTask, TaskScheduler
 from didier.utils.types.datetime import LOCAL_TIMEZONE, tz_aware_now
 
 logger = logging.getLogger(__name__)
@@ -32,6 +47,9 @@ logger = logging.getLogger(__name__)
 DAILY_RESET_TIME = datetime.time(hour=0, minute=0, tzinfo=LOCAL_TIMEZONE)
 SOCIALLY_ACCEPTABLE_TIME = datetime.time(hour=7, minute=0, tzinfo=LOCAL_TIMEZONE)
 
+# Maximum amount of schedules that are downloaded at the same time
+SCHEDULE_FETCH_LIMIT = 3
+
 
 # TODO more messages?
 BIRTHDAY_MESSAGES = ["Gelukkige verjaardag {mention}!", "Happy birthday {mention}!"]
@@ -40,32 +58,43 @@ BIRTHDAY_MESSAGES = ["Gelukkige verjaardag {mention}!", "Happy birthday {mention
 class Tasks(commands.Cog):
     """Task loops that run periodically
 
-    Preferably these would use the new `time`-kwarg, but these don't run
-    on startup, which is not ideal. This means we still have to run them every hour
-    in order to never miss anything if Didier goes offline by coincidence
+    Tasks that have to run at a specific time of day are run by the scheduler, which
+    remembers when they last ran. Tasks that were missed while Didier was offline are run
+    once on startup, so there's no need to wake up every hour to check.
     """
 
     client: Didier
-    _tasks: dict[str, tasks.Loop]
+    scheduler: TaskScheduler
+    ufora_poll_schedule: UforaPollSchedule
+    feed_poller: FeedPoller
+    _tasks: dict[str, Union[tasks.Loop, ScheduledTask]]
 
     def __init__(self, client: Didier):
         self.client = client
+        self.scheduler = TaskScheduler(client, on_error=self._on_tasks_error)
+        self.feed_poller = FeedPoller()
+        self.ufora_poll_schedule = UforaPollSchedule(
+            min_interval=datetime.timedelta(minutes=settings.UFORA_POLL_MIN_INTERVAL),
+            max_interval=datetime.timedelta(minutes=settings.UFORA_POLL_MAX_INTERVAL),
+        )
 
         self._tasks = {
-            "birthdays": self.check_birthdays,
+            "birthdays": self.scheduler.schedule(
+                enums.TaskType.BIRTHDAYS, Daily(SOCIALLY_ACCEPTABLE_TIME), self.check_birthdays
+            ),
             "free_games": self.pull_free_games,
-            "schedules": self.pull_schedules,
-            "reminders": self.reminders,
+            "schedules": self.scheduler.schedule(
+                enums.TaskType.SCHEDULES, Daily(DAILY_RESET_TIME), self.pull_schedules
+            ),
+            "reminders": self.scheduler.schedule(
+                enums.TaskType.REMINDERS, Daily(SOCIALLY_ACCEPTABLE_TIME), self.reminders
+            ),
             "ufora": self.pull_ufora_announcements,
             "remove_ufora": self.remove_old_ufora_announcements,
         }
 
     @overrides
     async def cog_load(self) -> None:
-        # Only check birthdays if there's a channel to send it to
-        if settings.BIRTHDAY_ANNOUNCEMENT_CHANNEL is not None:
-            self.check_birthdays.start()
-
         # Only pull free games if a channel was provided
         if settings.FREE_GAMES_CHANNEL is not None:
             self.pull_free_games.start()
@@ -76,7 +105,7 @@ class Tasks(commands.Cog):
             self.remove_old_ufora_announcements.start()
 
         # Start other tasks
-        self.reminders.start()
+        asyncio.create_task(self.start_scheduler())
         asyncio.create_task(self.get_error_channel())
 
     @overrides
@@ -86,6 +115,18 @@ class Tasks(commands.Cog):
             if task.is_running():
                 task.stop()
 
+    async def start_scheduler(self):
+        """Start the scheduled tasks once Didier is ready"""
+        await self.client.wait_until_ready()
+
+        scheduled = [self._tasks["schedules"], self._tasks["reminders"]]
+
+        # Only check birthdays if there's a channel to send it to
+        if settings.BIRTHDAY_ANNOUNCEMENT_CHANNEL is not None:
+            scheduled.append(self._tasks["birthdays"])
+
+        await self.scheduler.start(*(task for task in scheduled if isinstance(task, ScheduledTask)))
+
     @commands.group(name="Tasks", aliases=["Task"], case_insensitive=True, invoke_without_command=True)
     @commands.check(is_owner)
     async def tasks_group(self, ctx: commands.Context):
@@ -113,6 +154,20 @@ class Tasks(commands.Cog):
         await task(forced=True)
         await self.client.confirm_message(ctx.message)
 
+    @tasks_group.command(name="Feeds")  # type: ignore[arg-type]
+    async def feeds(self, ctx: commands.Context):
+        """Command to show how often the RSS feeds actually had to be downloaded & parsed"""
+        embed = discord.Embed(colour=discord.Colour.blue(), title="Feeds")
+
+        for name, stats in sorted(self.feed_poller.stats.items()):
+            embed.add_field(
+                name=name,
+                value=f"Fetched: {stats.fetched}\nNot modified: {stats.not_modified}\n"
+                f"Unchanged: {stats.unchanged}\nParsed: {stats.parsed}\nFailed: {stats.failed}",
+            )
+
+        await ctx.reply(embed=embed, mention_author=False)
+
     async def get_error_channel(self):
         """Get the configured channel from the cache"""
         await self.client.wait_until_ready()
@@ -128,8 +183,6 @@ class Tasks(commands.Cog):
         elif self.client.owner_id is not None:
             self.client.error_channel = self.client.get_user(self.client.owner_id)
 
-    @tasks.loop(time=SOCIALLY_ACCEPTABLE_TIME)
-    @timed_task(enums.TaskType.BIRTHDAYS)
     async def check_birthdays(self, **kwargs):
         """Check if it's currently anyone's birthday"""
         _ = kwargs
@@ -162,10 +215,6 @@ class Tasks(commands.Cog):
 
             await channel.send(random.choice(BIRTHDAY_MESSAGES).format(mention=user.mention))
 
-    @check_birthdays.before_loop
-    async def _before_check_birthdays(self):
-        await self.client.wait_until_ready()
-
     @tasks.loop(minutes=15)
     async def pull_free_games(self, **kwargs):
         """Task that checks for free games occasionally"""
@@ -176,7 +225,7 @@ class Tasks(commands.Cog):
             return
 
         async with self.client.postgres_session as session:
-            games = await fetch_free_games(self.client.http_session, session)
+            games = await fetch_free_games(self.client.http_session, session, self.feed_poller)
             channel = self.client.get_channel(settings.FREE_GAMES_CHANNEL)
 
             if channel is None:
@@ -194,54 +243,141 @@ class Tasks(commands.Cog):
     async def _before_free_games(self):
         await self.client.wait_until_ready()
 
-    @tasks.loop(time=DAILY_RESET_TIME)
-    @timed_task(enums.TaskType.SCHEDULES)
     async def pull_schedules(self, **kwargs):
         """Task that pulls the schedules & saves the files locally
 
-        Schedules are then parsed & cached in memory
+        Schedules are then parsed & cached in memory, but only if they changed
         """
         _ = kwargs
 
-        new_schedules: dict[settings.ScheduleType, Schedule] = {}
+        # Schedules that couldn't be fetched or didn't change keep their cached version
+        new_schedules: dict[settings.ScheduleType, Schedule] = dict(self.client.schedules)
 
-        async with self.client.postgres_session as session:
-            for data in settings.SCHEDULE_DATA:
-                if data.schedule_url is None:
-                    continue
+        schedule_data = [data for data in settings.SCHEDULE_DATA if data.schedule_url is not None]
+        semaphore = asyncio.Semaphore(SCHEDULE_FETCH_LIMIT)
+        responses = await asyncio.gather(*(self._fetch_schedule(data, semaphore) for data in schedule_data))
 
-                async with self.client.http_session.get(data.schedule_url) as response:
-                    # If a schedule couldn't be fetched, log it and move on
-                    if response.status != 200:
-                        await self.client.log_warning(
-                            f"Unable to fetch schedule {data.name} (status {response.status}).", log_to_discord=False
+        # Responses that were parsed successfully, and can be stored once the new schedules are in use
+        parsed: list[tuple[settings.ScheduleInfo, ConditionalResponse]] = []
+
+        async with self.client.postgres_session as session:
+            for data, response in zip(schedule_data, responses):
+                # One broken schedule shouldn't stop the others from being updated
+                try:
+                    if response is not None:
+                        assert response.content is not None
+                        schedule = await parse_schedule_from_content(
+                            response.content,
+                            database_session=session,
+                            executor=self.client.process_pool,
+                            snapshot_path=get_snapshot_path(data.name),
+                        )
+                        new_schedules[data.name] = self._update_schedule(data.name, schedule)
+                        parsed.append((data, response))
+                    elif data.name not in new_schedules:
+                        # Unchanged, but it wasn't loaded yet
+                        stored_schedule = await parse_schedule(
+                            data.name, database_session=session, executor=self.client.process_pool
                         )
-                        continue
+                        if stored_schedule is not None:
+                            new_schedules[data.name] = stored_schedule
+                except Exception as e:
+                    await self.client.log_error(f"Unable to parse schedule {data.name} ({e!r}).")
+
+        # Don't throw away everything that was rendered if nothing changed
+        old_schedules = self.client.schedules
+        if new_schedules.keys() != old_schedules.keys() or any(
+            schedule is not old_schedules[name] for name, schedule in new_schedules.items()
+        ):
+            self.client.replace_schedules(new_schedules)
+
+        # Only remember the new versions now, so that schedules that failed are downloaded & parsed again next time
+        for data, response in parsed:
+            self._save_schedule(data, response)
+
+    def _update_schedule(self, name: settings.ScheduleType, schedule: Schedule) -> Schedule:
+        """Compare a freshly parsed schedule to the cached version, and apply the changes to it
+
+        Listeners for "on_schedule_update" are notified of the changes
+        """
+        old_schedule = self.client.schedules.get(name)
+        if old_schedule is None:
+            return schedule
 
-                    # Write the content to a file
-                    content = await response.text()
-                    with open(f"files/schedules/{data.name}.ics", "w+") as fp:
-                        fp.write(content)
+        diff = diff_schedules(old_schedule, schedule)
+        if not diff:
+            return old_schedule
 
-                    schedule = await parse_schedule_from_content(content, database_session=session)
-                    if schedule is None:
-                        continue
+        logger.info(
+            f"Schedule {name} changed: {len(diff.added)} added, {len(diff.removed)} removed, {len(diff.moved)} moved."
+        )
+        self.client.dispatch("schedule_update", name, diff)
 
-                    new_schedules[data.name] = schedule
+        return old_schedule.apply_diff(diff)
 
-        # Only replace cached version if all schedules succeeded
-        self.client.schedules = new_schedules
+    async def _fetch_schedule(
+        self, data: settings.ScheduleInfo, semaphore: asyncio.Semaphore
+    ) -> Optional[ConditionalResponse]:
+        """Download a schedule
 
-    @pull_schedules.before_loop
-    async def _before_pull_schedules(self):
-        await self.client.wait_until_ready()
+        Returns the response if the schedule changed, or None if it didn't (or couldn't be fetched).
+        The new version is only saved locally once it was processed, using _save_schedule.
+        """
+        assert data.schedule_url is not None
 
-    @tasks.loop(minutes=10)
+        schedule_path = get_schedule_path(data.name)
+        validators_path = schedule_path.with_suffix(".validators.json")
+
+        # A "not modified" response is useless if the file is gone
+        validators = CacheValidators.load(validators_path) if schedule_path.exists() else CacheValidators()
+
+        try:
+            async with semaphore:
+                response = await conditional_get(self.client.http_session, data.schedule_url, validators)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            await self.client.log_warning(f"Unable to fetch schedule {data.name} ({e}).", log_to_discord=False)
+            return None
+
+        if response.not_modified:
+            return None
+
+        # If a schedule couldn't be fetched, log it and move on
+        if not response.modified or response.content is None:
+            await self.client.log_warning(
+                f"Unable to fetch schedule {data.name} (status {response.status}).", log_to_discord=False
+            )
+            return None
+
+        # The server doesn't support conditional requests, or the file was re-generated without changing anything
+        if schedule_path.exists():
+            with open(schedule_path, "r", encoding="utf-8") as fp:
+                if content_hash(fp.read()) == content_hash(response.content):
+                    # This content was already processed, so the new validators can be used right away
+                    response.validators.save(validators_path)
+                    return None
+
+        return response
+
+    @staticmethod
+    def _save_schedule(data: settings.ScheduleInfo, response: ConditionalResponse):
+        """Save a schedule that was processed locally, along with the validators to check if it changed"""
+        assert response.content is not None
+
+        schedule_path = get_schedule_path(data.name)
+
+        # Write the content to a file
+        with open(schedule_path, "w", encoding="utf-8") as fp:
+            fp.write(response.content)
+
+        response.validators.save(schedule_path.with_suffix(".validators.json"))
+
+    @tasks.loop(minutes=settings.UFORA_POLL_MIN_INTERVAL)
     @timed_task(enums.TaskType.UFORA_ANNOUNCEMENTS)
     async def pull_ufora_announcements(self, **kwargs):
-        """Task that checks for new Ufora announcements & logs them in a channel"""
-        _ = kwargs
+        """Task that checks for new Ufora announcements & logs them in a channel
 
+        Every course has its own schedule, so only the courses that are due are checked
+        """
         # In theory this shouldn't happen but just to please Mypy
         if settings.UFORA_RSS_TOKEN is None or settings.UFORA_ANNOUNCEMENTS_CHANNEL is None:
             return
@@ -259,7 +395,11 @@ class Tasks(commands.Cog):
                     f"Ufora announcements channel (id `{settings.UFORA_ANNOUNCEMENTS_CHANNEL}`) is not messageable."
                 )
 
-            announcements = await fetch_ufora_announcements(self.client.http_session, db_session)
+            # Forcing the task checks all courses
+            poll_schedule = None if kwargs.get("forced", False) else self.ufora_poll_schedule
+            announcements = await fetch_ufora_announcements(
+                self.client.http_session, db_session, poll_schedule, self.feed_poller
+            )
 
             for announcement in announcements:
                 await announcements_channel.send(embed=announcement.to_embed())
@@ -278,21 +418,48 @@ class Tasks(commands.Cog):
         if not daily_schedule:
             return
 
+        # Only roles that have a class today change what someone's schedule looks like,
+        # so everyone with the same combination of those roles gets the same schedule
+        relevant_roles = daily_schedule.role_ids
+        groups: dict[frozenset[int], list[discord.Member]] = {}
+
         for entry in entries:
             member = self.client.main_guild.get_member(entry.user_id)
             if not member:
                 continue
 
-            roles = {role.id for role in member.roles}
+            roles = frozenset(role.id for role in member.roles if role.id in relevant_roles)
+
+            # No class today
+            if not roles:
+                continue
+
+            groups.setdefault(roles, []).append(member)
+
+        sender = BoundedSender()
+        messages: list[Coroutine[Any, Any, Optional[discord.Message]]] = []
+
+        for roles, members in groups.items():
             personal_schedule = daily_schedule.personalize(roles)
 
             # No class today
             if not personal_schedule:
                 continue
 
-            await member.send(embed=personal_schedule.to_embed(day=today))
+            embed = personal_schedule.to_embed(day=today)
+            messages.extend(sender.send(member, embed=embed) for member in members)
+
+        # One reminder that fails in an unexpected way shouldn't stop all others from being sent
+        results = await asyncio.gather(*messages, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+
+        for error in errors:
+            logger.warning(f"Unable to send schedule reminder ({error!r}).")
+
+        failed = sender.failed + len(errors)
+        if failed:
+            logger.info(f"Unable to send {failed} out of {len(messages)} schedule reminders.")
 
-    @tasks.loop(time=SOCIALLY_ACCEPTABLE_TIME)
     async def reminders(self, **kwargs):
         """Send daily reminders to people"""
         _ = kwargs
@@ -308,20 +475,13 @@ class Tasks(commands.Cog):
                 if category == enums.ReminderCategory.LES:
                     await self._send_les_reminders(entries)
 
-    @reminders.before_loop
-    async def _before_reminders(self):
-        await self.client.wait_until_ready()
-
     @tasks.loop(hours=24)
     async def remove_old_ufora_announcements(self):
         """Remove all announcements that are over 1 week old, once per day"""
         async with self.client.postgres_session as session:
             await remove_old_announcements(session)
 
-    @check_birthdays.error
-    @pull_schedules.error
     @pull_ufora_announcements.error
-    @reminders.error
     @remove_old_ufora_announcements.error
     async def _on_tasks_error(self, error: BaseException):
         """Error handler for all tasks"""
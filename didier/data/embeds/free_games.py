@@ -11,6 +11,7 @@ from didier.data.scrapers.common import GameStorePage
 from didier.data.scrapers.steam import get_steam_webpage_info
 from didier.utils.discord import colours
 from didier.utils.discord.constants import Limits
+from didier.utils.http.limits import HostLimiter
 from didier.utils.types.string import abbreviate
 
 __all__ = ["SEPARATOR", "FreeGameEmbed"]
@@ -61,14 +62,20 @@ class FreeGameEmbed(EmbedPydantic):
     def _clean_title(cls, value: str) -> str:
         return html.unescape(value)
 
-    async def update(self, http_session: ClientSession):
-        """Scrape the store page to fetch some information"""
+    async def update(
+        self, http_session: ClientSession, limiter: Optional[HostLimiter] = None, *, timeout: Optional[float] = None
+    ):
+        """Scrape the store page to fetch some information
+
+        The name & store are filled in before anything is scraped, so the embed
+        can still be sent if scraping takes too long
+        """
         self.name, self.store = self.title.split(SEPARATOR)
 
         store = (self.store or "").lower()
 
         if "steam" in store:
-            self.store_page = await get_steam_webpage_info(http_session, self.link)
+            self.store_page = await get_steam_webpage_info(http_session, self.link, limiter, timeout=timeout)
         elif "epic" in store:
             self.link = "https://store.epicgames.com/free-games"
 
@@ -1,20 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
 import pathlib
 import re
+import zoneinfo
+from collections import OrderedDict
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
-from datetime import date, datetime
-from typing import TYPE_CHECKING, Optional
+from datetime import date, datetime, timezone, tzinfo
+from typing import TYPE_CHECKING, AbstractSet, Iterable, Iterator, NamedTuple, Optional
 
 if TYPE_CHECKING:
     from didier import Didier
 
 import discord
-from ics import Calendar
 from overrides import overrides
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.crud.ufora_courses import get_course_by_code
+from database.crud.ufora_courses import get_courses_by_codes
 from database.schemas import UforaCourse
 from didier.data.embeds.base import EmbedBaseModel
 from didier.utils.discord import colours
@@ -27,14 +35,80 @@ from didier.utils.types.datetime import (
 from didier.utils.types.string import leading
 from settings import ScheduleType
 
-__all__ = ["Schedule", "get_schedule_for_day", "parse_schedule_from_content", "parse_schedule"]
+__all__ = [
+    "ParsedEvent",
+    "Schedule",
+    "ScheduleCourse",
+    "ScheduleDiff",
+    "ScheduleEmbedCache",
+    "ScheduleSlot",
+    "ScheduleSnapshot",
+    "content_hash",
+    "course_table",
+    "diff_schedules",
+    "get_schedule_for_day",
+    "get_schedule_path",
+    "get_snapshot_path",
+    "iter_events",
+    "load_snapshot",
+    "merge_slots",
+    "parse_events",
+    "parse_schedule_from_content",
+    "parse_schedule",
+    "register_courses",
+    "save_snapshot",
+]
+
+
+logger = logging.getLogger(__name__)
+
+# Increase this whenever the format of the snapshots changes, to invalidate the existing ones
+SNAPSHOT_VERSION = 2
 
 
 @dataclass
 class Schedule(EmbedBaseModel):
-    """An entire schedule"""
+    """An entire schedule
+
+    The slots are indexed by day, and within every day by all role ids that give access to them,
+    so that looking up a (personalized) day doesn't require going over the entire semester
+    """
 
     slots: set[ScheduleSlot] = field(default_factory=set)
+    # The index is only built once it's used
+    _days: Optional[dict[date, set[ScheduleSlot]]] = field(default=None, init=False, repr=False, compare=False)
+    _roles: Optional[dict[date, dict[int, list[ScheduleSlot]]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Version of the course table the roles were indexed with
+    _roles_version: int = field(default=0, init=False, repr=False, compare=False)
+
+    @staticmethod
+    def _index_roles(slots: Iterable[ScheduleSlot]) -> dict[int, list[ScheduleSlot]]:
+        """Index the slots of a single day by role"""
+        roles: dict[int, list[ScheduleSlot]] = {}
+
+        for slot in slots:
+            for role_id in slot.role_ids:
+                roles.setdefault(role_id, []).append(slot)
+
+        return roles
+
+    def _build_index(self) -> tuple[dict[date, set[ScheduleSlot]], dict[date, dict[int, list[ScheduleSlot]]]]:
+        """Get the index, building it first if that hasn't happened yet
+
+        The roles are indexed again if the roles of any course changed since they were last indexed
+        """
+        if self._days is None:
+            self._days = {}
+            for slot in self.slots:
+                self._days.setdefault(slot.day, set()).add(slot)
+
+        if self._roles is None or self._roles_version != _course_roles_version:
+            self._roles = {day: self._index_roles(slots) for day, slots in self._days.items()}
+            self._roles_version = _course_roles_version
+
+        return self._days, self._roles
 
     def __add__(self, other) -> Schedule:
         """Combine schedules using the + operator"""
@@ -49,30 +123,69 @@ class Schedule(EmbedBaseModel):
 
     def on_day(self, day: date) -> Schedule:
         """Only show courses on a given day"""
-        return Schedule(set(filter(lambda slot: slot.start_time.date() == day, self.slots)))
-
-    def personalize(self, roles: set[int]) -> Schedule:
-        """Personalize a schedule for a user, only adding courses they follow"""
-        # If the schedule is already empty, just return instantly
-        if not self.slots:
-            return Schedule()
+        days, _ = self._build_index()
+        return Schedule(set(days.get(day, set())))
 
-        personal_slots = []
-        for slot in self.slots:
-            alt_id = slot.alternative_overarching_role_id
-
-            # Check if the user has a course selected in their roles
-            role_found = slot.role_id is not None and slot.role_id in roles
-
-            # Some engineering master courses are present in multiple different places,
-            # so this is necessary
-            overarching_role_found = (slot.overarching_role_id is not None and slot.overarching_role_id in roles) or (
-                alt_id is not None and alt_id in roles
-            )
-            if role_found or overarching_role_found:
-                personal_slots.append(slot)
+    @property
+    def role_ids(self) -> set[int]:
+        """All roles that give access to at least one slot in this schedule"""
+        _, all_roles = self._build_index()
+        return {role_id for day_roles in all_roles.values() for role_id in day_roles}
 
-        return Schedule(set(personal_slots))
+    def personalize(self, roles: AbstractSet[int]) -> Schedule:
+        """Personalize a schedule for a user, only adding courses they follow"""
+        _, all_roles = self._build_index()
+        personal_slots: set[ScheduleSlot] = set()
+
+        for day_roles in all_roles.values():
+            # Go over whichever side is the smallest
+            if len(roles) <= len(day_roles):
+                for role_id in roles:
+                    personal_slots.update(day_roles.get(role_id, []))
+            else:
+                for role_id, slots in day_roles.items():
+                    if role_id in roles:
+                        personal_slots.update(slots)
+
+        return Schedule(personal_slots)
+
+    def apply_diff(self, diff: ScheduleDiff) -> Schedule:
+        """Create a new version of this schedule with the changes in a diff applied to it
+
+        The index of the new schedule re-uses the index of this one, and only re-indexes the days that changed.
+        If the roles of any course changed since this schedule was indexed, the index is rebuilt from scratch.
+        """
+        # Slots are equal if they have the same identity, so moved slots have to be removed first
+        removed = set(diff.removed).union(old for old, _ in diff.moved)
+        added = set(diff.added).union(new for _, new in diff.moved)
+        schedule = Schedule((self.slots - removed) | added)
+
+        # Nothing (up-to-date) to re-use
+        if self._days is None or self._roles is None or self._roles_version != _course_roles_version:
+            return schedule
+
+        added_per_day: dict[date, list[ScheduleSlot]] = {}
+        for slot in added:
+            added_per_day.setdefault(slot.day, []).append(slot)
+
+        days = dict(self._days)
+        roles = dict(self._roles)
+
+        for day in diff.affected_days:
+            day_slots = days.get(day, set()) - removed
+            day_slots.update(added_per_day.get(day, []))
+
+            if day_slots:
+                days[day] = day_slots
+                roles[day] = self._index_roles(day_slots)
+            else:
+                days.pop(day, None)
+                roles.pop(day, None)
+
+        schedule._days = days
+        schedule._roles = roles
+        schedule._roles_version = self._roles_version
+        return schedule
 
     @overrides
     def to_embed(self, **kwargs) -> discord.Embed:
@@ -94,7 +207,7 @@ class Schedule(EmbedBaseModel):
 
             return embed
 
-        slots_sorted = sorted(list(self.slots), key=lambda k: k.start_time)
+        slots_sorted = sorted(list(self.slots), key=lambda k: k.start)
         description_data = []
 
         for slot in slots_sorted:
@@ -108,77 +221,228 @@ class Schedule(EmbedBaseModel):
         return embed
 
 
-@dataclass
+class ScheduleCourse(NamedTuple):
+    """The parts of a course that are needed to personalize & display slots"""
+
+    course_id: int
+    name: str
+    # All roles that give access to this course
+    role_ids: frozenset[int]
+
+    @classmethod
+    def from_course(cls, course: UforaCourse) -> ScheduleCourse:
+        """Create a compact version of a course"""
+        # Some engineering master courses are present in multiple different places,
+        # so they can have multiple overarching roles
+        candidates = (course.role_id, course.overarching_role_id, course.alternative_overarching_role_id)
+        return cls(
+            course_id=course.course_id,
+            name=course.name,
+            role_ids=frozenset(role_id for role_id in candidates if role_id is not None),
+        )
+
+
+# Bumped whenever the roles of an existing course change, as the role indexes of schedules are outdated then
+_course_roles_version = 0
+# Courses of all slots, shared by all schedules
+course_table: dict[int, ScheduleCourse] = {}
+
+
+def register_courses(courses: Iterable[UforaCourse]):
+    """Add courses to the course table, or update them if they already exist"""
+    global _course_roles_version
+
+    for course in courses:
+        new_course = ScheduleCourse.from_course(course)
+        old_course = course_table.get(course.course_id)
+
+        if old_course is not None and old_course.role_ids != new_course.role_ids:
+            _course_roles_version += 1
+
+        course_table[course.course_id] = new_course
+
+
 class ScheduleSlot:
-    """A slot in the schedule"""
+    """A slot in the schedule
 
-    course: UforaCourse
-    start_time: datetime
-    end_time: datetime
+    As there are a lot of these, they are kept as small as possible. Times are stored as
+    timestamps, and the course is only stored as an id that points into the course table.
+    """
+
+    __slots__ = ("course_id", "start", "end", "location")
+
+    course_id: int
+    # Timestamps, in seconds
+    start: int
+    end: int
     location: str
-    _hash: int = field(init=False)
 
-    def __post_init__(self):
-        """Fix some properties to display more nicely"""
-        # Re-format the location data
-        match = re.search(r"(.*)\. (?:Gebouw )?(.*)\. (?:Campus )?(.*)\. ", self.location)
+    def __init__(self, course_id: int, start: int, end: int, location: str):
+        self.course_id = course_id
+        self.start = start
+        self.end = end
+
+        # Re-format the location data to display more nicely
+        match = re.search(r"(.*)\. (?:Gebouw )?(.*)\. (?:Campus )?(.*)\. ", location)
         if match is not None:
             room, building, campus = match.groups()
             room = room.replace("PC / laptoplokaal ", "PC-lokaal")
-            self.location = f"{campus} {building} {room}"
+            location = f"{campus} {building} {room}"
+
+        self.location = location
+
+    @classmethod
+    def restore(cls, course_id: int, start: int, end: int, location: str) -> ScheduleSlot:
+        """Re-create a slot that was stored before, without formatting the location again"""
+        slot = cls.__new__(cls)
+        slot.course_id = course_id
+        slot.start = start
+        slot.end = end
+        slot.location = location
+        return slot
+
+    @classmethod
+    def from_event(cls, course_id: int, event: ParsedEvent) -> ScheduleSlot:
+        """Create a slot for a parsed event"""
+        return cls(
+            course_id=course_id,
+            start=int(event.start_time.timestamp()),
+            end=int(event.end_time.timestamp()),
+            location=event.location,
+        )
 
-        # The same course can only start once at the same moment,
-        # so this is guaranteed to be unique
-        self._hash = hash(f"{self.course.course_id} {str(self.start_time)}")
+    @property
+    def course(self) -> ScheduleCourse:
+        """The course this slot belongs to"""
+        return course_table[self.course_id]
 
     @property
-    def alternative_overarching_role_id(self) -> Optional[int]:
-        """Shortcut to getting the alternative overarching role id for this slot"""
-        return self.course.alternative_overarching_role_id
+    def day(self) -> date:
+        """The day this slot takes place on"""
+        return self.start_time.date()
 
     @property
-    def overarching_role_id(self) -> Optional[int]:
-        """Shortcut to getting the overarching role id for this slot"""
-        return self.course.overarching_role_id
+    def end_time(self) -> datetime:
+        """The end of this slot, in the local timezone"""
+        return datetime.fromtimestamp(self.end, tz=LOCAL_TIMEZONE)
 
     @property
-    def role_id(self) -> Optional[int]:
-        """Shortcut to getting the role id for this slot"""
-        return self.course.role_id
+    def identity(self) -> tuple[int, int]:
+        """The course & start time, which are enough to uniquely identify a slot"""
+        return self.course_id, self.start
+
+    @property
+    def role_ids(self) -> frozenset[int]:
+        """All roles that give access to this slot"""
+        return self.course.role_ids
+
+    @property
+    def start_time(self) -> datetime:
+        """The start of this slot, in the local timezone"""
+        return datetime.fromtimestamp(self.start, tz=LOCAL_TIMEZONE)
 
     @overrides
     def __hash__(self) -> int:
-        return self._hash
+        # The same course can only start once at the same moment,
+        # so this is guaranteed to be unique
+        return hash((self.course_id, self.start))
 
     @overrides
     def __eq__(self, other):
         if not isinstance(other, ScheduleSlot):
             return False
 
-        return self._hash == other._hash
+        return self.course_id == other.course_id and self.start == other.start
+
+    @overrides
+    def __repr__(self) -> str:
+        return (
+            f"ScheduleSlot(course_id={self.course_id}, start={self.start}, end={self.end}, location={self.location!r})"
+        )
 
     def could_merge_with(self, other: ScheduleSlot) -> bool:
         """Check if two slots are actually one with a 15-min break in-between
 
         If they are, merge the two into one (this edits the first slot in-place!)
         """
-        if self.course.course_id != other.course.course_id:
+        if self.course_id != other.course_id:
             return False
 
         if self.location != other.location:
             return False
 
-        if self.start_time == other.end_time:
-            self.start_time = other.start_time
-            self._hash = hash(f"{self.course.course_id} {str(self.start_time)}")
+        if self.start == other.end:
+            self.start = other.start
             return True
-        elif self.end_time == other.start_time:
-            self.end_time = other.end_time
+        elif self.end == other.start:
+            self.end = other.end
             return True
 
         return False
 
 
+@dataclass
+class ScheduleDiff:
+    """The changes between two versions of a schedule
+
+    Slots are matched by their identity. Slots that kept their identity, but changed
+    their end time or location, are considered to be moved. Slots that were rescheduled to
+    another time on the same day are considered to be moved as well.
+    """
+
+    added: list[ScheduleSlot] = field(default_factory=list)
+    removed: list[ScheduleSlot] = field(default_factory=list)
+    # (old, new)
+    moved: list[tuple[ScheduleSlot, ScheduleSlot]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Make diffs without any changes falsy"""
+        return bool(self.added or self.removed or self.moved)
+
+    @property
+    def affected_days(self) -> set[date]:
+        """All days that have at least one change"""
+        days = {slot.day for slot in self.added}
+        days.update(slot.day for slot in self.removed)
+        days.update(new.day for _, new in self.moved)
+        return days
+
+
+def diff_schedules(old: Schedule, new: Schedule) -> ScheduleDiff:
+    """Find the changes between two versions of a schedule"""
+    old_slots = {slot.identity: slot for slot in old.slots}
+    new_slots = {slot.identity: slot for slot in new.slots}
+
+    diff = ScheduleDiff()
+    added: list[ScheduleSlot] = []
+
+    for identity, slot in new_slots.items():
+        old_slot = old_slots.get(identity)
+
+        if old_slot is None:
+            added.append(slot)
+        elif old_slot.end != slot.end or old_slot.location != slot.location:
+            diff.moved.append((old_slot, slot))
+
+    # Slots of the same course on the same day are matched in order, to find the ones that were rescheduled
+    removed: dict[tuple[int, date], list[ScheduleSlot]] = {}
+    for identity, slot in sorted(old_slots.items()):
+        if identity not in new_slots:
+            removed.setdefault((slot.course_id, slot.day), []).append(slot)
+
+    for slot in sorted(added, key=lambda added_slot: added_slot.start):
+        candidates = removed.get((slot.course_id, slot.day))
+
+        if candidates:
+            diff.moved.append((candidates.pop(0), slot))
+        else:
+            diff.added.append(slot)
+
+    diff.removed = [slot for day_slots in removed.values() for slot in day_slots]
+
+    return diff
+
+
 def get_schedule_for_day(client: Didier, day_dt: date) -> Optional[Schedule]:
     """Get a schedule for an entire day"""
     main_schedule: Optional[Schedule] = None
@@ -198,6 +462,79 @@ def get_schedule_for_day(client: Didier, day_dt: date) -> Optional[Schedule]:
     return main_schedule
 
 
+class ScheduleEmbedCache:
+    """Bounded LRU-cache of rendered personal schedules
+
+    Most people in a year ask for the same day with the same roles, so the embeds are cached
+    per day & per set of roles that have a class on that day. The cache has to be invalidated
+    whenever the schedules change.
+    """
+
+    max_size: int
+    version: int
+    hits: int
+    misses: int
+
+    # The schedule of every day, along with all roles that have a class on that day
+    _days: OrderedDict[date, tuple[Schedule, frozenset[int]]]
+    _embeds: OrderedDict[tuple[date, frozenset[int], int], discord.Embed]
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._days = OrderedDict()
+        self._embeds = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._embeds)
+
+    def invalidate(self):
+        """Forget about all schedules, because they changed"""
+        self.version += 1
+        self._days.clear()
+        self._embeds.clear()
+
+    def _get_day(self, client: Didier, day: date) -> tuple[Schedule, frozenset[int]]:
+        """Get the schedule for an entire day"""
+        if day in self._days:
+            self._days.move_to_end(day)
+            return self._days[day]
+
+        schedule = get_schedule_for_day(client, day) or Schedule()
+        self._days[day] = (schedule, frozenset(schedule.role_ids))
+
+        while len(self._days) > self.max_size:
+            self._days.popitem(last=False)
+
+        return self._days[day]
+
+    def get_embed(self, client: Didier, day: date, roles: AbstractSet[int]) -> discord.Embed:
+        """Get the embed for someone's personal schedule on a given day
+
+        Callers get their own copy of the embed, so they can modify it without affecting the cache
+        """
+        schedule, day_roles = self._get_day(client, day)
+        key = (day, day_roles.intersection(roles), self.version)
+
+        embed = self._embeds.get(key)
+        if embed is not None:
+            self.hits += 1
+            self._embeds.move_to_end(key)
+            return embed.copy()
+
+        self.misses += 1
+        embed = schedule.personalize(key[1]).to_embed(day=day)
+        self._embeds[key] = embed
+
+        while len(self._embeds) > self.max_size:
+            self._embeds.popitem(last=False)
+
+        return embed.copy()
+
+
 def parse_course_code(summary: str) -> str:
     """Parse a course's code out of the summary"""
     code = re.search(r"^([^ ]+)\. ", summary)
@@ -219,51 +556,342 @@ def parse_time_string(string: str) -> datetime:
     return datetime.fromisoformat(string).astimezone(LOCAL_TIMEZONE)
 
 
-async def parse_schedule_from_content(content: str, *, database_session: AsyncSession) -> Schedule:
+def merge_slots(slots: list[ScheduleSlot]) -> list[ScheduleSlot]:
+    """Merge all slots that are actually one with a break in-between
+
+    The slots are sorted by course, location and start time, so that all slots that can be
+    merged are next to each other. This means they can all be merged in one single sweep.
+
+    This edits the slots in-place!
+    """
+    slots = sorted(slots, key=lambda s: (s.course_id, s.location, s.start))
+    merged: list[ScheduleSlot] = []
+
+    for slot in slots:
+        # The start time of the previous slot doesn't change, so its hash stays valid
+        if merged and merged[-1].could_merge_with(slot):
+            continue
+
+        merged.append(slot)
+
+    return merged
+
+
+class ParsedEvent(NamedTuple):
+    """The parts of a calendar event that are needed to create a slot
+
+    This is small & picklable, so it can be sent back from another process
+    """
+
+    code: str
+    start_time: datetime
+    end_time: datetime
+    location: str
+
+
+# The only properties of an event that are relevant
+_EVENT_PROPERTIES = ("SUMMARY", "DTSTART", "DTEND", "LOCATION")
+# Length of the longest of those, and of "BEGIN:", so that only the start of every line has to be upper-cased
+_PREFIX_LENGTH = max(map(len, _EVENT_PROPERTIES + ("BEGIN:",)))
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join lines that were folded over multiple lines back together"""
+    current: Optional[str] = None
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+
+        # Continuation lines start with a single space or tab
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+
+        if current is not None:
+            yield current
+
+        current = line
+
+    if current is not None:
+        yield current
+
+
+def _split_property(line: str) -> tuple[str, dict[str, str], str]:
+    """Split a content line into its name, parameters and value"""
+    # The value starts at the first colon that isn't inside of a quoted parameter
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            break
+    else:
+        return line.upper(), {}, ""
+
+    name, *params = line[:i].split(";")
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parameters[key.upper()] = param_value.strip('"')
+
+    return name.upper(), parameters, line[i + 1 :]
+
+
+def _unescape(value: str) -> str:
+    """Undo the escaping of text values"""
+    if "\\" not in value:
+        return value
+
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+@functools.lru_cache
+def _get_timezone(tzid: Optional[str]) -> tzinfo:
+    """Find a timezone by its id, falling back to the local timezone"""
+    if tzid is None:
+        return LOCAL_TIMEZONE
+
+    try:
+        return zoneinfo.ZoneInfo(tzid)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return LOCAL_TIMEZONE
+
+
+def _parse_datetime(value: str, parameters: dict[str, str]) -> datetime:
+    """Parse a DATE or DATE-TIME value to a timezone-aware datetime instance
+
+    Values without a timezone are interpreted as local times
+    """
+    year, month, day = int(value[0:4]), int(value[4:6]), int(value[6:8])
+
+    # Dates without a time start at midnight
+    if len(value) < 15:
+        return datetime(year, month, day, tzinfo=LOCAL_TIMEZONE)
+
+    hour, minute, second = int(value[9:11]), int(value[11:13]), int(value[13:15])
+    tz = timezone.utc if value.endswith("Z") else _get_timezone(parameters.get("TZID"))
+
+    return datetime(year, month, day, hour, minute, second, tzinfo=tz).astimezone(LOCAL_TIMEZONE)
+
+
+def _create_event(properties: dict[str, tuple[dict[str, str], str]]) -> Optional[ParsedEvent]:
+    """Create an event out of the properties that were found"""
+    if "SUMMARY" not in properties or "DTSTART" not in properties:
+        return None
+
+    start_time = _parse_datetime(properties["DTSTART"][1], properties["DTSTART"][0])
+
+    # Events without an end time take no time at all
+    end_time = start_time
+    if "DTEND" in properties:
+        end_time = _parse_datetime(properties["DTEND"][1], properties["DTEND"][0])
+
+    location = _unescape(properties["LOCATION"][1]) if "LOCATION" in properties else ""
+
+    return ParsedEvent(
+        code=parse_course_code(_unescape(properties["SUMMARY"][1])),
+        start_time=start_time,
+        end_time=end_time,
+        location=location,
+    )
+
+
+def iter_events(lines: Iterable[str]) -> Iterator[ParsedEvent]:
+    """Scan a schedule file line by line, and lazily yield all events in it
+
+    Only the properties that are used in slots are parsed, everything else is skipped.
+    Events without a summary or start time are ignored.
+    """
+    properties: Optional[dict[str, tuple[dict[str, str], str]]] = None
+    # Depth of components nested inside of the current event (like alarms)
+    nested = 0
+
+    for line in _unfold(lines):
+        # Names are case-insensitive
+        prefix = line[:_PREFIX_LENGTH].upper()
+
+        if prefix.startswith(("BEGIN:", "END:")):
+            component = line.partition(":")[2].strip().upper()
+
+            if prefix.startswith("BEGIN:"):
+                if component == "VEVENT" and properties is None:
+                    properties = {}
+                elif properties is not None:
+                    nested += 1
+            elif properties is not None:
+                if nested:
+                    nested -= 1
+                elif component == "VEVENT":
+                    event = _create_event(properties)
+                    properties = None
+
+                    if event is not None:
+                        yield event
+
+            continue
+
+        if properties is None or nested or not prefix.startswith(_EVENT_PROPERTIES):
+            continue
+
+        name, parameters, value = _split_property(line)
+        if name in _EVENT_PROPERTIES:
+            properties[name] = (parameters, value)
+
+
+def parse_events(content: str) -> list[ParsedEvent]:
+    """Parse all events out of a schedule file
+
+    This is CPU-heavy, so it's meant to run in a separate process
+    """
+    # Lines end with CRLF (or LF), str.splitlines() would also split on characters that can be part of a value
+    return list(iter_events(content.split("\n")))
+
+
+def get_schedule_path(name: ScheduleType) -> pathlib.Path:
+    """Get the path to the file that a schedule is stored in"""
+    return pathlib.Path(f"files/schedules/{name}.ics")
+
+
+def get_snapshot_path(name: ScheduleType) -> pathlib.Path:
+    """Get the path to the file that the parsed slots of a schedule are stored in"""
+    return get_schedule_path(name).with_suffix(".snapshot.json")
+
+
+def content_hash(content: str) -> str:
+    """Hash the content of a schedule file, to check if it changed"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ScheduleSnapshot(NamedTuple):
+    """The merged slots of a schedule file, along with the courses they were created for"""
+
+    # The course id that every course code in the file was resolved to, or None if it's unknown
+    courses: dict[str, Optional[int]]
+    slots: list[ScheduleSlot]
+
+    def matches(self, courses: Iterable[UforaCourse]) -> bool:
+        """Check if the course codes in the file still resolve to the same courses"""
+        known = {code: course_id for code, course_id in self.courses.items() if course_id is not None}
+        return known == {course.code: course.course_id for course in courses}
+
+
+def load_snapshot(path: pathlib.Path, source_hash: str) -> Optional[ScheduleSnapshot]:
+    """Load the parsed slots of a schedule file
+
+    Returns None if there is no snapshot, or if it was created for a different version of the file
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as fp:
+            snapshot = json.load(fp)
+
+        if snapshot["version"] != SNAPSHOT_VERSION or snapshot["hash"] != source_hash:
+            return None
+
+        return ScheduleSnapshot(
+            courses=snapshot["courses"],
+            slots=[
+                ScheduleSlot.restore(course_id, start, end, location)
+                for course_id, start, end, location in snapshot["slots"]
+            ],
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_snapshot(path: pathlib.Path, source_hash: str, snapshot: ScheduleSnapshot):
+    """Store the parsed slots of a schedule file, so it doesn't have to be parsed again
+
+    The snapshot is written to a temporary file first, so that a crash halfway through never leaves
+    a truncated snapshot behind. Failing to store it is not fatal, the file is just parsed again next time.
+    """
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "hash": source_hash,
+        "courses": snapshot.courses,
+        "slots": [(slot.course_id, slot.start, slot.end, slot.location) for slot in snapshot.slots],
+    }
+
+    temp_path = path.with_name(f"{path.name}.tmp")
+
+    try:
+        with open(temp_path, "w", encoding="utf-8") as fp:
+            json.dump(data, fp, separators=(",", ":"))
+
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Unable to store schedule snapshot {path} ({e}).")
+        temp_path.unlink(missing_ok=True)
+
+
+async def parse_schedule_from_content(
+    content: str,
+    *,
+    database_session: AsyncSession,
+    executor: Optional[Executor] = None,
+    snapshot_path: Optional[pathlib.Path] = None,
+) -> Schedule:
     """Parse a schedule file, taking the file content as an argument
 
     This can be used to avoid unnecessarily opening the file again if you already have its contents
+
+    If an executor is passed, the file is parsed in there instead of on the event loop. If a path
+    to a snapshot is passed, the merged slots are loaded from there if neither the content nor the
+    courses in the database changed, and stored there otherwise.
     """
-    calendar = Calendar(content)
-    events = list(calendar.events)
-    course_codes: dict[str, UforaCourse] = {}
-    slots: list[ScheduleSlot] = []
+    source_hash = content_hash(content)
+    snapshot = load_snapshot(snapshot_path, source_hash) if snapshot_path is not None else None
 
-    for event in events:
-        code = parse_course_code(event.name)
+    if snapshot is not None:
+        courses = await get_courses_by_codes(database_session, snapshot.courses)
 
-        if code not in course_codes:
-            course = await get_course_by_code(database_session, code)
-            if course is None:
-                continue
+        # A course that was added or changed in the meantime means the slots are outdated
+        if snapshot.matches(courses):
+            register_courses(courses)
+            return Schedule(slots=set(snapshot.slots))
 
-            course_codes[code] = course
+    if executor is None:
+        events = parse_events(content)
+    else:
+        events = await asyncio.get_running_loop().run_in_executor(executor, parse_events, content)
 
-        # Overwrite the name to be the sanitized value
-        event.name = code
+    # Look up all courses at once
+    courses = await get_courses_by_codes(database_session, (event.code for event in events))
+    course_codes: dict[str, UforaCourse] = {course.code: course for course in courses}
 
-        slot = ScheduleSlot(
-            course=course_codes[code],
-            start_time=parse_time_string(str(event.begin)),
-            end_time=parse_time_string(str(event.end)),
-            location=event.location,
-        )
+    register_courses(courses)
 
-        # Slot extends another one, don't add it
-        if any(s.could_merge_with(slot) for s in slots):
-            continue
+    slots = merge_slots(
+        [
+            ScheduleSlot.from_event(course_codes[event.code].course_id, event)
+            for event in events
+            if event.code in course_codes
+        ]
+    )
 
-        slots.append(slot)
+    if snapshot_path is not None:
+        course_ids: dict[str, Optional[int]] = {event.code: None for event in events}
+        course_ids.update((code, course.course_id) for code, course in course_codes.items())
+        save_snapshot(snapshot_path, source_hash, ScheduleSnapshot(courses=course_ids, slots=slots))
 
     # Cast to set at the END because the __hash__ can change while merging with others
     return Schedule(slots=set(slots))
 
 
-async def parse_schedule(name: ScheduleType, *, database_session: AsyncSession) -> Optional[Schedule]:
-    """Read and then parse a schedule file"""
-    schedule_path = pathlib.Path(f"files/schedules/{name}.ics")
+async def parse_schedule(
+    name: ScheduleType, *, database_session: AsyncSession, executor: Optional[Executor] = None
+) -> Optional[Schedule]:
+    """Read and then parse a schedule file
+
+    The parsed slots are stored in a snapshot next to the file, so this is fast as long as it doesn't change
+    """
+    schedule_path = get_schedule_path(name)
     if not schedule_path.exists():
         return None
 
     with open(schedule_path, "r", encoding="utf-8") as fp:
-        return await parse_schedule_from_content(fp.read(), database_session=database_session)
+        content = fp.read()
+
+    return await parse_schedule_from_content(
+        content, database_session=database_session, executor=executor, snapshot_path=get_snapshot_path(name)
+    )
@@ -9,6 +9,7 @@ from markdownify import markdownify as md
 
 from database.schemas import UforaCourse
 from didier.data.embeds.base import EmbedBaseModel
+from didier.data.rss_feeds.parser import FeedEntry
 from didier.utils.discord.colours import ghent_university_blue
 from didier.utils.types.datetime import LOCAL_TIMEZONE, int_to_weekday
 from didier.utils.types.string import leading
@@ -22,7 +23,7 @@ __all__ = [
 class UforaNotification(EmbedBaseModel):
     """A single notification from Ufora"""
 
-    content: dict
+    content: FeedEntry
     course: UforaCourse
     notification_id: Optional[int] = None
     course_id: Optional[int] = None
@@ -35,7 +36,7 @@ class UforaNotification(EmbedBaseModel):
 
     def __post_init__(self):
         self._view_url = self._create_url()
-        self._title = self._clean_content(self.content["title"])
+        self._title = self._clean_content(self.content.title)
         self._description = self._get_description()
         self.published_dt = self._published_datetime()
         self._published = self._get_published()
@@ -52,18 +53,25 @@ class UforaNotification(EmbedBaseModel):
 
         return embed
 
-    def get_id(self) -> int:
-        """Parse the id out of the notification"""
-        return int(self.notification_id) if self.notification_id is not None else self.content["id"]
+    def get_id(self) -> Optional[int]:
+        """Parse the id out of the notification
+
+        Returns None if the id is unknown and can't be parsed out of the url
+        """
+        if self.notification_id is not None:
+            return int(self.notification_id)
+
+        match = re.search(r"(\d+)-\d+$", self.content.id)
+        return int(match[1]) if match is not None else None
 
     def _create_url(self):
         if self.notification_id is None or self.course_id is None:
-            return self.content["link"]
+            return self.content.link
 
         return f"https://ufora.ugent.be/d2l/le/news/{self.course_id}/{self.notification_id}/view?ou={self.course_id}"
 
     def _get_description(self):
-        desc = self._clean_content(self.content["summary"])
+        desc = self._clean_content(self.content.summary)
 
         if len(desc) > 4096:
             return desc[:4093] + "..."
@@ -85,7 +93,7 @@ class UforaNotification(EmbedBaseModel):
         """Get a datetime instance of the publication date"""
         # Datetime is unable to parse the timezone because it's useless
         # We will hereby cut it out and pray the timezone will always be UTC+0
-        published = self.content["published"].rsplit(" ", 1)[0]
+        published = self.content.published.rsplit(" ", 1)[0]
         time_string = "%a, %d %b %Y %H:%M:%S"
         dt = datetime.strptime(published, time_string).replace(tzinfo=ZoneInfo("GMT")).astimezone(LOCAL_TIMEZONE)
         return dt
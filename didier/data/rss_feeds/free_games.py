@@ -1,12 +1,15 @@
+import asyncio
 import logging
-from http import HTTPStatus
+from typing import Optional
 
-import feedparser
+import aiohttp
 from aiohttp import ClientSession
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.crud.free_games import add_free_games, filter_present_games
 from didier.data.embeds.free_games import SEPARATOR, FreeGameEmbed
+from didier.data.rss_feeds.poller import FeedPoller
+from didier.utils.http.limits import HostLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -14,25 +17,57 @@ logger = logging.getLogger(__name__)
 __all__ = ["fetch_free_games"]
 
 
-async def fetch_free_games(http_session: ClientSession, database_session: AsyncSession) -> list[FreeGameEmbed]:
-    """Get a fresh list of free games"""
+FEED_NAME = "free_games"
+# Maximum amount of requests that are sent to the same store at the same time
+STORE_REQUEST_LIMIT = 2
+# Maximum amount of seconds a single request to a store can take, once it's allowed to be sent
+STORE_PAGE_TIMEOUT = 10
+
+
+async def _update_game(http_session: ClientSession, game: FreeGameEmbed, limiter: HostLimiter):
+    """Look up additional info about a game
+
+    If this fails or takes too long, the game is still sent without it
+    """
+    try:
+        await game.update(http_session, limiter, timeout=STORE_PAGE_TIMEOUT)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"Unable to fetch store page for free game {game.id} ({e!r}).")
+    except Exception:
+        # Store pages change all the time, one that can't be parsed shouldn't stop the other games from being sent
+        logger.exception(f"Unable to parse store page for free game {game.id}.")
+
+
+async def fetch_free_games(
+    http_session: ClientSession, database_session: AsyncSession, feed_poller: Optional[FeedPoller] = None
+) -> list[FreeGameEmbed]:
+    """Get a fresh list of free games
+
+    If a poller is passed, nothing is done when the feed didn't change since it last polled it
+    """
+    if feed_poller is None:
+        feed_poller = FeedPoller()
+
     url = "https://pepeizqdeals.com/rss-en.xml"
-    async with http_session.get(url) as response:
-        if response.status != HTTPStatus.OK:
-            logger.error("Free games GET-request failed with status code %d." % response.status)
-            return []
+    response = await feed_poller.poll(http_session, FEED_NAME, url)
+
+    if not response.ok:
+        logger.error("Free games GET-request failed with status code %d." % response.status)
+        return []
 
-        feed = feedparser.parse(await response.text())
+    # Nothing changed
+    if response.entries is None:
+        return []
 
     games: list[FreeGameEmbed] = []
     game_ids: list[int] = []
 
-    for entry in feed["entries"]:
+    for entry in response.entries:
         # Game isn't free
-        if SEPARATOR not in entry["title"]:
+        if SEPARATOR not in entry.title:
             continue
 
-        game = FreeGameEmbed.model_validate(entry)
+        game = FreeGameEmbed.model_validate(entry._asdict())
         games.append(game)
         game_ids.append(game.id)
 
@@ -41,11 +76,12 @@ async def fetch_free_games(http_session: ClientSession, database_session: AsyncS
 
     # Insert new games into the database
     await add_free_games(database_session, filtered_ids)
+    feed_poller.commit(FEED_NAME)
 
     games = list(filter(lambda x: x.id in filtered_ids, games))
 
-    # Look up additional info
-    for game in games:
-        await game.update(http_session)
+    # Look up additional info for all games at the same time
+    limiter = HostLimiter(limit=STORE_REQUEST_LIMIT)
+    await asyncio.gather(*(_update_game(http_session, game, limiter) for game in games))
 
     return games
@@ -0,0 +1,160 @@
+import html.entities
+import logging
+import re
+import xml.etree.ElementTree as ET  # noqa: S405 # Feeds only come from a few known sources
+from collections import deque
+from typing import Iterator, NamedTuple, Optional
+
+__all__ = ["FeedEntry", "iter_entries"]
+
+
+logger = logging.getLogger(__name__)
+
+# Size of the pieces that are fed to the XML parser at once
+CHUNK_SIZE = 16 * 1024
+
+# RSS tags that are kept, and the field they end up in
+_FIELDS = {"guid": "id", "title": "title", "link": "link", "pubDate": "published", "description": "summary"}
+
+# The XML parser only knows these entities, all others are rewritten to character references
+_XML_ENTITIES = {"amp", "lt", "gt", "quot", "apos"}
+_ENTITY_PATTERN = re.compile(r"&([A-Za-z][A-Za-z0-9]*);")
+# Longest possible entity name + "&" & ";", used to avoid splitting one in half between chunks
+_MAX_ENTITY_LENGTH = max(map(len, html.entities.name2codepoint)) + 2
+
+
+class FeedEntry(NamedTuple):
+    """The fields of a single <item> in an RSS feed
+
+    The id is the guid of the item, or the link if it doesn't have one
+    """
+
+    id: str
+    title: str
+    link: str
+    published: str
+    summary: str
+
+
+class _EntryCollector:
+    """Target for the XML parser that only keeps the fields of every <item> around"""
+
+    entries: deque[FeedEntry]
+
+    _fields: Optional[dict[str, str]]
+    _field: Optional[str]
+    _text: list[str]
+    _depth: int
+
+    def __init__(self):
+        self.entries = deque()
+
+        self._fields = None
+        self._field = None
+        self._text = []
+        self._depth = 0
+
+    def start(self, tag: str, _attrib: dict[str, str]):
+        """Called for every opening tag"""
+        if self._fields is None:
+            if tag == "item":
+                self._fields = {}
+                self._depth = 0
+
+            return
+
+        self._depth += 1
+
+        # Only direct children of the <item> are relevant
+        if self._depth == 1 and tag in _FIELDS:
+            self._field = _FIELDS[tag]
+            self._text = []
+
+    def data(self, data: str):
+        """Called for the text inside of tags"""
+        if self._field is not None:
+            self._text.append(data)
+
+    def end(self, tag: str):
+        """Called for every closing tag"""
+        if self._fields is None:
+            return
+
+        if self._depth == 0:
+            self._add_entry(self._fields)
+            self._fields = None
+            return
+
+        if self._depth == 1 and self._field is not None:
+            self._fields.setdefault(self._field, "".join(self._text).strip())
+            self._field = None
+
+        self._depth -= 1
+
+    def close(self):
+        """Called when the parser is done"""
+
+    def _add_entry(self, fields: dict[str, str]):
+        link = fields.get("link", "")
+
+        self.entries.append(
+            FeedEntry(
+                id=fields.get("id") or link,
+                title=fields.get("title", ""),
+                link=link,
+                published=fields.get("published", ""),
+                summary=fields.get("summary", ""),
+            )
+        )
+
+
+def _replace_entity(match: re.Match) -> str:
+    name = match[1]
+
+    if name in _XML_ENTITIES or name not in html.entities.name2codepoint:
+        return match[0]
+
+    return f"&#{html.entities.name2codepoint[name]};"
+
+
+def _iter_chunks(content: str, size: int) -> Iterator[str]:
+    """Split the content into chunks, without cutting entities in half"""
+    start = 0
+
+    while start < len(content):
+        end = min(start + size, len(content))
+
+        # Move the end of the chunk to after the entity
+        ampersand = content.rfind("&", start, end)
+        if ampersand != -1 and content.find(";", ampersand, end) == -1:
+            semicolon = content.find(";", ampersand, ampersand + _MAX_ENTITY_LENGTH)
+            if semicolon != -1:
+                end = semicolon + 1
+
+        # HTML feeds often use entities that XML doesn't know about
+        yield _ENTITY_PATTERN.sub(_replace_entity, content[start:end])
+        start = end
+
+
+def iter_entries(content: str, *, chunk_size: int = CHUNK_SIZE) -> Iterator[FeedEntry]:
+    """Extract the entries out of an RSS feed, while it's being parsed
+
+    Entries are yielded as soon as they're complete, so the rest of the feed isn't parsed
+    if the caller stops early. Nothing except the fields in FeedEntry is kept in memory.
+    If the feed is malformed, the entries up until the error are still yielded.
+    """
+    collector = _EntryCollector()
+    parser = ET.XMLParser(target=collector)  # noqa: S314
+
+    try:
+        for chunk in _iter_chunks(content, chunk_size):
+            parser.feed(chunk)
+
+            while collector.entries:
+                yield collector.entries.popleft()
+
+        parser.close()
+    except ET.ParseError as e:
+        logger.warning(f"Unable to parse feed ({e}).")
+
+    yield from collector.entries
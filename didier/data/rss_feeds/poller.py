@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import aiohttp
+import async_timeout
+from aiohttp import ClientSession
+
+from didier.data.rss_feeds.parser import FeedEntry, iter_entries
+from didier.utils.http.conditional import CacheValidators, conditional_get
+
+__all__ = ["FeedPoller", "FeedResponse", "FeedStats"]
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedStats:
+    """Counters for the requests sent to a single feed"""
+
+    # Requests that returned new content
+    fetched: int = 0
+    # Requests that were answered with "304 Not Modified"
+    not_modified: int = 0
+    # Requests that returned the exact same content as the previous one
+    unchanged: int = 0
+    # Times the content changed, and its entries were handed off to be parsed
+    parsed: int = 0
+    failed: int = 0
+
+
+@dataclass
+class FeedResponse:
+    """The result of polling a feed"""
+
+    status: int
+    # The entries are only present if the feed changed since the previous poll
+    # They are parsed lazily, so the rest of the feed is skipped if the caller stops early
+    entries: Optional[Iterator[FeedEntry]] = None
+
+    @property
+    def ok(self) -> bool:
+        """Check if the feed could be fetched, whether it changed or not"""
+        return self.status in (200, 304)
+
+    @property
+    def changed(self) -> bool:
+        """Check if the feed changed since the previous poll"""
+        return self.entries is not None
+
+
+class FeedPoller:
+    """Polls RSS feeds using conditional requests, and only parses them when they changed
+
+    The validators & a hash of the content of every feed are kept in memory, so the first
+    poll after a restart always downloads & parses the full feed.
+
+    New content is only remembered once the caller commits it after processing it, so
+    that a feed that failed to be processed is downloaded & parsed again next time.
+    """
+
+    stats: dict[str, FeedStats]
+    _validators: dict[str, CacheValidators]
+    _hashes: dict[str, str]
+    _uncommitted: dict[str, tuple[CacheValidators, str]]
+
+    def __init__(self):
+        self.stats = {}
+        self._validators = {}
+        self._hashes = {}
+        self._uncommitted = {}
+
+    def commit(self, name: str):
+        """Remember the content of the last poll of a feed, once it has been processed"""
+        uncommitted = self._uncommitted.pop(name, None)
+        if uncommitted is None:
+            return
+
+        self._validators[name], self._hashes[name] = uncommitted
+
+    async def poll(
+        self, http_session: ClientSession, name: str, url: str, *, timeout: Optional[float] = None
+    ) -> FeedResponse:
+        """Poll a feed
+
+        The name is used to keep track of the feed, so that urls containing tokens don't end up in logs
+        """
+        stats = self.stats.setdefault(name, FeedStats())
+
+        try:
+            async with async_timeout.timeout(timeout):
+                response = await conditional_get(http_session, url, self._validators.get(name))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Unable to fetch feed {name} ({e!r}).")
+            stats.failed += 1
+            return FeedResponse(status=0)
+
+        if response.not_modified:
+            stats.not_modified += 1
+            return FeedResponse(status=304)
+
+        if not response.modified or response.content is None:
+            logger.warning(f"Unable to fetch feed {name} (status {response.status}).")
+            stats.failed += 1
+            return FeedResponse(status=response.status)
+
+        stats.fetched += 1
+
+        # The server doesn't support conditional requests, or the feed was re-generated without changing anything
+        new_hash = hashlib.sha256(response.content.encode("utf-8")).hexdigest()
+        if self._hashes.get(name) == new_hash:
+            # This content was already processed, so the new validators can be used right away
+            self._validators[name] = response.validators
+            stats.unchanged += 1
+            return FeedResponse(status=200)
+
+        stats.parsed += 1
+        self._uncommitted[name] = (response.validators, new_hash)
+
+        return FeedResponse(status=200, entries=iter_entries(response.content))
@@ -1,16 +1,31 @@
+import asyncio
+import logging
 import re
+from datetime import datetime, timedelta
 from typing import Optional
 
-import async_timeout
-import feedparser
 from aiohttp import ClientSession
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import settings
 from database.crud import ufora_announcements as crud
+from database.schemas import UforaCourse
 from didier.data.embeds.ufora.announcements import UforaNotification
+from didier.data.rss_feeds.poller import FeedPoller, FeedResponse
+from didier.utils.types.datetime import tz_aware_now
 
-__all__ = ["parse_ids", "fetch_ufora_announcements"]
+__all__ = ["UforaPollSchedule", "parse_ids", "fetch_ufora_announcements"]
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum amount of feeds that are downloaded at the same time
+UFORA_FETCH_LIMIT = 5
+# Maximum amount of seconds to wait for the feed of a single course
+UFORA_FETCH_TIMEOUT = 10
+# Amount of time to look back at when checking how active a course is
+# The feeds only go back 7 days, and older announcements are removed from the database
+ACTIVITY_WINDOW = timedelta(days=7)
 
 
 def parse_ids(url: str) -> Optional[tuple[int, int]]:
@@ -24,10 +39,86 @@ def parse_ids(url: str) -> Optional[tuple[int, int]]:
     return int(spl[0]), int(spl[1])
 
 
+class UforaPollSchedule:
+    """Keeps track of when the feed of every course should be checked next
+
+    Courses that post a lot, or that posted something recently, are checked more often than
+    courses that rarely post anything. Courses that were never checked before are always due.
+    """
+
+    min_interval: timedelta
+    max_interval: timedelta
+
+    _next_poll: dict[int, datetime]
+    _last_changed: dict[int, datetime]
+
+    def __init__(self, *, min_interval: timedelta, max_interval: timedelta):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self._next_poll = {}
+        self._last_changed = {}
+
+    def is_due(self, course: UforaCourse, now: datetime) -> bool:
+        """Check if a course should be checked right now"""
+        next_poll = self._next_poll.get(course.course_id)
+
+        # Polls happen every min_interval, so allow some slack to not skip an entire round
+        return next_poll is None or next_poll <= now + self.min_interval / 2
+
+    def get_interval(self, course: UforaCourse, now: datetime) -> timedelta:
+        """Get the amount of time to wait before checking a course again"""
+        # Publication dates don't have a time, so they're only used to see how active a course is
+        window_start = (now - ACTIVITY_WINDOW).date()
+        recent = sum(1 for announcement in course.announcements if announcement.publication_date >= window_start)
+
+        # Every announcement in the past week makes the course get checked more often
+        by_rate = self.max_interval / (1 + recent)
+
+        # Courses that just posted something are likely to post a follow-up (or correction),
+        # the longer they stay quiet the less often they have to be checked
+        last_changed = self._last_changed.get(course.course_id)
+        by_recency = (now - last_changed) if last_changed is not None else self.max_interval
+
+        return max(self.min_interval, min(by_rate, by_recency, self.max_interval))
+
+    def update(self, course: UforaCourse, now: datetime, changed: bool):
+        """Schedule the next check of a course that was just checked"""
+        if changed:
+            self._last_changed[course.course_id] = now
+
+        self._next_poll[course.course_id] = now + self.get_interval(course, now)
+
+
+def _feed_name(course: UforaCourse) -> str:
+    return f"ufora-{course.course_id}"
+
+
+async def _fetch_course_feed(
+    http_session: ClientSession, feed_poller: FeedPoller, course: UforaCourse, semaphore: asyncio.Semaphore
+) -> FeedResponse:
+    """Fetch the RSS feed of a single course
+
+    Errors are not raised, so that one course can't stop the others
+    """
+    course_url = f"https://ufora.ugent.be/d2l/le/news/rss/{course.course_id}/course?token={settings.UFORA_RSS_TOKEN}"
+
+    # Only start the timeout once it's this course's turn
+    async with semaphore:
+        return await feed_poller.poll(http_session, _feed_name(course), course_url, timeout=UFORA_FETCH_TIMEOUT)
+
+
 async def fetch_ufora_announcements(
-    http_session: ClientSession, database_session: AsyncSession
+    http_session: ClientSession,
+    database_session: AsyncSession,
+    poll_schedule: Optional[UforaPollSchedule] = None,
+    feed_poller: Optional[FeedPoller] = None,
 ) -> list[UforaNotification]:
-    """Fetch all new announcements"""
+    """Fetch all new announcements
+
+    If a schedule is passed, only the courses that are due are checked. If a poller is passed, feeds
+    that didn't change since it last polled them are skipped.
+    """
     notifications: list[UforaNotification] = []
 
     # No token provided, don't fetch announcements
@@ -36,43 +127,56 @@ async def fetch_ufora_announcements(
 
     courses = await crud.get_courses_with_announcements(database_session)
 
-    for course in courses:
-        course_announcement_ids = list(map(lambda announcement: announcement.announcement_id, course.announcements))
+    # Announcements that are already known, including the ones found in this poll
+    seen_ids: set[int] = {announcement.announcement_id for course in courses for announcement in course.announcements}
+
+    now = tz_aware_now()
+    if poll_schedule is not None:
+        courses = [course for course in courses if poll_schedule.is_due(course, now)]
+
+    # Get the updated feeds of all courses at the same time
+    if feed_poller is None:
+        feed_poller = FeedPoller()
 
-        course_url = (
-            f"https://ufora.ugent.be/d2l/le/news/rss/{course.course_id}/course?token={settings.UFORA_RSS_TOKEN}"
-        )
+    semaphore = asyncio.Semaphore(UFORA_FETCH_LIMIT)
+    responses = await asyncio.gather(
+        *(_fetch_course_feed(http_session, feed_poller, course, semaphore) for course in courses)
+    )
 
-        # Get the updated feed
-        with async_timeout.timeout(10):
-            async with http_session.get(course_url) as response:
-                feed = feedparser.parse(await response.text())
+    new_announcements: list[tuple[int, int, datetime]] = []
 
-        # Remove old notifications
-        fresh_feed: list[dict] = []
-        for entry in feed["entries"]:
-            parsed = parse_ids(entry["id"])
+    for course, response in zip(courses, responses):
+        # Feeds that couldn't be fetched stay due, so they're retried next time
+        if not response.ok:
+            continue
+
+        found = len(new_announcements)
+
+        for entry in response.entries or []:
+            parsed = parse_ids(entry.id)
             if parsed is None:
                 continue
 
-            if parsed[0] not in course_announcement_ids:
-                fresh_feed.append(entry)
+            # The newest announcements come first, so everything after this one is known as well
+            notification_id, course_id = parsed
+            if notification_id in seen_ids:
+                break
 
-        if fresh_feed:
-            for item in fresh_feed:
-                # Parse id's out
-                # Technically this can't happen but Mypy angry
-                parsed = parse_ids(item["id"])
+            seen_ids.add(notification_id)
 
-                if parsed is None:
-                    continue
+            # Create a new notification
+            notification = UforaNotification(entry, course, notification_id, course_id)
+            notifications.append(notification)
+            new_announcements.append((notification_id, course.course_id, notification.published_dt))
 
-                # Create a new notification
-                notification_id, course_id = parsed
-                notification = UforaNotification(item, course, notification_id, course_id)
-                notifications.append(notification)
+        if poll_schedule is not None:
+            poll_schedule.update(course, now, changed=len(new_announcements) > found)
 
-                # Create new db entry
-                await crud.create_new_announcement(database_session, notification_id, course, notification.published_dt)
+    # Create all new db entries at once
+    await crud.add_announcements(database_session, new_announcements)
+
+    # Only skip these feeds next time once their announcements are safely stored
+    for course in courses:
+        feed_poller.commit(_feed_name(course))
 
     return notifications
@@ -7,6 +7,7 @@ from aiohttp import ClientSession
 from bs4 import BeautifulSoup, Tag
 
 from didier.data.scrapers.common import GameStorePage, parse_open_graph_tags
+from didier.utils.http.limits import HostLimiter
 
 __all__ = ["get_steam_webpage_info"]
 
@@ -87,14 +88,23 @@ def _clean_title(title: str) -> str:
     return match.groups()[0]
 
 
-async def get_steam_webpage_info(http_session: ClientSession, url: str) -> Optional[GameStorePage]:
-    """Scrape a Steam page"""
+async def get_steam_webpage_info(
+    http_session: ClientSession, url: str, limiter: Optional[HostLimiter] = None, *, timeout: Optional[float] = None
+) -> Optional[GameStorePage]:
+    """Scrape a Steam page
+
+    If a limiter is passed, every request waits for its turn to be sent to that host. The timeout
+    applies to every request separately, starting from when it's sent.
+    """
+    if limiter is None:
+        limiter = HostLimiter()
+
     # If not currently on a Steam page, follow a redirect chain until you are
     if not url.startswith("https://store.steampowered.com/"):
-        async with http_session.head(url, allow_redirects=True) as response:
+        async with limiter.acquire(url, timeout=timeout), http_session.head(url, allow_redirects=True) as response:
             url = str(response.url)
 
-    async with http_session.get(url) as response:
+    async with limiter.acquire(url, timeout=timeout), http_session.get(url) as response:
         if response.status != HTTPStatus.OK:
             return None
 
@@ -2,6 +2,7 @@ import logging
 import os
 import pathlib
 import re
+from concurrent.futures import ProcessPoolExecutor
 from functools import cached_property
 from typing import Optional, Union
 
@@ -11,13 +12,15 @@ from discord.ext import commands
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import settings
-from database.crud import command_stats, custom_commands
+from database.crud.command_stats import create_command_invocation
 from database.engine import DBSession
 from database.utils.caches import CacheManager
+from database.utils.command_stats import CommandStatsBuffer
 from didier.data.embeds.error_embed import create_error_embed
 from didier.data.embeds.logging_embed import create_logging_embed
-from didier.data.embeds.schedules import Schedule, parse_schedule
+from didier.data.embeds.schedules import Schedule, ScheduleEmbedCache, parse_schedule
 from didier.exceptions import GetNoneException, HTTPException, NoMatch
+from didier.utils.discord.pipeline import MessagePipeline, MessageView
 from didier.utils.discord.prefix import get_prefix
 from didier.utils.discord.snipe import should_snipe
 from didier.utils.easter_eggs import detect_easter_egg
@@ -32,10 +35,13 @@ logger = logging.getLogger(__name__)
 class Didier(commands.Bot):
     """DIDIER <3"""
 
+    command_stats: CommandStatsBuffer
     database_caches: CacheManager
     error_channel: Optional[discord.abc.Messageable] = None
     initial_extensions: tuple[str, ...] = ()
     http_session: ClientSession
+    message_pipeline: MessagePipeline
+    schedule_embeds: ScheduleEmbedCache
     schedules: dict[settings.ScheduleType, Schedule] = {}
     sniped: dict[int, tuple[discord.Message, Optional[discord.Message]]] = {}
 
@@ -59,6 +65,15 @@ class Didier(commands.Bot):
         # I'm not creating a custom tree, this is the way to do it
         self.tree.on_error = self.on_app_command_error  # type: ignore[method-assign]
 
+        self.schedule_embeds = ScheduleEmbedCache()
+
+        # Stages that every message goes through, in order
+        self.message_pipeline = MessagePipeline()
+        self.message_pipeline.add_stage("boos", self._react_boos)
+        self.message_pipeline.add_stage("custom_commands", self._try_invoke_custom_command)
+        self.message_pipeline.add_stage("commands", self._try_invoke_command)
+        self.message_pipeline.add_stage("easter_eggs", self._try_respond_easter_egg)
+
     @cached_property
     def main_guild(self) -> discord.Guild:
         """Obtain a reference to the main guild"""
@@ -68,6 +83,11 @@ class Didier(commands.Bot):
 
         return guild
 
+    @cached_property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """Worker process for CPU-heavy work that would otherwise block the event loop"""
+        return ProcessPoolExecutor(max_workers=1)
+
     @property
     def postgres_session(self) -> AsyncSession:
         """Obtain a session for the PostgreSQL database"""
@@ -86,6 +106,10 @@ class Didier(commands.Bot):
         async with self.postgres_session as session:
             await self.database_caches.initialize_caches(session)
 
+        # Command invocations are written to the database in batches
+        self.command_stats = CommandStatsBuffer(DBSession)
+        self.command_stats.start()
+
         # Create aiohttp session
         self.http_session = ClientSession(
             headers={
@@ -130,15 +154,35 @@ class Didier(commands.Bot):
 
     async def load_schedules(self):
         """Parse & load all schedules into memory"""
-        self.schedules = {}
+        schedules: dict[settings.ScheduleType, Schedule] = {}
 
         async with self.postgres_session as session:
             for schedule_data in settings.SCHEDULE_DATA:
-                schedule = await parse_schedule(schedule_data.name, database_session=session)
+                schedule = await parse_schedule(
+                    schedule_data.name, database_session=session, executor=self.process_pool
+                )
                 if schedule is None:
                     continue
 
-                self.schedules[schedule_data.name] = schedule
+                schedules[schedule_data.name] = schedule
+
+        self.replace_schedules(schedules)
+
+    def replace_schedules(self, schedules: dict[settings.ScheduleType, Schedule]):
+        """Swap in new schedules, and throw away everything that was rendered for the old ones"""
+        self.schedules = schedules
+        self.schedule_embeds.invalidate()
+
+    async def close(self) -> None:
+        """Write everything that is still pending to the database & stop the workers before shutting down"""
+        if hasattr(self, "command_stats"):
+            await self.command_stats.close()
+
+        # Only shut the pool down if it was ever created
+        if "process_pool" in self.__dict__:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+
+        await super().close()
 
     async def get_reply_target(self, ctx: commands.Context) -> discord.Message:
         """Get the target message that should be replied to
@@ -200,12 +244,24 @@ class Didier(commands.Bot):
         """Log a warning message"""
         await self._log(logging.WARNING, message, log_to_discord)
 
-    async def _try_invoke_custom_command(self, message: discord.Message) -> bool:
+    async def _react_boos(self, view: MessageView) -> bool:
+        """Boos react to people that say Dider
+
+        This never stops the message from being processed further
+        """
+        if "dider" in view.lowered and self.user is not None and view.message.author.id != self.user.id:
+            await view.message.add_reaction(settings.DISCORD_BOOS_REACT)
+
+        return False
+
+    async def _try_invoke_custom_command(self, view: MessageView) -> bool:
         """Check if the message tries to invoke a custom command
 
         If it does, send the reply associated with it
         Returns a boolean indicating if a message invoked a command or not
         """
+        message = view.message
+
         # Doesn't start with the custom command prefix
         if not message.content.startswith(settings.DISCORD_CUSTOM_COMMAND_PREFIX):
             return False
@@ -217,16 +273,37 @@ class Didier(commands.Bot):
         if not content:
             return False
 
-        async with self.postgres_session as session:
-            command = await custom_commands.get_command(session, content)
-
-            # Command found
-            if command is not None:
-                await message.reply(command.response, mention_author=False)
-                return True
+        # Look the command up in the cache, so that typos don't cost a database query
+        response = self.database_caches.custom_commands.get_response(content)
 
         # Nothing found
-        return False
+        if response is None:
+            return False
+
+        await message.reply(response, mention_author=False)
+        return True
+
+    async def _try_invoke_command(self, view: MessageView) -> bool:
+        """Process the commands in a message
+
+        Messages that don't start with a prefix can't invoke anything, so those are skipped entirely.
+        Messages that are only a prefix are passed on, as they can still trigger an easter egg.
+        """
+        if view.prefix is None:
+            return False
+
+        await self.process_commands(view.message)
+
+        return view.cleaned != view.prefix.strip().lower()
+
+    async def _try_respond_easter_egg(self, view: MessageView) -> bool:
+        """Check if a message triggers an easter egg, and respond to it"""
+        easter_egg = await detect_easter_egg(view, self.database_caches.easter_eggs)
+        if easter_egg is None:
+            return False
+
+        await view.message.reply(easter_egg, mention_author=False)
+        return True
 
     async def on_app_command_completion(
         self,
@@ -235,9 +312,7 @@ class Didier(commands.Bot):
     ):
         """Event triggered when an app command completes successfully"""
         ctx = await commands.Context.from_interaction(interaction)
-
-        async with self.postgres_session as session:
-            await command_stats.register_command_invocation(session, ctx, command, tz_aware_now())
+        self.command_stats.add(create_command_invocation(ctx, command, tz_aware_now()))
 
     async def on_app_command_error(self, interaction: discord.Interaction, exception: Exception):
         """Event triggered when an application command errors"""
@@ -268,8 +343,7 @@ class Didier(commands.Bot):
         if ctx.interaction is not None:
             return
 
-        async with self.postgres_session as session:
-            await command_stats.register_command_invocation(session, ctx, ctx.command, tz_aware_now())
+        self.command_stats.add(create_command_invocation(ctx, ctx.command, tz_aware_now()))
 
     async def on_command_error(self, ctx: commands.Context, exception: commands.CommandError, /):
         """Event triggered when a message command errors"""
@@ -345,19 +419,8 @@ class Didier(commands.Bot):
         if message.author.bot:
             return
 
-        # Boos react to people that say Dider
-        if "dider" in message.content.lower() and self.user is not None and message.author.id != self.user.id:
-            await message.add_reaction(settings.DISCORD_BOOS_REACT)
-
-        # Potential custom command
-        if await self._try_invoke_custom_command(message):
-            return
-
-        await self.process_commands(message)
-
-        easter_egg = await detect_easter_egg(self, message, self.database_caches.easter_eggs)
-        if easter_egg is not None:
-            await message.reply(easter_egg, mention_author=False)
+        view = MessageView.from_message(self, message)
+        await self.message_pipeline.run(view)
 
     async def on_message_delete(self, message: discord.Message):
         """Event triggered when a message is deleted"""
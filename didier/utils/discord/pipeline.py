@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import discord
+from discord.ext import commands
+
+from didier.utils.discord.prefix import match_prefix
+
+__all__ = ["MessagePipeline", "MessageView", "StageTiming"]
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MessageView:
+    """A normalized view of a message
+
+    This is computed once per message, and then shared by all stages of the pipeline
+    so that they don't all have to strip & lowercase the content again
+    """
+
+    message: discord.Message
+    # Content without leading or trailing whitespace
+    stripped: str
+    # Stripped & lowercase content
+    lowered: str
+    # Lowercase content without any markdown or whitespace around it
+    cleaned: str
+    # The prefix that was used, if any
+    prefix: Optional[str]
+
+    @classmethod
+    def from_message(cls, client: commands.Bot, message: discord.Message) -> MessageView:
+        """Create a view for a message"""
+        stripped = message.content.strip()
+        lowered = stripped.lower()
+
+        return cls(
+            message=message,
+            stripped=stripped,
+            lowered=lowered,
+            cleaned=lowered.strip("_* \t\n"),
+            prefix=match_prefix(client, message),
+        )
+
+
+@dataclass
+class StageTiming:
+    """Timing information for a single stage of the pipeline"""
+
+    calls: int = 0
+    total: float = 0
+    slowest: float = 0
+
+    @property
+    def average(self) -> float:
+        """The average duration of this stage, in seconds"""
+        return self.total / self.calls if self.calls else 0
+
+    def record(self, duration: float):
+        """Record a new run of this stage"""
+        self.calls += 1
+        self.total += duration
+        self.slowest = max(self.slowest, duration)
+
+
+StageT = Callable[[MessageView], Awaitable[bool]]
+
+
+@dataclass
+class MessagePipeline:
+    """A list of stages that every message passes through, in order
+
+    Every stage returns a boolean indicating if it handled the message. If it did,
+    the remaining stages are skipped. The time spent in every stage is recorded.
+    """
+
+    stages: list[tuple[str, StageT]] = field(default_factory=list)
+    timings: dict[str, StageTiming] = field(default_factory=dict)
+
+    def add_stage(self, name: str, stage: StageT):
+        """Add a new stage at the end of the pipeline"""
+        self.stages.append((name, stage))
+        self.timings[name] = StageTiming()
+
+    async def run(self, view: MessageView) -> Optional[str]:
+        """Pass a message through all stages
+
+        Returns the name of the stage that handled the message, if any
+        """
+        for name, stage in self.stages:
+            start = time.perf_counter()
+
+            try:
+                handled = await stage(view)
+            finally:
+                self.timings[name].record(time.perf_counter() - start)
+
+            if handled:
+                return name
+
+        return None
+
+    def reset_timings(self):
+        """Clear all timing information"""
+        for name in self.timings:
+            self.timings[name] = StageTiming()
@@ -1,3 +1,4 @@
+import functools
 import re
 from typing import Optional
 
@@ -6,31 +7,59 @@ from discord.ext import commands
 
 from didier.data import constants
 
-__all__ = ["get_prefix", "match_prefix"]
+__all__ = ["PrefixMatcher", "get_prefix", "get_prefix_matcher", "match_prefix"]
 
 
-def match_prefix(client: commands.Bot, message: Message) -> Optional[str]:
-    """Try to match a prefix against a message, returning None instead of a default value
+class PrefixMatcher:
+    """Class that matches all prefixes against a message at once
 
-    This is done dynamically through regexes to allow case-insensitivity
-    and variable amounts of whitespace among other things.
+    All prefixes are compiled into one case-insensitive pattern that allows
+    variable amounts of whitespace. The result for the last message is remembered,
+    as the same message is matched multiple times while it's being processed.
     """
-    mention = f"<@!?{client.user.id}>" if client.user else None
-    regex = r"^({})\s*"
 
-    # Check which prefix was used
-    for prefix in [*constants.PREFIXES, mention]:
-        if prefix is None:
-            continue
+    pattern: re.Pattern
+    _last_content: Optional[str] = None
+    _last_result: Optional[str] = None
+
+    def __init__(self, user_id: Optional[int]):
+        prefixes = list(constants.PREFIXES)
+
+        if user_id is not None:
+            prefixes.append(f"<@!?{user_id}>")
+
+        self.pattern = re.compile(r"^({})\s*".format("|".join(prefixes)), flags=re.I)
+
+    def match(self, content: str) -> Optional[str]:
+        """Try to match a prefix against the content of a message"""
+        if content == self._last_content:
+            return self._last_result
+
+        match = self.pattern.match(content)
+
+        # Get the part of the message that was matched
+        # .group() is inconsistent with whitespace, so that can't be used
+        result = content[: match.end()] if match is not None else None
 
-        match = re.match(regex.format(prefix), message.content, flags=re.I)
+        self._last_content = content
+        self._last_result = result
 
-        if match is not None:
-            # Get the part of the message that was matched
-            # .group() is inconsistent with whitespace, so that can't be used
-            return message.content[: match.end()]
+        return result
 
-    return None
+
+@functools.cache
+def get_prefix_matcher(user_id: Optional[int]) -> PrefixMatcher:
+    """Get the prefix matcher for a given bot user
+
+    This is only built once, instead of compiling the prefixes for every message
+    """
+    return PrefixMatcher(user_id)
+
+
+def match_prefix(client: commands.Bot, message: Message) -> Optional[str]:
+    """Try to match a prefix against a message, returning None instead of a default value"""
+    matcher = get_prefix_matcher(client.user.id if client.user else None)
+    return matcher.match(message.content)
 
 
 def get_prefix(client: commands.Bot, message: Message) -> str:
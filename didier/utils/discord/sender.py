@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Optional
+
+import discord
+
+__all__ = ["BoundedSender"]
+
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedSender:
+    """Send a large amount of messages concurrently, without flooding the API
+
+    Only a limited amount of messages are being sent at the same time. discord.py already
+    waits for rate limits by itself, but when one slips through anyway the message is
+    retried after waiting for as long as Discord asks.
+    """
+
+    limit: int
+    max_retries: int
+    sent: int
+    failed: int
+
+    _semaphore: asyncio.Semaphore
+
+    def __init__(self, *, limit: int = 5, max_retries: int = 3):
+        self.limit = limit
+        self.max_retries = max_retries
+        self.sent = 0
+        self.failed = 0
+
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def send(self, target: discord.abc.Messageable, **kwargs) -> Optional[discord.Message]:
+        """Send a message to a target, returning None if it couldn't be sent"""
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    message = await target.send(**kwargs)
+                    self.sent += 1
+                    return message
+                except discord.Forbidden:
+                    # DMs are closed, no point in retrying
+                    break
+                except discord.RateLimited as e:
+                    delay = e.retry_after
+                except discord.HTTPException as e:
+                    # Only retry errors that could be temporary
+                    if e.status != 429 and e.status < 500:
+                        logger.warning(f"Unable to send message to {target} (status {e.status}).")
+                        break
+
+                    delay = 2**attempt
+
+                if attempt < self.max_retries:
+                    await asyncio.sleep(delay)
+
+        self.failed += 1
+        return None
@@ -1,13 +1,9 @@
 import random
-import re
 from typing import Optional
 
-import discord
-from discord.ext import commands
-
 import settings
 from database.utils.caches import EasterEggCache
-from didier.utils.discord.prefix import match_prefix
+from didier.utils.discord.pipeline import MessageView
 
 __all__ = ["detect_easter_egg"]
 
@@ -18,16 +14,14 @@ def _roll_easter_egg(response: str) -> Optional[str]:
     return response if rolled else None
 
 
-async def detect_easter_egg(client: commands.Bot, message: discord.Message, cache: EasterEggCache) -> Optional[str]:
+async def detect_easter_egg(view: MessageView, cache: EasterEggCache) -> Optional[str]:
     """Try to detect an easter egg in a message"""
-    prefix = match_prefix(client, message)
-
-    # Remove markdown and whitespace for better matches
-    content = message.content.strip().strip("_* \t\n").lower()
+    # Markdown and whitespace were already removed for better matches
+    content = view.cleaned
 
     # Message calls Didier
-    if prefix is not None:
-        prefix = prefix.strip().lower()
+    if view.prefix is not None:
+        prefix = view.prefix.strip().lower()
 
         # Message is only "Didier"
         if content == prefix:
@@ -36,18 +30,8 @@ async def detect_easter_egg(client: commands.Bot, message: discord.Message, cach
             # Message invokes a command: do nothing
             return None
 
-    for easter_egg in cache.easter_eggs:
-        pattern = easter_egg.match
-
-        # Use regular expressions to easily allow slight variations
-        if easter_egg.exact:
-            pattern = rf"^{pattern}$"
-        elif easter_egg.startswith:
-            pattern = rf"^{pattern}"
-
-        matched = re.search(pattern, content)
-
-        if matched is not None:
-            return _roll_easter_egg(easter_egg.response)
+    response = cache.match(content)
+    if response is not None:
+        return _roll_easter_egg(response)
 
     return None
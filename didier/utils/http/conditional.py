@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import pathlib
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from aiohttp import ClientSession
+
+__all__ = ["CacheValidators", "ConditionalResponse", "conditional_get"]
+
+
+@dataclass
+class CacheValidators:
+    """The headers of a previous response that can be used to check if a resource has changed"""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> CacheValidators:
+        """Load validators from a file, or create empty ones if they can't be read"""
+        try:
+            with open(path, "r", encoding="utf-8") as fp:
+                return cls(**json.load(fp))
+        except (OSError, ValueError, TypeError):
+            return cls()
+
+    def save(self, path: pathlib.Path):
+        """Write the validators to a file"""
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(asdict(self), fp)
+
+    def to_headers(self) -> dict[str, str]:
+        """Create the headers for a conditional request"""
+        headers = {}
+
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+@dataclass
+class ConditionalResponse:
+    """The result of a conditional request"""
+
+    status: int
+    # The content is only present if the resource was modified
+    content: Optional[str] = None
+    validators: CacheValidators = field(default_factory=CacheValidators)
+
+    @property
+    def modified(self) -> bool:
+        """Check if the request returned new content"""
+        return self.status == 200
+
+    @property
+    def not_modified(self) -> bool:
+        """Check if the resource hasn't changed since the previous request"""
+        return self.status == 304
+
+
+async def conditional_get(
+    http_session: ClientSession, url: str, validators: Optional[CacheValidators] = None
+) -> ConditionalResponse:
+    """Send a GET-request that only downloads the content if it changed since the previous request"""
+    if validators is None:
+        validators = CacheValidators()
+
+    async with http_session.get(url, headers=validators.to_headers()) as response:
+        if response.status == 304:
+            return ConditionalResponse(status=304, validators=validators)
+
+        if response.status != 200:
+            return ConditionalResponse(status=response.status, validators=validators)
+
+        new_validators = CacheValidators(
+            etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified")
+        )
+
+        return ConditionalResponse(status=200, content=await response.text(), validators=new_validators)
@@ -0,0 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
+from urllib.parse import urlparse
+
+import async_timeout
+
+__all__ = ["HostLimiter"]
+
+
+class HostLimiter:
+    """Limit the amount of requests that are sent to the same host at the same time
+
+    Requests to different hosts don't have to wait for each other
+    """
+
+    limit: int
+    _semaphores: dict[str, asyncio.Semaphore]
+
+    def __init__(self, *, limit: int = 2):
+        self.limit = limit
+        self._semaphores = {}
+
+    @asynccontextmanager
+    async def acquire(self, url: str, *, timeout: Optional[float] = None) -> AsyncGenerator[None, None]:
+        """Wait until a request can be sent to the host of a url
+
+        The timeout only starts once it's this request's turn, so time spent waiting for others doesn't count
+        """
+        host = urlparse(url).hostname or ""
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.limit))
+
+        async with semaphore, async_timeout.timeout(timeout):
+            yield
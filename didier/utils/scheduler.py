@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
+
+if TYPE_CHECKING:
+    from didier import Didier
+
+import discord.utils
+
+from database import enums
+from database.crud.tasks import get_all_tasks, set_task_execution_times
+from database.schemas import Task
+from didier.utils.types.datetime import LOCAL_TIMEZONE, tz_aware_now
+
+__all__ = ["Daily", "ScheduledTask", "TaskScheduler", "get_first_run"]
+
+
+@dataclass(frozen=True)
+class Daily:
+    """Cadence for tasks that run once per day, at a fixed time"""
+
+    at: time
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Get the first time this task should run after a given moment"""
+        local = moment.astimezone(LOCAL_TIMEZONE)
+        at = self.at.replace(tzinfo=None)
+
+        candidate = datetime.combine(local.date(), at, tzinfo=LOCAL_TIMEZONE)
+        if candidate <= local:
+            candidate = datetime.combine(local.date() + timedelta(days=1), at, tzinfo=LOCAL_TIMEZONE)
+
+        return candidate
+
+
+def get_first_run(cadence: Daily, task: Optional[Task], now: datetime) -> datetime:
+    """Get the first time a task should run after starting up
+
+    Tasks that were due while Didier was offline run right away. Tasks that never ran before
+    wait until their next regular run, so that a new task doesn't fire at whatever time Didier starts.
+    """
+    if task is None or task.previous_run is None:
+        due = cadence.next_after(now)
+    else:
+        due = cadence.next_after(task.previous_run)
+
+    # The stored time has jitter applied, but if the cadence changed in the meantime it may be outdated
+    if task is not None and task.next_run is not None:
+        due = min(due, task.next_run)
+
+    return max(due, now)
+
+
+@dataclass
+class ScheduledTask:
+    """A task that is run by the scheduler
+
+    This mimics the parts of discord.ext.tasks.Loop that are used by the Tasks cog
+    """
+
+    task: enums.TaskType
+    cadence: Daily
+    callback: Callable[..., Awaitable[Any]]
+    # Random delay that is added to every run, so that tasks at the same time don't all fire at once
+    jitter: timedelta
+    scheduler: TaskScheduler = field(repr=False)
+
+    next_iteration: Optional[datetime] = None
+    _runner: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    async def __call__(self, **kwargs):
+        """Run the task right now, without affecting when it runs next"""
+        await self.scheduler.run(self, reschedule=False, **kwargs)
+
+    def is_running(self) -> bool:
+        """Check if the task is currently scheduled"""
+        return self._runner is not None and not self._runner.done()
+
+    def stop(self):
+        """Stop running the task"""
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+
+        self.next_iteration = None
+
+    def apply_jitter(self, moment: datetime) -> datetime:
+        """Delay a moment by a random amount of the jitter"""
+        return moment + timedelta(seconds=random.uniform(0, self.jitter.total_seconds()))
+
+
+class TaskScheduler:
+    """Runs tasks based on when they last ran, instead of waking up every hour to check
+
+    The next run time of every task is stored in the database, so tasks that were
+    missed while Didier was offline run (once) right after starting up.
+    """
+
+    client: Didier
+    on_error: Callable[[BaseException], Awaitable[Any]]
+    _tasks: dict[enums.TaskType, ScheduledTask]
+
+    def __init__(self, client: Didier, on_error: Callable[[BaseException], Awaitable[Any]]):
+        self.client = client
+        self.on_error = on_error
+        self._tasks = {}
+
+    def schedule(
+        self,
+        task: enums.TaskType,
+        cadence: Daily,
+        callback: Callable[..., Awaitable[Any]],
+        *,
+        jitter: timedelta = timedelta(minutes=1),
+    ) -> ScheduledTask:
+        """Add a task to the scheduler
+
+        The task only starts running once start() is called
+        """
+        scheduled = ScheduledTask(task=task, cadence=cadence, callback=callback, jitter=jitter, scheduler=self)
+        self._tasks[task] = scheduled
+        return scheduled
+
+    async def start(self, *tasks: ScheduledTask):
+        """Start running tasks, starting with the ones that are overdue"""
+        async with self.client.postgres_session as session:
+            stored = {task.task: task for task in await get_all_tasks(session)}
+
+        now = tz_aware_now()
+
+        for scheduled in tasks:
+            if scheduled.is_running():
+                continue
+
+            scheduled.next_iteration = scheduled.apply_jitter(
+                get_first_run(scheduled.cadence, stored.get(scheduled.task), now)
+            )
+            scheduled._runner = asyncio.create_task(self._run_forever(scheduled))
+
+    def stop(self):
+        """Stop all tasks"""
+        for scheduled in self._tasks.values():
+            scheduled.stop()
+
+    async def _run_forever(self, scheduled: ScheduledTask):
+        while scheduled.next_iteration is not None:
+            await discord.utils.sleep_until(scheduled.next_iteration)
+            await self.run(scheduled)
+
+    async def run(self, scheduled: ScheduledTask, *, reschedule: bool = True, **kwargs):
+        """Run a task, and store when it ran
+
+        If the task should be rescheduled, the time it should run next is stored as well
+        """
+        previous_run: Optional[datetime] = None
+
+        try:
+            await scheduled.callback(**kwargs)
+            previous_run = tz_aware_now()
+        except Exception as e:
+            # Failed runs are not retried until the next iteration, to avoid spamming errors
+            await self.on_error(e)
+
+        next_run: Optional[datetime] = None
+        if reschedule:
+            next_run = scheduled.apply_jitter(scheduled.cadence.next_after(tz_aware_now()))
+            scheduled.next_iteration = next_run
+
+        try:
+            async with self.client.postgres_session as session:
+                await set_task_execution_times(session, scheduled.task, previous_run=previous_run, next_run=next_run)
+        except Exception as e:
+            await self.on_error(e)
@@ -29,6 +29,7 @@ class CreateCustomCommand(discord.ui.Modal, title="Create Custom Command"):
     async def on_submit(self, interaction: discord.Interaction):
         async with self.client.postgres_session as session:
             command = await create_command(session, str(self.name.value), str(self.response.value))
+            self.client.database_caches.custom_commands.add_command(command)
 
         await interaction.response.send_message(f"Successfully created ``{command.name}``.", ephemeral=True)
 
@@ -69,7 +70,8 @@ class EditCustomCommand(discord.ui.Modal, title="Edit Custom Command"):
         response_field = typing.cast(discord.ui.TextInput, self.children[1])
 
         async with self.client.postgres_session as session:
-            await edit_command(session, self.original_name, name_field.value, response_field.value)
+            command = await edit_command(session, self.original_name, name_field.value, response_field.value)
+            self.client.database_caches.custom_commands.edit_command(command)
 
         await interaction.response.send_message(f"Successfully edited `{self.original_name}`.", ephemeral=True)
 
@@ -17,6 +17,8 @@ __all__ = [
     "MENU_TIMEOUT",
     "EASTER_EGG_CHANCE",
     "REMINDER_PRE",
+    "UFORA_POLL_MIN_INTERVAL",
+    "UFORA_POLL_MAX_INTERVAL",
     "POSTGRES_DB",
     "POSTGRES_USER",
     "POSTGRES_PASS",
@@ -49,6 +51,9 @@ YEAR: int = env.int("YEAR", 3)
 MENU_TIMEOUT: int = env.int("MENU_TIMEOUT", 30)
 EASTER_EGG_CHANCE: int = env.int("EASTER_EGG_CHANCE", 15)
 REMINDER_PRE: int = env.int("REMINDER_PRE", 15)
+# Bounds (in minutes) for how often the Ufora feed of a single course is checked
+UFORA_POLL_MIN_INTERVAL: int = env.int("UFORA_POLL_MIN_INTERVAL", 10)
+UFORA_POLL_MAX_INTERVAL: int = env.int("UFORA_POLL_MAX_INTERVAL", 120)
 
 """Database"""
 # PostgreSQL
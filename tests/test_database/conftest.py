@@ -1,9 +1,12 @@
 import datetime
+from typing import Generator
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.crud import users
+from database.crud import currency, users
+from database.engine import postgres_engine
 from database.schemas import (
     Bank,
     UforaAnnouncement,
@@ -11,6 +14,29 @@ from database.schemas import (
     UforaCourseAlias,
     User,
 )
+from tests.test_database.helpers import StatementCounter
+
+
+@pytest.fixture(autouse=True)
+def clear_known_users():
+    """Fixture to forget about all known users
+
+    Every test rolls back its transaction, so users that existed in one test are gone in the next
+    """
+    users.known_users.clear()
+
+
+@pytest.fixture
+def statement_counter(postgres: AsyncSession) -> Generator[StatementCounter, None, None]:
+    """Fixture to count the statements that are executed during a test"""
+    counter = StatementCounter()
+
+    def _count(*_, **__):
+        counter.count += 1
+
+    event.listen(postgres_engine.sync_engine, "before_cursor_execute", _count)
+    yield counter
+    event.remove(postgres_engine.sync_engine, "before_cursor_execute", _count)
 
 
 @pytest.fixture(scope="session")
@@ -26,6 +52,7 @@ def test_user_id() -> int:
 async def user(postgres: AsyncSession, test_user_id: int) -> User:
     """Fixture to create a user"""
     _user = await users.get_or_add_user(postgres, test_user_id)
+    await postgres.commit()
     await postgres.refresh(_user)
     return _user
 
@@ -33,9 +60,7 @@ async def user(postgres: AsyncSession, test_user_id: int) -> User:
 @pytest.fixture
 async def bank(postgres: AsyncSession, user: User) -> Bank:
     """Fixture to fetch the test user's bank"""
-    _bank = user.bank
-    await postgres.refresh(_bank)
-    return _bank
+    return await currency.get_bank(postgres, user.user_id)
 
 
 @pytest.fixture
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+__all__ = ["StatementCounter"]
+
+
+@dataclass
+class StatementCounter:
+    """Keeps track of the amount of statements sent to the database"""
+
+    count: int = 0
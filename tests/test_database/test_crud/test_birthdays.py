@@ -10,11 +10,12 @@ from database.schemas import User
 
 async def test_add_birthday_not_present(postgres: AsyncSession, user: User):
     """Test setting a user's birthday when it doesn't exist yet"""
+    await postgres.refresh(user, ["birthday"])
     assert user.birthday is None
 
     bd_date = datetime.today().date()
     await crud.add_birthday(postgres, user.user_id, bd_date)
-    await postgres.refresh(user)
+    await postgres.refresh(user, ["birthday"])
     assert user.birthday is not None
     assert user.birthday.birthday == bd_date
 
@@ -23,12 +24,12 @@ async def test_add_birthday_overwrite(postgres: AsyncSession, user: User):
     """Test that setting a user's birthday when it already exists overwrites it"""
     bd_date = datetime.today().date()
     await crud.add_birthday(postgres, user.user_id, bd_date)
-    await postgres.refresh(user)
+    await postgres.refresh(user, ["birthday"])
     assert user.birthday is not None
 
     new_bd_date = bd_date + timedelta(weeks=1)
     await crud.add_birthday(postgres, user.user_id, new_bd_date)
-    await postgres.refresh(user)
+    await postgres.refresh(user, ["birthday"])
     assert user.birthday.birthday == new_bd_date
 
 
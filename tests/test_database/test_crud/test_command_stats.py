@@ -0,0 +1,41 @@
+import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.crud import command_stats as crud
+from database.schemas import Bank, CommandStats, User
+
+
+def _invocation(user_id: int, command: str = "ping") -> crud.CommandInvocation:
+    return crud.CommandInvocation(
+        command=command,
+        timestamp=datetime.datetime.now(tz=datetime.timezone.utc),
+        user_id=user_id,
+        slash=False,
+        context_menu=False,
+    )
+
+
+async def test_register_command_invocations(postgres: AsyncSession, user: User):
+    """Test inserting a batch of invocations, creating the users that don't exist yet"""
+    await crud.register_command_invocations(
+        postgres, [_invocation(user.user_id), _invocation(2, "pong"), _invocation(2, "ping")]
+    )
+
+    stats = (await postgres.execute(select(CommandStats))).scalars().all()
+    assert len(stats) == 3
+
+    users = (await postgres.execute(select(User.user_id))).scalars().all()
+    assert sorted(users) == [user.user_id, 2]
+
+    banks = (await postgres.execute(select(Bank.user_id))).scalars().all()
+    assert sorted(banks) == [user.user_id, 2]
+
+
+async def test_register_command_invocations_empty(postgres: AsyncSession):
+    """Test inserting an empty batch of invocations"""
+    await crud.register_command_invocations(postgres, [])
+
+    stats = (await postgres.execute(select(CommandStats))).scalars().all()
+    assert len(stats) == 0
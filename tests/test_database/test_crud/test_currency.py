@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from database.crud import currency as crud
 from database.exceptions import currency as exceptions
 from database.schemas import Bank
+from database.utils.math.currency import rob_upgrade_price
 
 
 async def test_add_dinks(postgres: AsyncSession, bank: Bank):
@@ -77,3 +78,65 @@ async def test_invest_more_than_owned(postgres: AsyncSession, bank: Bank):
 
     assert bank.dinks == 0
     assert bank.invested == 100
+
+
+async def test_withdraw_more_than_invested(postgres: AsyncSession, bank: Bank):
+    """Test withdrawing more Dinks than you have invested"""
+    bank.invested = 100
+    postgres.add(bank)
+    await postgres.commit()
+
+    withdrawn = await crud.withdraw(postgres, bank.user_id, 200)
+    await postgres.refresh(bank)
+
+    assert withdrawn == 100
+    assert bank.dinks == 100
+    assert bank.invested == 0
+
+
+async def test_gamble_won(postgres: AsyncSession, bank: Bank):
+    """Test winning a gamble"""
+    bank.dinks = 100
+    postgres.add(bank)
+    await postgres.commit()
+
+    profit = await crud.gamble_dinks(postgres, bank.user_id, 40, 3, True)
+    await postgres.refresh(bank)
+
+    assert profit == 80
+    assert bank.dinks == 180
+
+
+async def test_gamble_lost_more_than_owned(postgres: AsyncSession, bank: Bank):
+    """Test losing a gamble for more Dinks than you own"""
+    bank.dinks = 100
+    postgres.add(bank)
+    await postgres.commit()
+
+    lost = await crud.gamble_dinks(postgres, bank.user_id, 200, 2, False)
+    await postgres.refresh(bank)
+
+    assert lost == 100
+    assert bank.dinks == 0
+
+
+async def test_upgrade(postgres: AsyncSession, bank: Bank):
+    """Test upgrading a level"""
+    bank.dinks = 2000
+    postgres.add(bank)
+    await postgres.commit()
+
+    assert await crud.upgrade_rob(postgres, bank.user_id) == 2
+    await postgres.refresh(bank)
+
+    assert bank.dinks == 2000 - rob_upgrade_price(1)
+    assert bank.rob_level == 2
+
+
+async def test_upgrade_not_enough_dinks(postgres: AsyncSession, bank: Bank):
+    """Test upgrading a level without having enough Dinks"""
+    with pytest.raises(exceptions.NotEnoughDinks):
+        await crud.upgrade_capacity(postgres, bank.user_id)
+
+    await postgres.refresh(bank)
+    assert bank.capacity_level == 1
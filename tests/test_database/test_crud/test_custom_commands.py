@@ -39,7 +39,7 @@ async def test_create_alias(postgres: AsyncSession):
     command = await crud.create_command(postgres, "name", "response")
     await crud.create_alias(postgres, command.name, "n")
 
-    await postgres.refresh(command)
+    await postgres.refresh(command, ["aliases"])
     assert len(command.aliases) == 1
     assert command.aliases[0].alias == "n"
 
@@ -110,6 +110,7 @@ async def test_edit_command(postgres: AsyncSession):
     command = await crud.create_command(postgres, "name", "response")
     await crud.edit_command(postgres, command.name, "new name", "new response")
     assert command.name == "new name"
+    assert command.indexed_name == "newname"
     assert command.response == "new response"
 
 
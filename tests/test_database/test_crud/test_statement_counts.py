@@ -0,0 +1,77 @@
+"""Tests that assert how many statements the most frequently used queries send to the database
+
+Relationships are only loaded when a query explicitly asks for them, so these
+catch regressions where a query starts loading (a lot) more than it needs
+"""
+import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.crud import (
+    currency,
+    custom_commands,
+    deadlines,
+    ufora_announcements,
+    ufora_courses,
+    users,
+)
+from database.schemas import UforaCourse, User
+from tests.test_database.helpers import StatementCounter
+
+
+async def test_get_or_add_existing_user(postgres: AsyncSession, user: User, statement_counter: StatementCounter):
+    """Test that fetching an existing user doesn't load any relationships"""
+    await users.get_or_add_user(postgres, user.user_id)
+    assert statement_counter.count == 1
+
+
+async def test_get_or_add_new_user(postgres: AsyncSession, statement_counter: StatementCounter):
+    """Test that creating a new user only inserts once, and then fetches the user"""
+    await users.get_or_add_user(postgres, 1)
+    assert statement_counter.count == 2
+
+
+async def test_get_bank_known_user(postgres: AsyncSession, user: User, statement_counter: StatementCounter):
+    """Test that fetching the bank of a known user only fetches the bank"""
+    await currency.get_bank(postgres, user.user_id)
+    assert statement_counter.count == 1
+
+
+async def test_get_all_courses(
+    postgres: AsyncSession, ufora_course_with_alias: UforaCourse, statement_counter: StatementCounter
+):
+    """Test that fetching all courses only loads their aliases"""
+    await ufora_courses.get_all_courses(postgres)
+    assert statement_counter.count == 2
+
+
+async def test_get_courses_with_announcements(
+    postgres: AsyncSession, ufora_course: UforaCourse, statement_counter: StatementCounter
+):
+    """Test that fetching the courses with announcements only loads their announcements"""
+    await ufora_announcements.get_courses_with_announcements(postgres)
+    assert statement_counter.count == 2
+
+
+async def test_add_announcements(
+    postgres: AsyncSession, ufora_course: UforaCourse, statement_counter: StatementCounter
+):
+    """Test that all announcements of a poll are inserted at once"""
+    now = datetime.datetime.now()
+    await ufora_announcements.add_announcements(postgres, [(i, ufora_course.course_id, now) for i in range(1, 11)])
+    assert statement_counter.count == 1
+
+
+async def test_get_command_by_name(postgres: AsyncSession, statement_counter: StatementCounter):
+    """Test that fetching a command by its name doesn't load its aliases"""
+    await custom_commands.create_command(postgres, "name", "response")
+    statement_counter.count = 0
+
+    await custom_commands.get_command(postgres, "name")
+    assert statement_counter.count == 1
+
+
+async def test_get_deadlines_none(postgres: AsyncSession, statement_counter: StatementCounter):
+    """Test that fetching deadlines doesn't load any courses if there are no deadlines"""
+    await deadlines.get_deadlines(postgres)
+    assert statement_counter.count == 1
@@ -61,3 +61,17 @@ async def test_set_execution_time_doesnt_exist(postgres: AsyncSession, task_type
     assert len(results) == 1
     task = results[0]
     assert task.previous_run == datetime.datetime(year=2022, month=7, day=24, tzinfo=datetime.timezone.utc)
+
+
+async def test_set_next_run_keeps_previous_run(postgres: AsyncSession, task: Task, task_type: TaskType):
+    """Test that storing the next run time doesn't overwrite the previous one"""
+    previous_run = datetime.datetime(year=2022, month=7, day=24, tzinfo=datetime.timezone.utc)
+    next_run = previous_run + datetime.timedelta(days=1)
+
+    await crud.set_task_execution_times(postgres, task_type, previous_run=previous_run)
+    await crud.set_task_execution_times(postgres, task_type, next_run=next_run)
+    await postgres.refresh(task)
+
+    assert task.previous_run == previous_run
+    assert task.next_run == next_run
+    assert await crud.get_all_tasks(postgres) == [task]
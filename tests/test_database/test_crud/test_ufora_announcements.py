@@ -27,22 +27,43 @@ async def test_get_courses_with_announcements(postgres: AsyncSession):
 async def test_create_new_announcement(postgres: AsyncSession, ufora_course: UforaCourse):
     """Test creating a new announcement"""
     await crud.create_new_announcement(postgres, 1, course=ufora_course, publication_date=datetime.datetime.now())
-    await postgres.refresh(ufora_course)
+    await postgres.refresh(ufora_course, ["announcements"])
     assert len(ufora_course.announcements) == 1
 
 
-async def test_remove_old_announcements(postgres: AsyncSession, ufora_announcement: UforaAnnouncement):
+async def test_add_announcements(
+    postgres: AsyncSession, ufora_course: UforaCourse, ufora_announcement: UforaAnnouncement
+):
+    """Test adding a batch of announcements, skipping the ones that already exist"""
+    now = datetime.datetime.now()
+    await crud.add_announcements(
+        postgres,
+        [
+            (ufora_announcement.announcement_id, ufora_course.course_id, now),
+            (ufora_announcement.announcement_id + 1, ufora_course.course_id, now),
+            (ufora_announcement.announcement_id + 2, ufora_course.course_id, now),
+        ],
+    )
+    await postgres.refresh(ufora_course, ["announcements"])
+    assert len(ufora_course.announcements) == 3
+
+    # Nothing to add
+    await crud.add_announcements(postgres, [])
+
+
+async def test_remove_old_announcements(
+    postgres: AsyncSession, ufora_course: UforaCourse, ufora_announcement: UforaAnnouncement
+):
     """Test removing all stale announcements"""
-    course = ufora_announcement.course
     ufora_announcement.publication_date -= datetime.timedelta(weeks=2)
     announcement_2 = UforaAnnouncement(course_id=ufora_announcement.course_id, publication_date=datetime.datetime.now())
     postgres.add_all([ufora_announcement, announcement_2])
     await postgres.commit()
-    await postgres.refresh(course)
-    assert len(course.announcements) == 2
+    await postgres.refresh(ufora_course, ["announcements"])
+    assert len(ufora_course.announcements) == 2
 
     await crud.remove_old_announcements(postgres)
 
-    await postgres.refresh(course)
-    assert len(course.announcements) == 1
-    assert announcement_2.course.announcements[0] == announcement_2
+    await postgres.refresh(ufora_course, ["announcements"])
+    assert len(ufora_course.announcements) == 1
+    assert ufora_course.announcements[0] == announcement_2
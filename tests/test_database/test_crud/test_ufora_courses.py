@@ -20,3 +20,9 @@ async def test_get_course_by_name_alias(postgres: AsyncSession, ufora_course_wit
     """Test getting a course by its name when the name doesn't match, but the alias does"""
     match = await crud.get_course_by_name(postgres, "ali")
     assert match == ufora_course_with_alias
+
+
+async def test_get_courses_by_codes(postgres: AsyncSession, ufora_course: UforaCourse):
+    """Test getting multiple courses by their codes, skipping the ones that don't exist"""
+    assert await crud.get_courses_by_codes(postgres, ["code", "unknown"]) == [ufora_course]
+    assert await crud.get_courses_by_codes(postgres, []) == []
@@ -2,7 +2,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.crud import users as crud
-from database.schemas import User
+from database.schemas import Bank, NightlyData, User
 
 
 async def test_get_or_add_non_existing(postgres: AsyncSession):
@@ -12,14 +12,71 @@ async def test_get_or_add_non_existing(postgres: AsyncSession):
     res = (await postgres.execute(statement)).scalars().all()
 
     assert len(res) == 1
-    assert res[0].bank is not None
-    assert res[0].nightly_data is not None
+    assert (await postgres.execute(select(Bank).where(Bank.user_id == 1))).scalar_one_or_none() is not None
+    assert (
+        await postgres.execute(select(NightlyData).where(NightlyData.user_id == 1))
+    ).scalar_one_or_none() is not None
 
 
 async def test_get_or_add_existing(postgres: AsyncSession):
     """Test get_or_add for a user that does exist"""
     user = await crud.get_or_add_user(postgres, 1)
-    bank = user.bank
 
     assert await crud.get_or_add_user(postgres, 1) == user
-    assert (await crud.get_or_add_user(postgres, 1)).bank == bank
+
+    banks = (await postgres.execute(select(Bank).where(Bank.user_id == 1))).scalars().all()
+    assert len(banks) == 1
+
+
+async def test_ensure_user_exists(postgres: AsyncSession):
+    """Test that ensuring a user exists only goes to the database once"""
+    await crud.ensure_user_exists(postgres, 1)
+    assert crud.known_users.misses == 1
+    await postgres.commit()
+
+    await crud.ensure_user_exists(postgres, 1)
+    assert crud.known_users.hits == 1
+
+    res = (await postgres.execute(select(User))).scalars().all()
+    assert len(res) == 1
+
+
+async def test_ensure_user_exists_rollback(postgres: AsyncSession):
+    """Test that users are only remembered once the transaction that created them was committed"""
+    await crud.ensure_user_exists(postgres, 1)
+    assert not crud.known_users.is_known(1)
+
+    await postgres.rollback()
+    assert not crud.known_users.is_known(1)
+    assert not postgres.info.get("provisioned_users")
+
+
+async def test_provision_users(postgres: AsyncSession):
+    """Test creating multiple users at once, some of which already exist"""
+    await crud.get_or_add_user(postgres, 1)
+
+    created = await crud.provision_users(postgres, [1, 2, 3, 2])
+    assert sorted(created) == [2, 3]
+
+    banks = (await postgres.execute(select(Bank))).scalars().all()
+    assert sorted(bank.user_id for bank in banks) == [1, 2, 3]
+
+    nightly_data = (await postgres.execute(select(NightlyData))).scalars().all()
+    assert sorted(data.user_id for data in nightly_data) == [1, 2, 3]
+
+
+def test_known_users_bounded():
+    """Test that the least recently used users are evicted first"""
+    known = crud.KnownUsers(max_size=2)
+    known.add([1, 2])
+
+    # Use 1 so that 2 becomes the least recently used one
+    assert known.is_known(1)
+    known.add([3])
+
+    assert len(known) == 2
+    assert known.is_known(1)
+    assert not known.is_known(2)
+    assert known.is_known(3)
+    assert known.hits == 3
+    assert known.misses == 1
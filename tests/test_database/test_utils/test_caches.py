@@ -1,7 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.schemas import UforaCourse
-from database.utils.caches import UforaCourseCache
+from database.schemas import CustomCommand, CustomCommandAlias, EasterEgg, UforaCourse
+from database.utils.caches import (
+    CustomCommandCache,
+    EasterEggCache,
+    UforaCourseCache,
+    compile_easter_eggs,
+)
 
 
 async def test_ufora_course_cache_refresh_empty(postgres: AsyncSession, ufora_course_with_alias: UforaCourse):
@@ -25,3 +30,112 @@ async def test_ufora_course_cache_refresh_not_empty(postgres: AsyncSession, ufor
     assert len(cache.data) == 1
     assert cache.data == ["test"]
     assert cache.aliases == {"alias": "test"}
+
+
+def test_easter_egg_cache_match_order():
+    """Test that the compiled easter eggs still respect the order of the easter eggs"""
+    cache = EasterEggCache()
+    cache.patterns = compile_easter_eggs(
+        [
+            EasterEgg(match=r"hello there", response="exact", exact=True, startswith=False),
+            EasterEgg(match=r"is (this|dis) (.*)", response="startswith", exact=False, startswith=True),
+            EasterEgg(match=r"(^69$)|(^69 )|( 69 )|( 69$)", response="anywhere", exact=False, startswith=False),
+            EasterEgg(match=r"is", response="unreachable", exact=False, startswith=False),
+        ]
+    )
+
+    assert cache.match("hello there") == "exact"
+    assert cache.match("hello there!") is None
+    assert cache.match("is this 69") == "startswith"
+    assert cache.match("this is 69") == "anywhere"
+    assert cache.match("why is it") == "unreachable"
+    assert cache.match("nothing to see") is None
+
+
+def test_easter_egg_cache_invalid_pattern():
+    """Test that an invalid pattern doesn't break the other easter eggs"""
+    cache = EasterEggCache()
+    cache.patterns = compile_easter_eggs(
+        [
+            EasterEgg(match=r"(unclosed", response="broken", exact=True, startswith=False),
+            EasterEgg(match=r"dormammu", response="bargain", exact=True, startswith=False),
+        ]
+    )
+
+    assert len(cache.patterns) == 1
+    assert cache.match("dormammu") == "bargain"
+
+
+def test_easter_egg_cache_group_references():
+    """Test that eggs with backreferences or named groups don't break the others, and keep their order"""
+    cache = EasterEggCache()
+    cache.patterns = compile_easter_eggs(
+        [
+            EasterEgg(match=r"first", response="first", exact=True, startswith=False),
+            EasterEgg(match=r"(a)\1", response="backreference", exact=True, startswith=False),
+            EasterEgg(match=r"(?P<x>b)", response="named", exact=False, startswith=True),
+            EasterEgg(match=r"(?P<x>c)", response="same name", exact=False, startswith=True),
+            EasterEgg(match=r"aa|b|c|d", response="last", exact=False, startswith=False),
+        ]
+    )
+
+    assert len(cache.patterns) == 5
+    assert cache.match("first") == "first"
+    assert cache.match("aa") == "backreference"
+    assert cache.match("b") == "named"
+    assert cache.match("c") == "same name"
+    assert cache.match("xd") == "last"
+
+
+def test_easter_egg_cache_inline_flags():
+    """Test that patterns can still start with inline flags"""
+    cache = EasterEggCache()
+    cache.patterns = compile_easter_eggs(
+        [
+            EasterEgg(match=r"(?i)hi", response="anywhere", exact=False, startswith=False),
+            EasterEgg(match=r"(?i)hello", response="exact", exact=True, startswith=False),
+        ]
+    )
+
+    assert len(cache.patterns) == 1
+    assert cache.match("oh HI") == "anywhere"
+    assert cache.match("Hello") == "exact"
+
+
+def test_easter_egg_cache_empty():
+    """Test matching against an empty cache"""
+    cache = EasterEggCache()
+    assert cache.match("hello there") is None
+
+
+def test_custom_command_cache_lookup():
+    """Test looking up commands by their (cleaned) name and aliases"""
+    cache = CustomCommandCache()
+    cache.clear()
+
+    command = CustomCommand(command_id=1, name="Some Name", indexed_name="somename", response="response")
+    cache.add_command(command)
+    cache.add_alias(CustomCommandAlias(alias_id=1, alias="A1", indexed_alias="a1", command_id=1))
+
+    assert cache.get_response("SOME name") == "response"
+    assert cache.get_response("a1") == "response"
+    assert cache.get_response("huh") is None
+
+
+def test_custom_command_cache_edit():
+    """Test that editing a command replaces the old name, but keeps the aliases"""
+    cache = CustomCommandCache()
+    cache.clear()
+
+    command = CustomCommand(command_id=1, name="name", indexed_name="name", response="response")
+    cache.add_command(command)
+    cache.add_alias(CustomCommandAlias(alias_id=1, alias="a1", indexed_alias="a1", command_id=1))
+
+    command.name = "new name"
+    command.indexed_name = "newname"
+    command.response = "new response"
+    cache.edit_command(command)
+
+    assert cache.get_response("name") is None
+    assert cache.get_response("new name") == "new response"
+    assert cache.get_response("a1") == "new response"
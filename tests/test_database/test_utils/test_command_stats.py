@@ -0,0 +1,126 @@
+import asyncio
+import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from database.crud.command_stats import CommandInvocation
+from database.utils.command_stats import CommandStatsBuffer
+
+
+def _invocation() -> CommandInvocation:
+    return CommandInvocation(
+        command="ping",
+        timestamp=datetime.datetime.now(tz=datetime.timezone.utc),
+        user_id=1,
+        slash=False,
+        context_menu=False,
+    )
+
+
+async def test_command_stats_buffer_flush():
+    """Test that flushing writes everything at once & empties the buffer"""
+    buffer = CommandStatsBuffer(MagicMock())
+    buffer.add(_invocation())
+    buffer.add(_invocation())
+    buffer.add(None)
+
+    assert len(buffer) == 2
+
+    with patch("database.utils.command_stats.register_command_invocations", new=AsyncMock()) as register:
+        await buffer.flush()
+        assert register.await_count == 1
+        assert len(register.await_args.args[1]) == 2
+
+    assert len(buffer) == 0
+
+
+async def test_command_stats_buffer_flush_failure():
+    """Test that invocations are kept when flushing fails"""
+    buffer = CommandStatsBuffer(MagicMock())
+    buffer.add(_invocation())
+
+    with patch("database.utils.command_stats.register_command_invocations", new=AsyncMock(side_effect=Exception)):
+        await buffer.flush()
+
+    assert len(buffer) == 1
+
+
+async def test_command_stats_buffer_close():
+    """Test that closing the buffer writes the remaining invocations"""
+    buffer = CommandStatsBuffer(MagicMock(), flush_interval=3600)
+    buffer.start()
+    buffer.add(_invocation())
+
+    with patch("database.utils.command_stats.register_command_invocations", new=AsyncMock()) as register:
+        await buffer.close()
+        assert register.await_count == 1
+
+    assert len(buffer) == 0
+
+
+async def test_command_stats_buffer_close_during_flush():
+    """Test that invocations aren't lost when closing the buffer cancels a periodic flush halfway through"""
+    buffer = CommandStatsBuffer(MagicMock(), flush_interval=0)
+    buffer.add(_invocation())
+    started = asyncio.Event()
+
+    async def _slow_register(*_):
+        started.set()
+        await asyncio.sleep(3600)
+
+    with patch("database.utils.command_stats.register_command_invocations", new=AsyncMock(side_effect=_slow_register)):
+        buffer.start()
+        await started.wait()
+
+    with patch("database.utils.command_stats.register_command_invocations", new=AsyncMock()) as register:
+        await buffer.close()
+        assert register.await_count == 1
+        assert len(register.await_args.args[1]) == 1
+
+    assert len(buffer) == 0
+
+
+async def test_command_stats_buffer_full():
+    """Test that a full buffer is flushed in the background, and that closing waits for it"""
+    buffer = CommandStatsBuffer(MagicMock(), max_size=2)
+
+    with patch("database.utils.command_stats.register_command_invocations", new=AsyncMock()) as register:
+        buffer.add(_invocation())
+        buffer.add(_invocation())
+        await buffer.close()
+
+        assert register.await_count == 1
+
+    assert len(buffer) == 0
+
+
+async def test_command_stats_buffer_capped():
+    """Test that the oldest invocations are dropped when the buffer can't be flushed for too long"""
+    buffer = CommandStatsBuffer(MagicMock(), max_size=100, max_pending=3)
+    invocations = [_invocation() for _ in range(5)]
+
+    for invocation in invocations:
+        buffer.add(invocation)
+
+    assert len(buffer) == 3
+
+    with patch("database.utils.command_stats.register_command_invocations", new=AsyncMock()) as register:
+        await buffer.flush()
+        assert register.await_args.args[1] == invocations[2:]
+
+
+async def test_command_stats_buffer_backoff():
+    """Test that a full buffer isn't flushed again for every new invocation after a flush failed"""
+    buffer = CommandStatsBuffer(MagicMock(), max_size=1)
+
+    with patch(
+        "database.utils.command_stats.register_command_invocations", new=AsyncMock(side_effect=Exception)
+    ) as register:
+        buffer.add(_invocation())
+        await asyncio.gather(*buffer._flush_tasks)
+        assert register.await_count == 1
+
+        buffer.add(_invocation())
+        buffer.add(_invocation())
+        assert not buffer._flush_tasks
+
+    assert len(buffer) == 3
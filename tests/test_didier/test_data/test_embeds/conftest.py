@@ -0,0 +1,15 @@
+import pytest
+
+from didier.data.embeds import schedules
+
+
+@pytest.fixture(autouse=True)
+def clear_course_table(monkeypatch: pytest.MonkeyPatch):
+    """Fixture to forget about all registered courses
+
+    The course table is shared by all schedules, so courses registered in one test would leak into the next
+    """
+    schedules.course_table.clear()
+    monkeypatch.setattr(schedules, "_course_roles_version", 0)
+    yield
+    schedules.course_table.clear()
@@ -0,0 +1,349 @@
+import pathlib
+import pickle
+from datetime import date, datetime, timedelta
+from typing import Optional
+from unittest.mock import MagicMock
+
+from database.schemas import UforaCourse
+from didier.data.embeds.schedules import (
+    Schedule,
+    ScheduleEmbedCache,
+    ScheduleSlot,
+    ScheduleSnapshot,
+    content_hash,
+    diff_schedules,
+    iter_events,
+    load_snapshot,
+    merge_slots,
+    parse_events,
+    register_courses,
+    save_snapshot,
+)
+from didier.utils.types.datetime import LOCAL_TIMEZONE
+
+
+def _course(
+    course_id: int,
+    role_id: Optional[int] = None,
+    overarching_role_id: Optional[int] = None,
+    alternative_overarching_role_id: Optional[int] = None,
+) -> UforaCourse:
+    return UforaCourse(
+        course_id=course_id,
+        name=f"Course {course_id}",
+        code=f"C00{course_id}",
+        year=1,
+        role_id=role_id,
+        overarching_role_id=overarching_role_id,
+        alternative_overarching_role_id=alternative_overarching_role_id,
+    )
+
+
+def _slot(course: UforaCourse, day: date, hour: int) -> ScheduleSlot:
+    register_courses([course])
+
+    start = datetime(year=day.year, month=day.month, day=day.day, hour=hour, tzinfo=LOCAL_TIMEZONE)
+    end = start + timedelta(hours=2)
+    return ScheduleSlot(course.course_id, int(start.timestamp()), int(end.timestamp()), "Campus")
+
+
+def test_on_day():
+    """Test that only the slots on the given day are returned"""
+    course = _course(1, role_id=10)
+    monday, tuesday = date(2022, 9, 19), date(2022, 9, 20)
+    schedule = Schedule({_slot(course, monday, 8), _slot(course, monday, 13), _slot(course, tuesday, 8)})
+
+    assert len(schedule.on_day(monday).slots) == 2
+    assert len(schedule.on_day(tuesday).slots) == 1
+    assert not schedule.on_day(date(2022, 9, 21))
+
+
+def test_personalize():
+    """Test that personalizing only keeps courses that match any of the roles"""
+    day = date(2022, 9, 19)
+    own = _slot(_course(1, role_id=10), day, 8)
+    overarching = _slot(_course(2, overarching_role_id=20), day, 10)
+    alternative = _slot(_course(3, overarching_role_id=30, alternative_overarching_role_id=20), day, 13)
+    other = _slot(_course(4, role_id=40), day, 15)
+    schedule = Schedule({own, overarching, alternative, other})
+
+    assert schedule.personalize({10, 20}).slots == {own, overarching, alternative}
+    assert schedule.personalize({10, 20, 50, 60, 70, 80}).slots == {own, overarching, alternative}
+    assert not schedule.personalize(set())
+
+
+def test_merge_slots():
+    """Test that consecutive slots of the same course in the same location are merged"""
+    course, other_course = _course(1), _course(2)
+    day = date(2022, 9, 19)
+
+    first, second, third = _slot(course, day, 8), _slot(course, day, 10), _slot(course, day, 12)
+    other = _slot(other_course, day, 10)
+    later = _slot(course, day, 16)
+
+    # Order shouldn't matter
+    merged = merge_slots([third, other, later, first, second])
+
+    assert merged == [first, later, other]
+    assert first.start_time.hour == 8
+    assert first.end_time.hour == 14
+
+
+CALENDAR = "\r\n".join(
+    [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:test",
+        "BEGIN:VEVENT",
+        "UID:1@test",
+        "DTSTART:20220919T063000Z",
+        "DTEND:20220919T080000Z",
+        "SUMMARY:C003001A. Course",
+        "LOCATION:Auditorium A. Gebouw B. Campus C. ",
+        "END:VEVENT",
+        "END:VCALENDAR",
+    ]
+)
+
+
+def test_parse_events():
+    """Test that events are parsed into something that can be sent to another process"""
+    events = parse_events(CALENDAR)
+    assert len(events) == 1
+
+    event = events[0]
+    assert event.code == "C003001"
+    assert event.start_time == datetime(2022, 9, 19, 8, 30, tzinfo=LOCAL_TIMEZONE)
+    assert pickle.loads(pickle.dumps(events)) == events
+
+
+def test_iter_events_properties():
+    """Test that folded lines, escaped text, timezones and nested components are handled"""
+    lines = [
+        "BEGIN:VCALENDAR",
+        "BEGIN:VEVENT",
+        "SUMMARY:C003001A. Course\\, with a",
+        "  long name",
+        "DTSTART;TZID=Europe/Brussels:20220919T083000",
+        "DTEND;VALUE=DATE-TIME:20220919T080000Z",
+        "LOCATION:Auditorium A\\; B",
+        "BEGIN:VALARM",
+        "SUMMARY:Reminder",
+        "END:VALARM",
+        "END:VEVENT",
+        "BEGIN:VEVENT",
+        "SUMMARY:Event without a start time",
+        "END:VEVENT",
+        "END:VCALENDAR",
+    ]
+
+    events = list(iter_events(lines))
+    assert len(events) == 1
+
+    event = events[0]
+    assert event.code == "C003001"
+    assert event.start_time == datetime(2022, 9, 19, 8, 30, tzinfo=LOCAL_TIMEZONE)
+    assert event.end_time == datetime(2022, 9, 19, 10, 0, tzinfo=LOCAL_TIMEZONE)
+    assert event.location == "Auditorium A; B"
+
+
+def test_parse_events_line_endings():
+    """Test that only CRLF & LF end lines, and that names are case-insensitive"""
+    content = "\r\n".join(
+        [
+            "BEGIN:VCALENDAR",
+            "begin:vevent",
+            "Summary:C003001A. Course\u2028with\x0cstrange\x85characters",
+            "dtstart;tzid=Europe/Brussels:20220919T083000",
+            "DTEND;TZID=Europe/Brussels:20220919T100000",
+            "location:Room\u2028A",
+            "END:VEVENT",
+            "END:VCALENDAR",
+        ]
+    )
+
+    events = parse_events(content)
+    assert len(events) == 1
+    assert events[0].code == "C003001"
+    assert events[0].start_time == datetime(2022, 9, 19, 8, 30, tzinfo=LOCAL_TIMEZONE)
+    assert events[0].location == "Room\u2028A"
+
+
+def _snapshot() -> ScheduleSnapshot:
+    course = _course(1, role_id=10)
+    slot = _slot(course, date(2022, 9, 19), 8)
+    slot.location = "Campus Sterre S9 A3"
+    return ScheduleSnapshot(courses={course.code: course.course_id, "C009999": None}, slots=[slot])
+
+
+def test_snapshot(tmp_path: pathlib.Path):
+    """Test that parsed slots can be stored & loaded again"""
+    path = tmp_path / "schedule.snapshot.json"
+    snapshot = _snapshot()
+    save_snapshot(path, content_hash(CALENDAR), snapshot)
+
+    loaded = load_snapshot(path, content_hash(CALENDAR))
+    assert loaded is not None
+    assert loaded.courses == snapshot.courses
+    assert [(slot.course_id, slot.start, slot.end, slot.location) for slot in loaded.slots] == [
+        (slot.course_id, slot.start, slot.end, slot.location) for slot in snapshot.slots
+    ]
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_snapshot_unwritable(tmp_path: pathlib.Path):
+    """Test that failing to store a snapshot doesn't raise an error"""
+    path = tmp_path / "missing" / "schedule.snapshot.json"
+    save_snapshot(path, content_hash(CALENDAR), _snapshot())
+
+    assert load_snapshot(path, content_hash(CALENDAR)) is None
+
+
+def test_snapshot_outdated(tmp_path: pathlib.Path):
+    """Test that snapshots of other versions of the file are ignored"""
+    path = tmp_path / "schedule.snapshot.json"
+    save_snapshot(path, content_hash(CALENDAR), _snapshot())
+
+    assert load_snapshot(path, content_hash("")) is None
+    assert load_snapshot(tmp_path / "missing.json", content_hash(CALENDAR)) is None
+
+
+def test_snapshot_matches():
+    """Test that snapshots can only be re-used if the course codes still resolve to the same courses"""
+    snapshot = _snapshot()
+
+    assert snapshot.matches([_course(1)])
+    assert not snapshot.matches([])
+    assert not snapshot.matches([_course(1), _course(9999)])
+
+
+def test_diff_schedules():
+    """Test finding the slots that were added, removed or moved"""
+    course = _course(1, role_id=10)
+    monday, tuesday, wednesday = date(2022, 9, 19), date(2022, 9, 20), date(2022, 9, 21)
+
+    unchanged = _slot(course, monday, 8)
+    removed = _slot(course, tuesday, 8)
+    moved = _slot(course, wednesday, 8)
+    old = Schedule({unchanged, removed, moved})
+
+    moved_to = _slot(course, wednesday, 8)
+    moved_to.location = "Elsewhere"
+    added = _slot(course, wednesday, 13)
+    new = Schedule({_slot(course, monday, 8), moved_to, added})
+
+    diff = diff_schedules(old, new)
+    assert diff.added == [added]
+    assert diff.removed == [removed]
+    assert diff.moved == [(moved, moved_to)]
+    assert diff.affected_days == {tuesday, wednesday}
+    assert not diff_schedules(old, old)
+
+    # Build the index before applying the diff, so that it's re-used
+    assert old.on_day(monday)
+    updated = old.apply_diff(diff)
+
+    assert updated.slots == new.slots
+    assert updated.on_day(monday).slots == {unchanged}
+    assert not updated.on_day(tuesday)
+    assert {slot.location for slot in updated.on_day(wednesday).personalize({10}).slots} == {"Campus", "Elsewhere"}
+
+
+def test_diff_schedules_rescheduled():
+    """Test that slots that were rescheduled to another time on the same day are considered to be moved"""
+    course, other_course = _course(1, role_id=10), _course(2, role_id=20)
+    monday, tuesday = date(2022, 9, 19), date(2022, 9, 20)
+
+    rescheduled = _slot(course, monday, 8)
+    rescheduled_next_day = _slot(course, tuesday, 8)
+    removed = _slot(other_course, monday, 13)
+    old = Schedule({rescheduled, rescheduled_next_day, removed})
+
+    rescheduled_to = _slot(course, monday, 10)
+    rescheduled_next_day_to = _slot(course, tuesday, 13)
+    added = _slot(course, monday, 13)
+    new = Schedule({rescheduled_to, rescheduled_next_day_to, added})
+
+    diff = diff_schedules(old, new)
+    assert diff.added == [added]
+    assert diff.removed == [removed]
+    assert diff.moved == [(rescheduled, rescheduled_to), (rescheduled_next_day, rescheduled_next_day_to)]
+    assert diff.affected_days == {monday, tuesday}
+    assert old.apply_diff(diff).slots == new.slots
+
+
+def test_apply_diff_course_roles_changed():
+    """Test that the index isn't re-used if the roles of a course changed in the meantime"""
+    monday, tuesday = date(2022, 9, 19), date(2022, 9, 20)
+    unchanged = _slot(_course(7, role_id=70), monday, 8)
+    old = Schedule({unchanged})
+
+    # Build the index before the roles change
+    assert old.personalize({70})
+
+    added = _slot(_course(7, role_id=71), tuesday, 8)
+    updated = old.apply_diff(diff_schedules(old, Schedule({unchanged, added})))
+
+    assert not updated.personalize({70})
+    assert updated.personalize({71}).slots == {unchanged, added}
+
+
+def test_index_course_roles_changed():
+    """Test that the roles are indexed again if the roles of a course changed after building the index"""
+    monday = date(2022, 9, 19)
+    slot = _slot(_course(8, role_id=80), monday, 8)
+    schedule = Schedule({slot})
+
+    assert schedule.personalize({80})
+
+    register_courses([_course(8, role_id=81)])
+
+    assert not schedule.personalize({80})
+    assert schedule.personalize({81}).slots == {slot}
+    assert schedule.role_ids == {81}
+
+
+def test_slot_times():
+    """Test that slots are converted to local times for displaying"""
+    course = _course(1, role_id=10, overarching_role_id=20)
+    slot = _slot(course, date(2022, 9, 19), 8)
+
+    assert slot.start_time == datetime(2022, 9, 19, 8, tzinfo=LOCAL_TIMEZONE)
+    assert slot.end_time == datetime(2022, 9, 19, 10, tzinfo=LOCAL_TIMEZONE)
+    assert slot.day == date(2022, 9, 19)
+    assert slot.course.name == "Course 1"
+    assert slot.role_ids == {10, 20}
+
+
+def test_embed_cache():
+    """Test that embeds are shared by everyone with the same relevant roles, until the cache is invalidated"""
+    day = date(2022, 9, 19)
+    client = MagicMock()
+    client.schedules = {"schedule": Schedule({_slot(_course(1, role_id=10), day, 8)})}
+
+    cache = ScheduleEmbedCache()
+    embed = cache.get_embed(client, day, {10, 20})
+
+    # Role 30 doesn't have a class on this day, so it doesn't change anything
+    assert cache.get_embed(client, day, {10, 30}).to_dict() == embed.to_dict()
+    assert cache.get_embed(client, day, set()).to_dict() != embed.to_dict()
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+    cache.invalidate()
+    assert cache.get_embed(client, day, {10}).to_dict() == embed.to_dict()
+    assert cache.misses == 3
+    assert len(cache) == 1
+
+
+def test_embed_cache_copies():
+    """Test that modifying an embed that came out of the cache doesn't affect the cached version"""
+    day = date(2022, 9, 19)
+    client = MagicMock()
+    client.schedules = {"schedule": Schedule({_slot(_course(1, role_id=10), day, 8)})}
+
+    cache = ScheduleEmbedCache()
+    embed = cache.get_embed(client, day, {10})
+    embed.set_footer(text="Changed")
+
+    assert cache.get_embed(client, day, {10}).footer.text is None
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from didier.data.embeds.free_games import FreeGameEmbed
+from didier.data.rss_feeds import free_games
+from didier.utils.http.limits import HostLimiter
+
+
+class _SlowSession:
+    """Fake HTTP session where every request takes forever"""
+
+    def head(self, *_, **__):
+        return self
+
+    def get(self, *_, **__):
+        return self
+
+    async def __aenter__(self):
+        await asyncio.sleep(60)
+
+    async def __aexit__(self, *_):
+        pass
+
+
+class _BrokenSession(_SlowSession):
+    """Fake HTTP session that returns something that can't be parsed"""
+
+    async def __aenter__(self):
+        raise ValueError("Unexpected page layout")
+
+
+async def test_update_game_timeout(monkeypatch: pytest.MonkeyPatch):
+    """Test that games are still sent without store info if scraping the store page takes too long"""
+    monkeypatch.setattr(free_games, "STORE_PAGE_TIMEOUT", 0.01)
+    game = FreeGameEmbed(id=1, link="https://pepeizqdeals.com/1/", title="Game is free to claim at Steam")
+
+    await free_games._update_game(_SlowSession(), game, HostLimiter())  # type: ignore[arg-type]
+
+    assert game.name == "Game"
+    assert game.store == "Steam"
+    assert game.store_page is None
+    assert game.to_embed().title == "Game"
+
+
+async def test_update_game_broken_page():
+    """Test that games are still sent without store info if the store page can't be parsed"""
+    game = FreeGameEmbed(id=1, link="https://pepeizqdeals.com/1/", title="Game is free to claim at Steam")
+
+    await free_games._update_game(_BrokenSession(), game, HostLimiter())  # type: ignore[arg-type]
+
+    assert game.name == "Game"
+    assert game.store_page is None
@@ -0,0 +1,38 @@
+from didier.data.rss_feeds.parser import iter_entries
+
+
+def test_iter_entries_fixture(free_games_response: str):
+    """Test extracting the entries out of a real feed"""
+    entries = list(iter_entries(free_games_response))
+    assert len(entries) == 3
+
+    entry = entries[0]
+    assert entry.title == "Minion Masters &#8211; Torment • Free • Steam"
+    assert entry.link == "https://pepeizqdeals.com/55623/minion-masters-torment-free-steam/"
+    assert entry.id == entry.link
+    assert entry.published == "Thu, 13 Oct 2022 18:08:41 +0100"
+    assert entry.summary == ""
+
+
+def test_iter_entries_small_chunks():
+    """Test that entities are handled, even when the feed is fed to the parser in tiny pieces"""
+    feed = (
+        "<rss><channel><title>Not an entry</title>"
+        "<item><title>Caf&eacute; &amp; bar</title><link>https://example.com</link>"
+        "<description>&lt;p&gt;Text&lt;/p&gt;</description></item>"
+        "<item><title>Second</title><guid>2</guid></item>"
+        "</channel></rss>"
+    )
+
+    for chunk_size in (1, 3, 7, len(feed)):
+        entries = list(iter_entries(feed, chunk_size=chunk_size))
+        assert [entry.title for entry in entries] == ["Café & bar", "Second"]
+        assert entries[0].id == "https://example.com"
+        assert entries[0].summary == "<p>Text</p>"
+        assert entries[1].id == "2"
+
+
+def test_iter_entries_stop_early():
+    """Test that the entries before an error are still extracted"""
+    feed = "<rss><channel><item><title>First</title></item><item><title>Broken</item></channel></rss>"
+    assert [entry.title for entry in iter_entries(feed)] == ["First"]
@@ -0,0 +1,77 @@
+from typing import Optional
+
+from didier.data.rss_feeds.poller import FeedPoller
+
+FEED = "<rss version='2.0'><channel><title>Feed</title><item><title>Item</title></item></channel></rss>"
+
+
+class _Response:
+    def __init__(self, status: int, text: str = "", etag: Optional[str] = None):
+        self.status = status
+        self.headers = {"ETag": etag} if etag is not None else {}
+        self._text = text
+
+    async def text(self) -> str:
+        return self._text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+
+class _Session:
+    """Fake HTTP session that answers with the given responses, in order"""
+
+    def __init__(self, *responses: _Response):
+        self.responses = list(responses)
+        self.headers: list[dict] = []
+
+    def get(self, url: str, headers: dict) -> _Response:
+        self.headers.append(headers)
+        return self.responses.pop(0)
+
+
+async def test_poll_not_modified():
+    """Test that feeds aren't parsed again when the server says they didn't change"""
+    poller = FeedPoller()
+    session = _Session(_Response(200, FEED, etag='"abc"'), _Response(304))
+
+    first = await poller.poll(session, "feed", "url")  # type: ignore[arg-type]
+    assert first.changed
+    assert first.entries is not None and next(first.entries).title == "Item"
+    poller.commit("feed")
+
+    second = await poller.poll(session, "feed", "url")  # type: ignore[arg-type]
+    assert second.ok and not second.changed
+    assert session.headers[1] == {"If-None-Match": '"abc"'}
+
+    stats = poller.stats["feed"]
+    assert (stats.fetched, stats.not_modified, stats.parsed) == (1, 1, 1)
+
+
+async def test_poll_unchanged_content():
+    """Test that feeds aren't parsed again when the server sends the same content"""
+    poller = FeedPoller()
+    session = _Session(_Response(200, FEED), _Response(200, FEED), _Response(500))
+
+    assert (await poller.poll(session, "feed", "url")).changed  # type: ignore[arg-type]
+    poller.commit("feed")
+    assert not (await poller.poll(session, "feed", "url")).changed  # type: ignore[arg-type]
+    assert not (await poller.poll(session, "feed", "url")).ok  # type: ignore[arg-type]
+
+    stats = poller.stats["feed"]
+    assert (stats.fetched, stats.unchanged, stats.parsed, stats.failed) == (2, 1, 1, 1)
+
+
+async def test_poll_uncommitted():
+    """Test that feeds that weren't processed successfully are downloaded & parsed again"""
+    poller = FeedPoller()
+    session = _Session(_Response(200, FEED, etag='"abc"'), _Response(200, FEED, etag='"abc"'))
+
+    assert (await poller.poll(session, "feed", "url")).changed  # type: ignore[arg-type]
+
+    # Processing failed, so the feed wasn't committed
+    assert (await poller.poll(session, "feed", "url")).changed  # type: ignore[arg-type]
+    assert session.headers[1] == {}
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from database.schemas import UforaAnnouncement, UforaCourse
+from didier.data.embeds.ufora.announcements import UforaNotification
+from didier.data.rss_feeds.parser import FeedEntry
+from didier.data.rss_feeds.ufora import UforaPollSchedule, parse_ids
+from didier.utils.types.datetime import LOCAL_TIMEZONE
+
+NOW = datetime(year=2022, month=9, day=19, hour=12, tzinfo=LOCAL_TIMEZONE)
+
+
+def _course(course_id: int, announcements: int = 0) -> UforaCourse:
+    course = UforaCourse(course_id=course_id, name=f"Course {course_id}", code=f"C00{course_id}", year=1)
+    course.announcements = [
+        UforaAnnouncement(announcement_id=i, publication_date=(NOW - timedelta(days=i % 7)).date())
+        for i in range(announcements)
+    ]
+    return course
+
+
+def _schedule() -> UforaPollSchedule:
+    return UforaPollSchedule(min_interval=timedelta(minutes=10), max_interval=timedelta(hours=2))
+
+
+def test_parse_ids():
+    """Test parsing the notification & course id out of a url"""
+    assert parse_ids("https://ufora.ugent.be/d2l/le/news/123/456-789") == (456, 789)
+    assert parse_ids("https://ufora.ugent.be/d2l/le/news") is None
+
+
+def test_quiet_course():
+    """Test that courses that don't post anything are checked as little as possible"""
+    schedule, course = _schedule(), _course(1)
+    assert schedule.is_due(course, NOW)
+
+    schedule.update(course, NOW, changed=False)
+    assert not schedule.is_due(course, NOW + timedelta(hours=1))
+    assert schedule.is_due(course, NOW + timedelta(hours=2))
+
+
+def test_busy_course():
+    """Test that courses that post a lot are checked more often"""
+    schedule = _schedule()
+    quiet, busy, very_busy = _course(1, announcements=1), _course(2, announcements=3), _course(3, announcements=50)
+
+    assert schedule.get_interval(quiet, NOW) == timedelta(hours=1)
+    assert schedule.get_interval(busy, NOW) == timedelta(minutes=30)
+    assert schedule.get_interval(very_busy, NOW) == timedelta(minutes=10)
+
+
+def test_recently_changed_course():
+    """Test that courses that just posted something are checked again soon, and back off afterwards"""
+    schedule, course = _schedule(), _course(1, announcements=1)
+
+    schedule.update(course, NOW, changed=True)
+    assert schedule.is_due(course, NOW + timedelta(minutes=10))
+
+    # The longer it stays quiet, the longer the next check is postponed
+    schedule.update(course, NOW + timedelta(minutes=10), changed=False)
+    assert schedule.is_due(course, NOW + timedelta(minutes=20))
+
+    schedule.update(course, NOW + timedelta(minutes=20), changed=False)
+    assert not schedule.is_due(course, NOW + timedelta(minutes=30))
+    assert schedule.is_due(course, NOW + timedelta(minutes=40))
+
+
+def test_notification_id():
+    """Test that the id of a notification is parsed out of its url if it's not known"""
+    entry = FeedEntry(
+        id="https://ufora.ugent.be/d2l/le/news/rss/456-789",
+        title="Title",
+        link="https://ufora.ugent.be",
+        published="Mon, 19 Sep 2022 08:00:00 GMT",
+        summary="",
+    )
+
+    assert UforaNotification(entry, _course(789)).get_id() == 456
+    assert UforaNotification(entry._replace(id="no id"), _course(789)).get_id() is None
+    assert UforaNotification(entry, _course(789), notification_id=1, course_id=789).get_id() == 1
@@ -0,0 +1,71 @@
+from unittest.mock import MagicMock
+
+from didier import Didier
+from didier.utils.discord.pipeline import MessagePipeline, MessageView
+
+
+def test_message_view(mock_client: Didier):
+    """Test normalizing a message"""
+    mock_message = MagicMock()
+    mock_message.content = "  _Hello There_ \n"
+
+    view = MessageView.from_message(mock_client, mock_message)
+    assert view.stripped == "_Hello There_"
+    assert view.lowered == "_hello there_"
+    assert view.cleaned == "hello there"
+    assert view.prefix is None
+
+
+def test_message_view_prefix(mock_client: Didier):
+    """Test that the prefix is matched when creating the view"""
+    mock_message = MagicMock()
+    mock_message.content = "Didier test"
+
+    view = MessageView.from_message(mock_client, mock_message)
+    assert view.prefix == "Didier "
+
+
+async def test_pipeline_short_circuit(mock_client: Didier):
+    """Test that stages after the one that handled a message are skipped"""
+    called = []
+
+    def _stage(name: str, handled: bool):
+        async def _inner(_: MessageView) -> bool:
+            called.append(name)
+            return handled
+
+        return _inner
+
+    pipeline = MessagePipeline()
+    pipeline.add_stage("first", _stage("first", False))
+    pipeline.add_stage("second", _stage("second", True))
+    pipeline.add_stage("third", _stage("third", False))
+
+    mock_message = MagicMock()
+    mock_message.content = "test"
+
+    assert await pipeline.run(MessageView.from_message(mock_client, mock_message)) == "second"
+    assert called == ["first", "second"]
+    assert pipeline.timings["first"].calls == 1
+    assert pipeline.timings["second"].calls == 1
+    assert pipeline.timings["third"].calls == 0
+
+
+async def test_pipeline_reset_timings(mock_client: Didier):
+    """Test resetting the recorded timings"""
+
+    async def _stage(_: MessageView) -> bool:
+        return False
+
+    pipeline = MessagePipeline()
+    pipeline.add_stage("stage", _stage)
+
+    mock_message = MagicMock()
+    mock_message.content = "test"
+
+    assert await pipeline.run(MessageView.from_message(mock_client, mock_message)) is None
+    assert pipeline.timings["stage"].calls == 1
+
+    pipeline.reset_timings()
+    assert pipeline.timings["stage"].calls == 0
+    assert pipeline.timings["stage"].average == 0
@@ -1,7 +1,7 @@
 from unittest.mock import MagicMock
 
 from didier import Didier
-from didier.utils.discord.prefix import get_prefix
+from didier.utils.discord.prefix import get_prefix, get_prefix_matcher
 
 
 def test_get_prefix_didier(mock_client: Didier):
@@ -82,3 +82,16 @@ def test_get_prefix_whitespace(mock_client: Didier):
     mock_message = MagicMock()
     mock_message.content = "didier  test"
     assert get_prefix(mock_client, mock_message) == "didier  "
+
+
+def test_get_prefix_matcher_cached(mock_client: Didier):
+    """Test that the prefix matcher is only built once per user"""
+    assert get_prefix_matcher(mock_client.user.id) is get_prefix_matcher(mock_client.user.id)
+    assert get_prefix_matcher(mock_client.user.id) is not get_prefix_matcher(None)
+
+
+def test_get_prefix_no_user():
+    """Test that mentions aren't matched when the bot's user isn't known yet"""
+    matcher = get_prefix_matcher(None)
+    assert matcher.match("didier test") == "didier "
+    assert matcher.match("<@0> test") is None
@@ -0,0 +1,52 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from didier.utils.discord.sender import BoundedSender
+
+
+def _http_error(error: type[discord.HTTPException], status: int) -> discord.HTTPException:
+    return error(MagicMock(status=status), "error")
+
+
+async def test_send_limit():
+    """Test that only a limited amount of messages are sent at the same time"""
+    in_flight = 0
+    most_in_flight = 0
+
+    async def send(**kwargs):
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    sender = BoundedSender(limit=2)
+    targets = [MagicMock(send=send) for _ in range(6)]
+    await asyncio.gather(*(sender.send(target, content="hi") for target in targets))
+
+    assert most_in_flight == 2
+    assert sender.sent == 6
+
+
+async def test_send_forbidden():
+    """Test that closed DMs are not retried"""
+    target = MagicMock(send=AsyncMock(side_effect=_http_error(discord.Forbidden, 403)))
+    sender = BoundedSender()
+
+    assert await sender.send(target, content="hi") is None
+    assert target.send.await_count == 1
+    assert sender.failed == 1
+
+
+async def test_send_rate_limited():
+    """Test that messages are retried after being rate limited"""
+    message = MagicMock()
+    target = MagicMock(send=AsyncMock(side_effect=[discord.RateLimited(0), message]))
+    sender = BoundedSender()
+
+    assert await sender.send(target, content="hi") is message
+    assert target.send.await_count == 2
+    assert sender.sent == 1
+    assert sender.failed == 0
@@ -0,0 +1,28 @@
+import pathlib
+
+from didier.utils.http.conditional import CacheValidators
+
+
+def test_validators_headers():
+    """Test creating the headers for a conditional request"""
+    assert CacheValidators().to_headers() == {}
+
+    validators = CacheValidators(etag='"abc"', last_modified="Mon, 19 Sep 2022 00:00:00 GMT")
+    assert validators.to_headers() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 19 Sep 2022 00:00:00 GMT",
+    }
+
+
+def test_validators_save_load(tmp_path: pathlib.Path):
+    """Test that validators survive being written to a file"""
+    path = tmp_path / "validators.json"
+    validators = CacheValidators(etag='"abc"')
+    validators.save(path)
+
+    assert CacheValidators.load(path) == validators
+
+
+def test_validators_load_missing(tmp_path: pathlib.Path):
+    """Test that loading validators from a file that doesn't exist creates empty ones"""
+    assert CacheValidators.load(tmp_path / "missing.json") == CacheValidators()
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from didier.utils.http.limits import HostLimiter
+
+
+async def test_host_limiter():
+    """Test that only requests to the same host have to wait for each other"""
+    limiter = HostLimiter(limit=2)
+    running: dict[str, int] = {}
+    peaks: dict[str, int] = {}
+
+    async def _request(url: str, host: str):
+        async with limiter.acquire(url):
+            running[host] = running.get(host, 0) + 1
+            peaks[host] = max(peaks.get(host, 0), running[host])
+            await asyncio.sleep(0.01)
+            running[host] -= 1
+
+    await asyncio.gather(
+        *(_request(f"https://store.steampowered.com/app/{i}/", "steam") for i in range(5)),
+        *(_request(f"https://pepeizqdeals.com/{i}/", "pepeizq") for i in range(5)),
+    )
+
+    assert peaks == {"steam": 2, "pepeizq": 2}
+
+
+async def test_host_limiter_timeout():
+    """Test that the timeout only starts once a request is allowed to be sent"""
+    limiter = HostLimiter(limit=1)
+
+    async def _request(duration: float):
+        async with limiter.acquire("https://store.steampowered.com/", timeout=0.1):
+            await asyncio.sleep(duration)
+
+    # The last request has to wait for longer than the timeout before it can be sent
+    await asyncio.gather(*(_request(0.05) for _ in range(4)))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await _request(1)
@@ -0,0 +1,50 @@
+from datetime import datetime, time
+
+from database.enums import TaskType
+from database.schemas import Task
+from didier.utils.scheduler import Daily, get_first_run
+from didier.utils.types.datetime import LOCAL_TIMEZONE
+
+MORNING = Daily(time(hour=7, tzinfo=LOCAL_TIMEZONE))
+
+
+def _local(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(year=2022, month=9, day=day, hour=hour, minute=minute, tzinfo=LOCAL_TIMEZONE)
+
+
+def test_daily_next_after():
+    """Test that daily tasks run at the same time every day"""
+    assert MORNING.next_after(_local(19, 6)) == _local(19, 7)
+    assert MORNING.next_after(_local(19, 7)) == _local(20, 7)
+    assert MORNING.next_after(_local(19, 7, 1)) == _local(20, 7)
+
+
+def test_first_run_never_ran():
+    """Test that tasks that never ran before wait until their next regular run"""
+    now = _local(19, 12)
+    assert get_first_run(MORNING, None, now) == _local(20, 7)
+    assert get_first_run(MORNING, Task(task=TaskType.BIRTHDAYS), now) == _local(20, 7)
+
+    # Runs that failed still stored when the task should run next
+    task = Task(task=TaskType.BIRTHDAYS, next_run=_local(19, 18))
+    assert get_first_run(MORNING, task, now) == _local(19, 18)
+
+
+def test_first_run_overdue():
+    """Test that tasks that were missed while offline run once, right away"""
+    now = _local(22, 12)
+    task = Task(task=TaskType.BIRTHDAYS, previous_run=_local(19, 7))
+    assert get_first_run(MORNING, task, now) == now
+
+
+def test_first_run_not_due():
+    """Test that tasks that already ran wait until they're due, using the stored time if it's known"""
+    now = _local(19, 12)
+    task = Task(task=TaskType.BIRTHDAYS, previous_run=_local(19, 7))
+    assert get_first_run(MORNING, task, now) == _local(20, 7)
+
+    task.next_run = _local(20, 7, 1)
+    assert get_first_run(MORNING, task, now) == _local(20, 7)
+
+    task.next_run = _local(19, 18)
+    assert get_first_run(MORNING, task, now) == _local(19, 18)